@@ -1,14 +1,24 @@
 # activation.py
 
-from kohler import critical_supersaturation
+from kohler import critical_supersaturation_fast
 
-def check_activation(S, aerosol, T=298.15):
+def check_activation(S, aerosol, T=298.15, sigma=0.072):
     """
     Returns True if aerosol activates at supersaturation S.
     Also sets aerosol.activated = True/False.
+    Sc(T) uses the population's memoized T-independent coefficient.
     """
     Dp = 2.0 * aerosol.radius  # convert radius to diameter
-    Sc = critical_supersaturation(Dp=Dp, kappa=aerosol.kappa, T=T)
+    Sc = critical_supersaturation_fast(Dp=Dp, kappa=aerosol.kappa, sigma=sigma, T=T)
 
     aerosol.activated = (S >= Sc)
     return aerosol.activated, Sc
+
+
+def check_activation_spectrum(S, spectrum, T=298.15):
+    """
+    Vectorized activation check for an AerosolSpectrum (all bins in one call).
+    Returns (activated mask, Sc per bin, activated N, activated sum(N * r^2)).
+    Also sets spectrum.activated.
+    """
+    return spectrum.activate(S, T)
@@ -0,0 +1,387 @@
+# batch_parcel.py
+# Vectorized parcel engine: advance many independent parcels together with NumPy
+
+import re
+
+import numpy as np
+from constants import Lv, Rv
+from thermodynamics import saturation_vapor_pressure
+from kohler import critical_supersaturation
+from biological_in import active_fraction
+from checkpoint import digest
+
+
+LIQUID_SINKS = ("relax", "surface_area", "always")
+
+# Per-parcel inputs that run_batch(wrt=...) can differentiate, besides
+# "aerosol_N[i]" / "aerosol_radius[i]" of population i
+TANGENT_INPUTS = ("T0", "RH0", "cooling_rate", "k_liquid", "k_ice", "qi_growth_coeff",
+                  "in_N", "in_T50", "in_width")
+_POP_INPUT = re.compile(r"^aerosol_(N|radius|kappa)\[(\d+)\]$")
+
+
+def populations_to_arrays(populations):
+    """
+    Stack AerosolPopulation objects (one entry each) and AerosolSpectrum
+    objects (one entry per bin) into (N, radius, kappa) arrays of shape
+    (n_pop,), suitable for run_batch.
+    """
+    N = np.concatenate([np.atleast_1d(p.N) for p in populations]).astype(float)
+    radius = np.concatenate([np.atleast_1d(p.radius) for p in populations]).astype(float)
+    kappa = np.concatenate([np.atleast_1d(p.kappa) for p in populations]).astype(float)
+    return N, radius, kappa
+
+
+def run_batch(
+    T0,
+    RH0,
+    cooling_rate,
+    aerosol_N,
+    aerosol_radius,
+    aerosol_kappa,
+    in_N=None,
+    in_T50=263.15,
+    in_width=2.0,
+    in_spectrum=None,
+    N_threshold=1.0,
+    k_liquid=0.2,
+    k_ice=0.0,
+    qi_growth_coeff=0.0,
+    liquid_sink="relax",
+    sink_ref=None,
+    dt=1.0,
+    t_end=600.0,
+    T_path=None,
+    p_path=None,
+    checkpoint=None,
+    wrt=None,
+):
+    """
+    Integrate n parcels at once. Each step follows the scalar drivers exactly:
+    es(T), S, activation, IN onset, liquid sink, ice sink, S after sinks,
+    peak tracking, then cooling.
+
+    Parameters
+    ----------
+    T0, RH0, cooling_rate : array_like, shape (n,)
+        Initial temperature (K), initial relative humidity (0-1) and
+        cooling rate (K/s) per parcel. Scalars are broadcast.
+    aerosol_N, aerosol_radius, aerosol_kappa : array_like, shape (n_pop,) or (n_pop, n)
+        Aerosol populations (m^-3, m, -). A 1-D array is shared by all parcels.
+    in_N, in_T50, in_width : array_like, shape (n,), optional
+        Biological IN class per parcel. in_N=None disables ice.
+    in_spectrum : INSpectrum, optional
+        Multi-species IN spectrum shared by all parcels (replaces in_N,
+        in_T50, in_width and enables ice). Onset is screened with its
+        cached activation table and confirmed exactly near the threshold.
+    N_threshold : float
+        Active IN number (m^-3) needed for ice onset.
+    k_liquid : float or array_like
+        Liquid sink coefficient (k_relax / k_base / k_cond in the drivers).
+    k_ice : float or array_like
+        Ice deposition sink coefficient (applied only once ice is active).
+    qi_growth_coeff : float
+        Ice growth proxy coefficient (run_mixed_phase_minimal).
+    liquid_sink : str
+        "relax"        : k_liquid * S * es when S > 0 and any population is activated
+                         (run_mixed_phase_minimal / run_mixed_phase_updraft_sweep)
+        "surface_area" : k_liquid * sink_norm * S * es with sink_norm = sum(N r^2) over
+                         activated populations / sink_ref (run_parcel_competition)
+        "always"       : k_liquid * S * es whenever S > 0 (run_updraft_sensitivity)
+    sink_ref : float or array_like, optional
+        Normalisation for "surface_area". Defaults to N r^2 of the first population.
+    dt, t_end : float
+        Time step and end time (s), shared by all parcels.
+    T_path, p_path : array_like, shape (n_steps,) or (n_steps, n), optional
+        Prescribed temperature (K) and pressure (any unit) at every step
+        (t = 0, dt, ...) instead of T0 / cooling_rate (pass None for those)
+        and t_end. Between steps e is scaled by p ratio (fixed mixing ratio).
+    checkpoint : checkpoint.Checkpointer, optional
+        Resume from its snapshot if present and write one every few steps
+        (results are bit-identical to an uninterrupted run).
+    wrt : sequence of str, optional
+        Step tangent-linear derivatives alongside the state with respect to
+        these inputs (TANGENT_INPUTS, "aerosol_N[i]", "aerosol_radius[i]");
+        see sensitivity.run_tangent. Activation and IN onset are switches, so
+        inputs that act only through them are rejected: aerosol kappa, and
+        aerosol N and radius unless liquid_sink="surface_area".
+
+    Returns
+    -------
+    dict of arrays, shape (n,):
+        "S_peak", "t_peak", "ice_onset_time", "ice_onset_T" (NaN if no onset),
+        "qi" (final ice proxy), "activated" (final flags, shape (n_pop, n))
+        and "activated_ever" (activated at any step, shape (n_pop, n)).
+        With wrt, also "d_S_peak" and "d_qi", shape (len(wrt), n).
+    """
+    if liquid_sink not in LIQUID_SINKS:
+        raise ValueError(f"liquid_sink must be one of {LIQUID_SINKS}, got {liquid_sink!r}")
+    if wrt is not None:
+        wrt = list(wrt)
+        _check_wrt(wrt, liquid_sink, T_path is not None, in_N is not None)
+
+    aerosol_N = np.asarray(aerosol_N, dtype=float)
+    aerosol_radius = np.asarray(aerosol_radius, dtype=float)
+    aerosol_kappa = np.asarray(aerosol_kappa, dtype=float)
+
+    # Number of parcels: broadcast over every per-parcel input
+    per_parcel = [RH0, k_liquid, k_ice]
+    if T_path is None:
+        per_parcel += [T0, cooling_rate]
+    else:
+        T_path = np.asarray(T_path, dtype=float)
+        per_parcel.append(T_path[0])
+        if p_path is not None:
+            p_path = np.asarray(p_path, dtype=float)
+            per_parcel.append(p_path[0])
+    if in_N is not None:
+        per_parcel += [in_N, in_T50, in_width]
+    if sink_ref is not None:
+        per_parcel.append(sink_ref)
+    shapes = [np.shape(a) for a in per_parcel]
+    shapes += [a.shape[1:] for a in (aerosol_N, aerosol_radius, aerosol_kappa)]
+    n = int(np.prod(np.broadcast_shapes((1,), *shapes)))
+
+    def _per_parcel(a):
+        return np.broadcast_to(np.asarray(a, dtype=float), (n,))
+
+    RH0 = _per_parcel(RH0)
+    if T_path is None:
+        T0 = _per_parcel(T0)
+        cooling_rate = _per_parcel(cooling_rate)
+    else:
+        n_path = len(T_path)
+        T0 = _per_parcel(T_path[0])
+    k_liquid = _per_parcel(k_liquid)
+    k_ice = _per_parcel(k_ice)
+
+    # -----------------------
+    # Aerosol populations, shape (n_pop, n)
+    # -----------------------
+    def _per_pop(a):
+        if a.ndim == 1:
+            a = a[:, None]
+        return np.broadcast_to(a, (a.shape[0], n))
+
+    N_p = _per_pop(aerosol_N)
+    r_p = _per_pop(aerosol_radius)
+    kappa_p = _per_pop(aerosol_kappa)
+    n_pop = N_p.shape[0]
+    Dp = 2.0 * r_p  # convert radius to diameter
+
+    # Surface-area weights are constant in time: precompute once
+    area_p = N_p * (r_p ** 2)
+    sink_ref_default = sink_ref is None
+    sink_ref = area_p[0] if sink_ref_default else _per_parcel(sink_ref)
+
+    # -----------------------
+    # Biological IN (optional)
+    # -----------------------
+    include_ice = in_N is not None or in_spectrum is not None
+    if in_spectrum is not None:
+        in_spectrum.table()
+    elif include_ice:
+        in_N = _per_parcel(in_N)
+        in_T50 = _per_parcel(in_T50)
+        in_width = np.maximum(_per_parcel(in_width), 1e-12)
+
+    # -----------------------
+    # Tangents of the inputs, shape (m, n) or (m, n_pop, n), m = len(wrt)
+    # -----------------------
+    tangent = wrt is not None
+    if tangent:
+        m = len(wrt)
+
+        def seed(name):
+            d = np.zeros((m, n))
+            if name in wrt:
+                d[wrt.index(name)] = 1.0
+            return d
+
+        d_cooling_rate, d_k_liquid, d_k_ice = seed("cooling_rate"), seed("k_liquid"), seed("k_ice")
+        d_qi_growth_coeff = seed("qi_growth_coeff")
+        d_N_p = np.zeros((m, n_pop, n))
+        d_r_p = np.zeros((m, n_pop, n))
+        for k, name in enumerate(wrt):
+            match = _POP_INPUT.match(name)
+            if match is None:
+                continue
+            i = int(match.group(2))
+            if i >= n_pop:
+                raise ValueError(f"{name}: only {n_pop} aerosol populations")
+            (d_N_p if match.group(1) == "N" else d_r_p)[k, i] = 1.0
+        d_area_p = d_N_p * (r_p ** 2) + 2.0 * N_p * r_p * d_r_p
+        d_sink_ref = d_area_p[:, 0] if sink_ref_default else np.zeros((m, n))
+        L_Rv = Lv / Rv
+
+    # -----------------------
+    # State
+    # -----------------------
+    T = T0.copy()
+    e = RH0 * saturation_vapor_pressure(T)
+    qi = np.zeros(n)
+    if tangent:
+        es = saturation_vapor_pressure(T)
+        dT = seed("T0")
+        de = seed("RH0") * es + RH0 * (es * L_Rv / T**2) * dT
+        dqi = np.zeros((m, n))
+        dS_peak = np.zeros((m, n))
+
+    activated = np.zeros((n_pop, n), dtype=bool)
+    activated_ever = np.zeros((n_pop, n), dtype=bool)
+    ice_active = np.zeros(n, dtype=bool)
+    ice_onset_time = np.full(n, np.nan)
+    ice_onset_T = np.full(n, np.nan)
+
+    S_peak = np.full(n, -999.0)
+    t_peak = np.full(n, np.nan)
+
+    t = 0.0
+    step = 0
+    if checkpoint is not None:
+        inputs = [RH0, k_liquid, k_ice, N_p, r_p, kappa_p, sink_ref]
+        inputs += [T0, cooling_rate] if T_path is None else [T_path] + ([] if p_path is None else [p_path])
+        if in_spectrum is not None:
+            inputs += [in_spectrum.N, in_spectrum.T50, in_spectrum.width]
+        elif include_ice:
+            inputs += [in_N, in_T50, in_width]
+        config = {
+            "n": n, "n_pop": n_pop, "dt": dt, "t_end": t_end, "liquid_sink": liquid_sink,
+            "N_threshold": N_threshold, "qi_growth_coeff": qi_growth_coeff, "include_ice": include_ice,
+            "inputs": digest(*inputs), "wrt": wrt,
+        }
+        saved = checkpoint.restore_batch(config)
+        if saved is not None:
+            T, e, qi = saved["T"], saved["e"], saved["qi"]
+            activated, activated_ever = saved["activated"], saved["activated_ever"]
+            ice_active, ice_onset_time, ice_onset_T = saved["ice_active"], saved["ice_onset_time"], saved["ice_onset_T"]
+            S_peak, t_peak = saved["S_peak"], saved["t_peak"]
+            t, step = float(saved["t"]), int(saved["step"])
+            if tangent:
+                dT, de, dqi, dS_peak = saved["dT"], saved["de"], saved["dqi"], saved["dS_peak"]
+
+    while (t <= t_end) if T_path is None else (step < n_path):
+        es = saturation_vapor_pressure(T)
+        S = (e / es) - 1
+        if tangent:
+            des = (es * L_Rv / T**2) * dT
+            dS = (de - (e / es) * des) / es
+            dflux = dS * es + S * des
+
+        # Liquid activation (all populations, all parcels)
+        activated = S >= critical_supersaturation(Dp, kappa_p, T=T)
+        activated_ever |= activated
+
+        # Biological IN onset switch
+        if in_spectrum is not None:
+            new_onset = (~ice_active) & in_spectrum.threshold_reached(T, N_threshold)
+        elif include_ice:
+            new_onset = (~ice_active) & (in_N * active_fraction(T, in_T50, in_width) >= N_threshold)
+        if include_ice:
+            if new_onset.any():
+                ice_active = ice_active | new_onset
+                ice_onset_time[new_onset] = t
+                ice_onset_T[new_onset] = T[new_onset]
+
+        supersat = S > 0.0
+
+        # Liquid sink
+        if liquid_sink == "surface_area":
+            sink_strength = (activated * area_p).sum(axis=0)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sink_norm = np.where(sink_ref > 0, sink_strength / sink_ref, 0.0)
+            coeff = k_liquid * sink_norm
+            mask = supersat
+            if tangent:
+                d_sink_strength = (activated * d_area_p).sum(axis=1)
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    d_sink_norm = np.where(sink_ref > 0, (d_sink_strength - sink_norm * d_sink_ref) / sink_ref, 0.0)
+                d_coeff = d_k_liquid * sink_norm + k_liquid * d_sink_norm
+        else:
+            coeff = k_liquid
+            mask = supersat & activated.any(axis=0) if liquid_sink == "relax" else supersat
+            if tangent:
+                d_coeff = d_k_liquid
+
+        e = np.where(mask, e - (coeff * S * es * dt), e)
+        if tangent:
+            de = np.where(mask, de - (d_coeff * S * es + coeff * dflux) * dt, de)
+            de = np.where(e < 0.0, 0.0, de)
+        e = np.where(e < 0.0, 0.0, e)
+
+        # Ice deposition sink (same S as the liquid sink, as in the scalar loops)
+        if include_ice:
+            mask = ice_active & supersat
+            e = np.where(mask, e - (k_ice * S * es * dt), e)
+            if tangent:
+                de = np.where(mask, de - (d_k_ice * S * es + k_ice * dflux) * dt, de)
+                de = np.where(e < 0.0, 0.0, de)
+                dqi = np.where(mask, dqi + (d_qi_growth_coeff * S * es + qi_growth_coeff * dflux) * dt, dqi)
+            e = np.where(e < 0.0, 0.0, e)
+            qi = np.where(mask, qi + qi_growth_coeff * S * es * dt, qi)
+
+        # Track peak S after sinks
+        S2 = (e / es) - 1
+        higher = S2 > S_peak
+        S_peak = np.where(higher, S2, S_peak)
+        t_peak = np.where(higher, t, t_peak)
+        if tangent:
+            dS_peak = np.where(higher, (de - (e / es) * des) / es, dS_peak)
+
+        # Cool parcels (or follow the prescribed path; its tangent is zero)
+        step += 1
+        if T_path is None:
+            T = T - cooling_rate * dt
+            if tangent:
+                dT = dT - d_cooling_rate * dt
+        elif step < n_path:
+            T = _per_parcel(T_path[step])
+            if p_path is not None:
+                e = e * (p_path[step] / p_path[step - 1])
+                if tangent:
+                    de = de * (p_path[step] / p_path[step - 1])
+        t = t + dt
+
+        if checkpoint is not None:
+            checkpoint.after_batch_step(step, config, lambda: {
+                "T": T, "e": e, "qi": qi, "activated": activated, "activated_ever": activated_ever,
+                "ice_active": ice_active, "ice_onset_time": ice_onset_time, "ice_onset_T": ice_onset_T,
+                "S_peak": S_peak, "t_peak": t_peak, "t": t, "step": step,
+                **({"dT": dT, "de": de, "dqi": dqi, "dS_peak": dS_peak} if tangent else {}),
+            })
+
+    result = {
+        "S_peak": S_peak,
+        "t_peak": t_peak,
+        "ice_onset_time": ice_onset_time,
+        "ice_onset_T": ice_onset_T,
+        "qi": qi,
+        "activated": activated,
+        "activated_ever": activated_ever,
+    }
+    if tangent:
+        result["d_S_peak"] = dS_peak
+        result["d_qi"] = dqi
+    return result
+
+
+def _check_wrt(wrt, liquid_sink, has_path, has_in_class):
+    """
+    Raise ValueError for inputs run_batch cannot differentiate: unknown names,
+    inputs that act only through the activation switch, T0 / cooling_rate
+    under a prescribed T_path and IN parameters without an IN class.
+    """
+    for name in wrt:
+        match = _POP_INPUT.match(name)
+        if match is None and name not in TANGENT_INPUTS:
+            raise ValueError(f"Cannot differentiate with respect to {name!r}")
+        if match is not None and match.group(1) == "kappa":
+            raise ValueError(f"{name}: kappa acts only through the activation switch (derivative 0 "
+                             "between activation-time jumps); use finite differences")
+        if match is not None and liquid_sink != "surface_area":
+            raise ValueError(f"{name}: with liquid_sink={liquid_sink!r} aerosol number and radius act only "
+                             "through the activation switch; use finite differences")
+        if has_path and name in ("T0", "cooling_rate"):
+            raise ValueError(f"{name} is not an input when T_path is given")
+        if name.startswith("in_") and not has_in_class:
+            raise ValueError(f"{name}: IN parameters given in wrt but in_N is None")
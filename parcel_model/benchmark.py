@@ -0,0 +1,251 @@
+# benchmark.py
+# Offline benchmark suite: times model kernels, drivers and sweeps, writes JSON
+# with machine metadata, and compares against a stored baseline
+#
+# Usage:
+#   python benchmark.py run [--output bench.json] [--quick] [--filter name]
+#   python benchmark.py compare baseline.json bench.json [--threshold 0.10]
+
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import thermodynamics
+import kohler
+import activation
+import biological_in
+import ice_growth
+import batch_parcel
+import run_updraft_sensitivity
+import run_parcel_competition
+import run_mixed_phase_updraft_sweep
+from aerosol import AerosolPopulation
+
+
+# -----------------------
+# Timing
+# -----------------------
+def time_call(func, repeat=5, min_time=0.05):
+    """
+    Time func() like timeit: calibrate the number of calls per repeat so each
+    repeat lasts at least min_time seconds, then run repeat repeats.
+    Returns per-call seconds {"min", "median", "number", "repeat"}.
+    """
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed == 0.0 else max(2, min(10, int(1.2 * min_time / elapsed) + 1))
+
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            func()
+        times.append((time.perf_counter() - t0) / number)
+    return {
+        "min": min(times),
+        "median": float(np.median(times)),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def machine_metadata():
+    """
+    Machine and software description stored alongside the timings.
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "git_commit": commit,
+    }
+
+
+# -----------------------
+# Benchmark cases
+# -----------------------
+def _quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def _sulfate():
+    return AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+
+
+def benchmarks(quick=False):
+    """
+    {name: zero-argument callable}. quick=True uses smaller ensembles.
+    """
+    T_array = np.linspace(250.0, 300.0, 100_000)
+    Dp_array = np.logspace(-8.5, -5.0, 100_000)
+    sulfate = _sulfate()
+    bio = biological_in.BiologicalIN(name="bioIN", N=50.0, T50=263.15, width=2.0)
+
+    cases = {
+        "kernel/saturation_vapor_pressure/scalar": lambda: thermodynamics.saturation_vapor_pressure(273.15),
+        "kernel/saturation_vapor_pressure/array_1e5": lambda: thermodynamics.saturation_vapor_pressure(T_array),
+        "kernel/critical_supersaturation/scalar": lambda: kohler.critical_supersaturation(60e-9, 1.0, T=273.15),
+        "kernel/critical_supersaturation/array_1e5": lambda: kohler.critical_supersaturation(Dp_array, 0.5, T=273.15),
+        "kernel/check_activation": lambda: activation.check_activation(1e-3, sulfate, T=273.15),
+        "kernel/ice_active_fraction": lambda: bio.ice_active_fraction(265.0),
+        "kernel/ice_deposition_sink": lambda: ice_growth.ice_deposition_sink(1e-3, 611.0, 1e-6, 1.0),
+        "driver/updraft_parcel_run": lambda: run_updraft_sensitivity.parcel_run(0.01, ""),
+        "driver/pollen_parcel_run": lambda: run_parcel_competition.parcel_run(3000.0, "", verbose=False),
+        "driver/mixed_phase_run_case": lambda: run_mixed_phase_updraft_sweep.run_case(1.0, include_ice=True),
+    }
+
+    loop_sizes = (4, 16) if quick else (4, 16, 64)
+    batch_sizes = (16, 256) if quick else (16, 256, 4096)
+    N_s, r_s, kappa_s = batch_parcel.populations_to_arrays([sulfate])
+
+    for n in loop_sizes:
+        rates = np.linspace(0.002, 0.02, n)
+        pollen = np.logspace(1, 4, n)
+        cases[f"sweep/updraft/loop_{n}"] = (
+            lambda rates=rates: [run_updraft_sensitivity.parcel_run(r, "") for r in rates]
+        )
+        cases[f"sweep/pollen/loop_{n}"] = (
+            lambda pollen=pollen: [run_parcel_competition.parcel_run(p, "", verbose=False) for p in pollen]
+        )
+
+    for n in batch_sizes:
+        rates = np.linspace(0.002, 0.02, n)
+        pollen = np.logspace(1, 4, n)
+        N_p = np.array([np.full(n, 500e6), pollen])
+        r_p = np.array([30e-9, 5e-6])
+        kappa_p = np.array([1.0, 0.1])
+        cases[f"sweep/updraft/batch_{n}"] = (
+            lambda rates=rates: batch_parcel.run_batch(
+                288.0, 0.95, rates, N_s, r_s, kappa_s, k_liquid=0.5, liquid_sink="always")
+        )
+        cases[f"sweep/pollen/batch_{n}"] = (
+            lambda N_p=N_p: batch_parcel.run_batch(
+                288.0, 0.95, 0.01, N_p, r_p, kappa_p, k_liquid=0.5, liquid_sink="surface_area")
+        )
+    return cases
+
+
+def run_benchmarks(quick=False, name_filter=None, repeat=5, min_time=0.05, verbose=True):
+    """
+    Time every benchmark (optionally only names containing name_filter).
+    Returns {"metadata": ..., "results": {name: timing}}.
+    """
+    results = {}
+    for name, func in benchmarks(quick=quick).items():
+        if name_filter and name_filter not in name:
+            continue
+        timing = _quiet(time_call, func, repeat=repeat, min_time=min_time)
+        results[name] = timing
+        if verbose:
+            print(f"{name:45s} {timing['min'] * 1e6:14.2f} us   (median {timing['median'] * 1e6:.2f} us)")
+    return {"metadata": machine_metadata(), "results": results}
+
+
+# -----------------------
+# Comparison
+# -----------------------
+def compare(baseline, current, threshold=0.10):
+    """
+    Compare per-call minimum times of two benchmark runs (dicts as written
+    by run_benchmarks). Returns rows (name, base_s, new_s, ratio, status)
+    with status "regression" (slower by more than threshold), "improvement"
+    (faster by more than threshold), "ok", "new" or "missing".
+    """
+    rows = []
+    base, new = baseline["results"], current["results"]
+    for name in sorted(set(base) | set(new)):
+        if name not in new:
+            rows.append((name, base[name]["min"], None, None, "missing"))
+            continue
+        if name not in base:
+            rows.append((name, None, new[name]["min"], None, "new"))
+            continue
+        ratio = new[name]["min"] / base[name]["min"]
+        if ratio > 1.0 + threshold:
+            status = "regression"
+        elif ratio < 1.0 / (1.0 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, base[name]["min"], new[name]["min"], ratio, status))
+    return rows
+
+
+def _format_us(seconds):
+    return "-" if seconds is None else f"{seconds * 1e6:.2f}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Parcel-model benchmark suite.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="time all benchmarks")
+    p_run.add_argument("--output", default=None, help="JSON file for results")
+    p_run.add_argument("--quick", action="store_true", help="smaller ensembles")
+    p_run.add_argument("--filter", default=None, help="only benchmarks whose name contains this")
+    p_run.add_argument("--repeat", type=int, default=5)
+    p_run.add_argument("--min-time", type=float, default=0.05, help="seconds per repeat")
+
+    p_cmp = sub.add_parser("compare", help="flag regressions against a baseline")
+    p_cmp.add_argument("baseline")
+    p_cmp.add_argument("current")
+    p_cmp.add_argument("--threshold", type=float, default=0.10, help="relative slowdown flagged")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run_benchmarks(quick=args.quick, name_filter=args.filter,
+                                repeat=args.repeat, min_time=args.min_time)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=1)
+            print(f"Saved: {args.output}")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    for key in ("platform", "python", "numpy", "git_commit"):
+        b, c = baseline["metadata"].get(key), current["metadata"].get(key)
+        if b != c:
+            print(f"note: {key} differs: {b} -> {c}")
+    rows = compare(baseline, current, threshold=args.threshold)
+    print(f"{'benchmark':45s} {'base (us)':>12s} {'new (us)':>12s} {'ratio':>7s}  status")
+    for name, b, c, ratio, status in rows:
+        ratio_str = "-" if ratio is None else f"{ratio:.2f}"
+        print(f"{name:45s} {_format_us(b):>12s} {_format_us(c):>12s} {ratio_str:>7s}  {status}")
+    n_regressions = sum(status == "regression" for *_, status in rows)
+    print(f"{n_regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if n_regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
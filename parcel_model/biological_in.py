@@ -3,6 +3,8 @@
 
 import math
 
+import numpy as np
+
 
 class BiologicalIN:
     """
@@ -41,6 +43,222 @@ class BiologicalIN:
         """
         return self.N * self.ice_active_fraction(T)
 
+    def onset_temperature(self, N_threshold: float = 1.0) -> float:
+        """
+        Temperature (K) at which the active IN number reaches N_threshold
+        (see module-level onset_temperature).
+        """
+        return float(onset_temperature(self.N, self.T50, self.width, N_threshold))
+
+    def onset(self, T0: float, cooling_rate: float, N_threshold: float = 1.0,
+              t_end: float = math.inf, dt: float = None):
+        """
+        Ice onset (time (s), temperature (K)) under linear cooling, or
+        (None, None) if not reached within t_end (see ice_onset).
+        """
+        t, T = ice_onset(T0, cooling_rate, self.N, self.T50, self.width,
+                         N_threshold=N_threshold, t_end=t_end, dt=dt)
+        return _onset_scalar(t), _onset_scalar(T)
+
+
+# -----------------------
+# Multi-species IN spectrum
+# -----------------------
+class ActivationTable:
+    """
+    Cumulative active IN number per species (and total) on a uniform
+    temperature grid, for linear-interpolation lookups.
+
+    Attributes
+    ----------
+    T : array, shape (n_grid,)
+        Grid temperatures (K), T_min to T_max in steps of dT
+    cumulative : array, shape (n_grid, n_species)
+        Active IN number (m^-3) of each species at the grid temperatures
+    total : array, shape (n_grid,)
+        Sum over species
+    max_error : float
+        Largest absolute error of the interpolated total (m^-3) measured at
+        the interval midpoints
+    """
+
+    def __init__(self, spectrum, T_min, T_max, dT):
+        n = max(int(math.ceil((T_max - T_min) / dT)), 1)
+        self.T_min = T_min
+        self.dT = dT
+        self.T_max = T_min + n * dT
+        self.T = T_min + dT * np.arange(n + 1)
+        self.cumulative = spectrum.active_number(self.T, per_species=True)[1]
+        self.total = self.cumulative.sum(axis=1)
+        self._d_cumulative = np.diff(self.cumulative, axis=0)
+        self._d_total = np.diff(self.total)
+
+        T_mid = self.T[:-1] + 0.5 * dT
+        self.max_error = float(np.max(np.abs(self(T_mid) - spectrum.active_number(T_mid))))
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.T, self.cumulative, self.total, self._d_cumulative, self._d_total))
+
+    def __call__(self, T, per_species=False):
+        """
+        Interpolated total active number at T (any shape); with
+        per_species=True also the per-species numbers, shape T.shape + (n_species,).
+        Temperatures outside the grid are clamped to its ends.
+        """
+        x = np.clip((np.asarray(T, dtype=float) - self.T_min) / self.dT, 0.0, len(self._d_total))
+        i = np.minimum(x.astype(np.intp), len(self._d_total) - 1)
+        frac = x - i
+        total = self.total[i] + self._d_total[i] * frac
+        if not per_species:
+            return total
+        return total, self.cumulative[i] + self._d_cumulative[i] * frac[..., None]
+
+
+class INSpectrum:
+    """
+    Many IN species (biological or mineral) as arrays, one entry per species,
+    each with its own logistic activation curve (see BiologicalIN).
+
+    Parameters
+    ----------
+    names : list of str
+        Species names
+    N, T50, width : array_like, shape (n_species,)
+        Number concentration (m^-3), 50% activation temperature (K) and
+        width (K) per species
+    dT : float
+        Grid spacing (K) of the cached activation table (see table())
+
+    The arrays are read-only so the cached table stays valid; build a new
+    spectrum to change them.
+    """
+
+    __slots__ = ("names", "N", "T50", "width", "dT", "_table")
+
+    def __init__(self, names, N, T50, width, dT=0.01):
+        N, T50, width = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(N, dtype=float)),
+            np.atleast_1d(np.asarray(T50, dtype=float)),
+            np.atleast_1d(np.asarray(width, dtype=float)),
+        )
+        if N.ndim != 1:
+            raise ValueError("INSpectrum expects 1-D species arrays")
+        self.names = list(names)
+        if len(self.names) != len(N):
+            raise ValueError(f"{len(self.names)} names for {len(N)} species")
+        self.N = np.array(N)
+        self.T50 = np.array(T50)
+        self.width = np.maximum(width, 1e-12)
+        for a in (self.N, self.T50, self.width):
+            a.setflags(write=False)
+        self.dT = dT
+        self._table = None
+
+    @classmethod
+    def from_classes(cls, classes, dT=0.01):
+        """
+        Spectrum from BiologicalIN objects (one species each).
+        """
+        return cls([c.name for c in classes], [c.N for c in classes],
+                   [c.T50 for c in classes], [c.width for c in classes], dT=dT)
+
+    def __len__(self):
+        return len(self.N)
+
+    @property
+    def N_total(self):
+        return float(self.N.sum())
+
+    def active_fraction(self, T):
+        """
+        Active fraction of every species at T (any shape): shape T.shape + (n_species,).
+        """
+        return active_fraction(np.asarray(T, dtype=float)[..., None], self.T50, self.width)
+
+    def active_number(self, T, per_species=False, table=False):
+        """
+        Total active IN number (m^-3) at T (any shape, e.g. one temperature
+        per parcel); with per_species=True also the per-species numbers,
+        shape T.shape + (n_species,). table=True interpolates in the cached
+        activation table instead of evaluating every logistic.
+        """
+        if table:
+            return self.table()(T, per_species=per_species)
+        per = self.N * self.active_fraction(T)
+        total = per.sum(axis=-1)
+        return (total, per) if per_species else total
+
+    def active_IN_number(self, T: float) -> float:
+        """
+        Total active IN number at a scalar T (BiologicalIN interface, so a
+        spectrum works with check_ice_nucleation and parcel.INOnset).
+        """
+        return float(self.active_number(T))
+
+    def table(self):
+        """
+        Cached ActivationTable covering T50 +- 12 width of every species (the
+        active fraction is within 1e-5 of 0 or 1 outside), built on first use.
+        """
+        if self._table is None:
+            T_min = float(np.min(self.T50 - 12.0 * self.width))
+            T_max = float(np.max(self.T50 + 12.0 * self.width))
+            self._table = ActivationTable(self, T_min, T_max, self.dT)
+        return self._table
+
+    def threshold_reached(self, T, N_threshold=1.0):
+        """
+        Boolean array: total active number at T >= N_threshold. Screened with
+        the table; temperatures within its error of the threshold (or off the
+        grid) are evaluated exactly, so the result equals the direct test.
+        """
+        T = np.asarray(T, dtype=float)
+        table = self.table()
+        total = table(T)
+        margin = 2.0 * table.max_error + 1e-12 * max(abs(N_threshold), 1.0)
+        unsure = (np.abs(total - N_threshold) <= margin) | (T < table.T_min) | (T > table.T_max)
+        reached = total >= N_threshold
+        if np.any(unsure):
+            reached = np.where(unsure, self.active_number(np.where(unsure, T, table.T_min)) >= N_threshold, reached)
+        return reached
+
+    def onset_temperature(self, N_threshold: float = 1.0) -> float:
+        """
+        Warmest temperature (K) at which the total active number reaches
+        N_threshold (bisection; the total falls monotonically with T).
+        Returns inf if N_threshold <= 0 and NaN if it is never reached
+        (N_threshold >= N_total).
+        """
+        if N_threshold <= 0.0:
+            return math.inf
+        if N_threshold >= self.N_total:
+            return math.nan
+        lo = float(np.min(self.T50 - 12.0 * self.width))
+        hi = float(np.max(self.T50 + 12.0 * self.width))
+        while self.active_IN_number(lo) < N_threshold:
+            lo -= hi - lo
+        for _ in range(200):
+            mid = 0.5 * (lo + hi)
+            if mid in (lo, hi):
+                break
+            if self.active_IN_number(mid) >= N_threshold:
+                lo = mid
+            else:
+                hi = mid
+        return lo
+
+
+def active_fraction(T, T50, width):
+    """
+    Ice-active fraction of logistic IN classes at T (K), as
+    BiologicalIN.ice_active_fraction, for NumPy arrays (broadcast together;
+    width must be > 0).
+    """
+    x = (T50 - T) / width
+    with np.errstate(over="ignore"):
+        return np.clip(1.0 / (1.0 + np.exp(-x)), 0.0, 1.0)
+
 
 def check_ice_nucleation(T: float, bio_in: BiologicalIN, N_threshold: float = 1.0):
     """
@@ -58,3 +276,77 @@ def check_ice_nucleation(T: float, bio_in: BiologicalIN, N_threshold: float = 1.
     N_active = bio_in.active_IN_number(T)
     nucleated = (N_active >= N_threshold)
     return nucleated, N_active
+
+
+# -----------------------
+# Closed-form onset under prescribed cooling
+# -----------------------
+def onset_temperature(N, T50, width, N_threshold=1.0):
+    """
+    Temperature (K) at which N * ice_active_fraction(T) reaches N_threshold,
+    from the inverse logistic T* = T50 - width * log(p / (1 - p)), p = N_threshold / N.
+    Accepts NumPy arrays (broadcast together).
+
+    Returns +inf where the threshold is met at any temperature (N_threshold <= 0)
+    and NaN where it is never met (N_threshold >= N: the active fraction only
+    tends to 1).
+    """
+    N, T50, width, N_threshold = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (N, T50, width, N_threshold))
+    )
+    width = np.maximum(width, 1e-12)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = N_threshold / N
+        T_onset = T50 - width * np.log(p / (1.0 - p))
+    T_onset = np.where(p <= 0.0, np.inf, T_onset)
+    T_onset = np.where((p >= 1.0) | (N <= 0.0), np.nan, T_onset)
+    return T_onset[()]
+
+
+def ice_onset(T0, cooling_rate, N, T50, width, N_threshold=1.0, t_end=np.inf, dt=None):
+    """
+    Ice onset time (s) and temperature (K) for linear cooling T(t) = T0 - cooling_rate * t,
+    without time stepping. All arguments may be NumPy arrays (broadcast together),
+    e.g. many IN classes and cooling rates in one call.
+
+    dt : float, optional
+        If given, onset is reported at the first time step t = n * dt at which
+        check_ice_nucleation would fire (as in the stepping drivers); otherwise
+        at the exact threshold crossing.
+
+    Returns
+    -------
+    onset_time, onset_T : NaN where onset is not reached by t_end
+    """
+    T0, cooling_rate, N, T50, width, N_threshold, t_end = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (T0, cooling_rate, N, T50, width, N_threshold, t_end))
+    )
+    T_onset = np.asarray(onset_temperature(N, T50, width, N_threshold))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(T0 <= T_onset, 0.0, (T0 - T_onset) / cooling_rate)
+    # Warming or no cooling never reaches a colder onset temperature
+    t = np.where((T0 > T_onset) & (cooling_rate <= 0.0), np.nan, t)
+
+    if dt is not None:
+        width = np.maximum(width, 1e-12)
+
+        def reached(n):
+            x = (T50 - (T0 - cooling_rate * n * dt)) / width
+            with np.errstate(over="ignore"):
+                return N / (1.0 + np.exp(-x)) >= N_threshold
+
+        # First step on or after the crossing; settle round-off at the
+        # threshold with the same test as the stepping loop
+        n = np.maximum(np.ceil(t / dt - 1e-9), 0.0)
+        n = np.where(reached(n), n, n + 1.0)
+        n = np.where((n > 0.0) & reached(n - 1.0), n - 1.0, n)
+        t = n * dt
+
+    t = np.where(t <= t_end, t, np.nan)
+    return t[()], (T0 - cooling_rate * t)[()]
+
+
+def _onset_scalar(value):
+    value = float(value)
+    return None if math.isnan(value) else value
@@ -0,0 +1,193 @@
+# checkpoint.py
+# Checkpoint / restart of parcel runs: compact binary snapshots (uncompressed
+# .npz of float64 / bool arrays) of a scalar ParcelSimulation or a run_batch
+# integration, written every n steps and restored bit-for-bit
+#
+#   ckpt = Checkpointer("runs/w1.ckpt", every=200)
+#   sim.run(checkpoint=ckpt)                          # resumes if the file exists
+#   run_batch(..., checkpoint=Checkpointer("runs/batch.ckpt", every=100))
+#
+# A snapshot is taken at a step boundary (after cooling), so a resumed run
+# repeats exactly the arithmetic of an uninterrupted one. Each snapshot
+# records the run configuration; restoring into a different run raises.
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from aerosol import AerosolSpectrum
+from run_cache import canonical
+
+
+FORMAT_VERSION = 1
+
+# ParcelState fields saved as float64; None is stored as NaN
+_STATE_FLOATS = ("t", "T", "e", "qi", "ice_onset_time", "ice_onset_T", "S_peak", "t_peak")
+_OPTIONAL = ("ice_onset_time", "ice_onset_T", "t_peak")
+
+
+# -----------------------
+# File format
+# -----------------------
+def save_snapshot(path, kind, config, arrays):
+    """
+    Write {name: array or scalar} to path atomically (temporary file, then
+    rename), with the format version, kind ("parcel" / "batch") and config
+    (a JSON-serialisable dict identifying the run).
+    """
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, _version=FORMAT_VERSION, _kind=kind, _config=json.dumps(config, sort_keys=True), **arrays)
+    os.replace(tmp, path)
+
+
+def load_snapshot(path, kind, config):
+    """
+    Arrays of the snapshot at path as a dict. Raises ValueError if it was
+    written by another format version, kind of run or configuration.
+    """
+    with np.load(path) as data:
+        if int(data["_version"]) != FORMAT_VERSION:
+            raise ValueError(f"{path}: snapshot format {int(data['_version'])}, expected {FORMAT_VERSION}")
+        if str(data["_kind"]) != kind:
+            raise ValueError(f"{path}: {str(data['_kind'])} snapshot, expected {kind}")
+        if str(data["_config"]) != json.dumps(config, sort_keys=True):
+            raise ValueError(f"{path}: snapshot belongs to a different run configuration")
+        return {name: data[name] for name in data.files if not name.startswith("_")}
+
+
+def digest(*arrays):
+    """
+    Short hash of the values of the given arrays (identifies batch inputs).
+    """
+    h = hashlib.sha256()
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        h.update(str((a.dtype.str, a.shape)).encode())
+        h.update(a.tobytes())
+    return h.hexdigest()[:16]
+
+
+# -----------------------
+# Scalar parcel snapshots
+# -----------------------
+def parcel_config(sim):
+    """
+    Configuration a ParcelSimulation snapshot must match to be restored:
+    run settings, population names and parameters (N, radius, kappa of every
+    population or spectrum bin) and each process term's parameters().
+    """
+    pops = sim.populations
+    return {
+        "T0": sim.T0, "RH0": sim.RH0, "cooling_rate": sim.cooling_rate, "dt": sim.dt, "t_end": sim.t_end,
+        "populations": [pop.name for pop in pops],
+        "aerosol": digest(*[np.asarray(getattr(pop, a), dtype=float) for pop in pops for a in ("N", "radius", "kappa")]),
+        "processes": [type(term).__name__ for term in sim.processes],
+        "parameters": [_parameter_digest(term.parameters()) for term in sim.processes],
+    }
+
+
+def _parameter_digest(parameters):
+    text = json.dumps(canonical(parameters), sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def parcel_snapshot(sim):
+    """
+    State of a ParcelSimulation between steps: ParcelState, step count,
+    activation flags of every population and the state of each process term.
+    """
+    state = sim.state
+    arrays = {f"state.{f}": np.nan if getattr(state, f) is None else getattr(state, f) for f in _STATE_FLOATS}
+    arrays["state.ice_active"] = state.ice_active
+    arrays["n_steps"] = sim.n_steps
+    for i, pop in enumerate(sim.populations):
+        arrays[f"population{i}.activated"] = pop.activated
+    for i, term in enumerate(sim.processes):
+        for name, value in term.checkpoint().items():
+            arrays[f"process{i}.{name}"] = value
+    return arrays
+
+
+def restore_parcel(sim, arrays):
+    """
+    Load a parcel_snapshot into sim (after its setup).
+    """
+    state = sim.state
+    for f in _STATE_FLOATS:
+        value = float(arrays[f"state.{f}"])
+        setattr(state, f, None if f in _OPTIONAL and np.isnan(value) else value)
+    state.ice_active = bool(arrays["state.ice_active"])
+    sim.n_steps = int(arrays["n_steps"])
+    for i, pop in enumerate(sim.populations):
+        activated = arrays[f"population{i}.activated"]
+        if isinstance(pop, AerosolSpectrum):
+            pop.activated = np.array(activated, dtype=bool)
+            pop.N_activated = float(pop.N.sum(where=pop.activated))
+            pop.area_activated = float(pop._area.sum(where=pop.activated))
+        else:
+            pop.activated = bool(activated)
+    for i, term in enumerate(sim.processes):
+        prefix = f"process{i}."
+        data = {k[len(prefix):]: v for k, v in arrays.items() if k.startswith(prefix)}
+        if data:
+            term.restore(data)
+
+
+class Checkpointer:
+    """
+    Periodic snapshots of one run at path, every `every` steps, and restore
+    from path (if it exists and resume=True) when the run starts.
+
+    Pass it as checkpoint= to ParcelSimulation.run / steps (method="euler")
+    or to batch_parcel.run_batch. After a run, restored tells whether it
+    resumed from a snapshot and n_saved how many snapshots were written.
+    """
+
+    def __init__(self, path, every=100, resume=True):
+        if every < 1:
+            raise ValueError(f"every must be >= 1, got {every}")
+        self.path = path
+        self.every = every
+        self.resume = resume
+        self.restored = False
+        self.n_saved = 0
+
+    def _can_resume(self):
+        return self.resume and os.path.exists(self.path)
+
+    # ParcelSimulation protocol
+    def restore(self, sim):
+        self.restored = self._can_resume()
+        if self.restored:
+            restore_parcel(sim, load_snapshot(self.path, "parcel", parcel_config(sim)))
+
+    def after_step(self, sim):
+        if sim.n_steps % self.every == 0:
+            save_snapshot(self.path, "parcel", parcel_config(sim), parcel_snapshot(sim))
+            self.n_saved += 1
+
+    # run_batch protocol
+    def restore_batch(self, config):
+        """
+        Saved batch arrays for config, or None if there is nothing to resume.
+        """
+        self.restored = self._can_resume()
+        return load_snapshot(self.path, "batch", config) if self.restored else None
+
+    def after_batch_step(self, step, config, arrays):
+        """
+        Save arrays() (a callable, evaluated only when a snapshot is due).
+        """
+        if step % self.every == 0:
+            save_snapshot(self.path, "batch", config, arrays())
+            self.n_saved += 1
+
+    def clear(self):
+        """
+        Remove the snapshot (e.g. once the run's results are stored).
+        """
+        if os.path.exists(self.path):
+            os.remove(self.path)
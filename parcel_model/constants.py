@@ -6,5 +6,9 @@ Rv = 461.5       # Gas constant for water vapor (J/kg/K)
 
 Mw = 0.018       # Molar mass of water (kg/mol)      [used elsewhere later]
 rho_w = 1000.0   # Density of liquid water (kg/m^3)
+rho_i = 917.0    # Density of ice (kg/m^3)
 Lv = 2.5e6       # Latent heat of vaporization (J/kg)
+Ls = 2.834e6     # Latent heat of sublimation (J/kg)
 g = 9.81         # Gravitational acceleration (m/s^2)
+Dv = 2.21e-5     # Diffusivity of water vapour in air (m^2/s)  [~273 K, 1000 hPa]
+Ka = 2.4e-2      # Thermal conductivity of air (W/m/K)
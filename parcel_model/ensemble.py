@@ -0,0 +1,383 @@
+# ensemble.py
+# Monte Carlo ensembles for parameter uncertainty: seeded sampling of aerosol,
+# biological IN and updraft parameters, evaluated in chunks with batch_parcel
+#
+#   result = run_ensemble(
+#       20000, [sulfate, pollen], bio_in=bio,
+#       uncertain={"sulfate.kappa": Normal(1.0, 0.1, lo=0.05), "bioIN.T50": Normal(263.15, 1.0),
+#                  "w": LogNormal(1.0, 1.5)},
+#   )
+#   result["summary"]["S_peak"]["percentiles"]
+#
+# Samples are drawn in fixed blocks, each from its own generator seeded by
+# (seed, block), so an ensemble does not depend on chunk_size and a larger
+# ensemble with the same seed extends a smaller one.
+
+import math
+
+import numpy as np
+
+from batch_parcel import run_batch
+
+
+SAMPLE_BLOCK = 4096
+OUTPUTS = ("S_peak", "t_peak", "ice_onset_time")
+PERCENTILES = (5.0, 25.0, 50.0, 75.0, 95.0)
+
+# Per-parcel run_batch inputs that may be made uncertain besides w
+PARCEL_PARAMETERS = ("T0", "RH0", "k_liquid", "k_ice")
+POPULATION_ATTRS = ("N", "radius", "kappa")
+IN_ATTRS = ("N", "T50", "width")
+
+
+# -----------------------
+# Distributions
+# -----------------------
+class Uniform:
+    """
+    Uniform on [lo, hi].
+    """
+
+    def __init__(self, lo, hi):
+        self.lo = float(lo)
+        self.hi = float(hi)
+
+    def sample(self, rng, size):
+        return rng.uniform(self.lo, self.hi, size)
+
+
+class LogUniform:
+    """
+    Log-uniform on [lo, hi] (lo > 0): uniform in log(x).
+    """
+
+    def __init__(self, lo, hi):
+        self.lo = float(lo)
+        self.hi = float(hi)
+
+    def sample(self, rng, size):
+        return np.exp(rng.uniform(math.log(self.lo), math.log(self.hi), size))
+
+
+class Normal:
+    """
+    Normal with mean and standard deviation sd, optionally truncated to
+    [lo, hi] (out-of-range draws are redrawn).
+    """
+
+    def __init__(self, mean, sd, lo=-np.inf, hi=np.inf):
+        self.mean = float(mean)
+        self.sd = float(sd)
+        self.lo = float(lo)
+        self.hi = float(hi)
+
+    def sample(self, rng, size):
+        x = rng.normal(self.mean, self.sd, size)
+        bad = (x < self.lo) | (x > self.hi)
+        while bad.any():
+            x[bad] = rng.normal(self.mean, self.sd, int(bad.sum()))
+            bad = (x < self.lo) | (x > self.hi)
+        return x
+
+
+class LogNormal:
+    """
+    Lognormal with the given median and geometric standard deviation sigma_g
+    (as used for aerosol modes).
+    """
+
+    def __init__(self, median, sigma_g):
+        self.median = float(median)
+        self.sigma_g = float(sigma_g)
+
+    def sample(self, rng, size):
+        return self.median * np.exp(math.log(self.sigma_g) * rng.standard_normal(size))
+
+
+class Empirical:
+    """
+    Resample (with replacement) from observed values.
+    """
+
+    def __init__(self, values):
+        self.values = np.asarray(values, dtype=float)
+
+    def sample(self, rng, size):
+        return self.values[rng.integers(0, len(self.values), size)]
+
+
+# -----------------------
+# Sampling
+# -----------------------
+def draw_samples(uncertain, seed, start, stop):
+    """
+    Samples with indices start..stop-1 of every uncertain parameter.
+
+    uncertain maps names to distributions (anything with sample(rng, size))
+    or to arrays of given samples, indexed directly. Returns {name: array}.
+    """
+    samples = {}
+    names = sorted(uncertain)
+    drawn = [name for name in names if hasattr(uncertain[name], "sample")]
+    for name in names:
+        if name not in drawn:
+            values = np.asarray(uncertain[name], dtype=float)
+            if values.ndim != 1 or len(values) < stop:
+                raise ValueError(f"{name}: need a 1-D array of at least {stop} samples")
+            samples[name] = values[start:stop]
+    if not drawn:
+        return samples
+
+    parts = {name: [] for name in drawn}
+    for block in range(start // SAMPLE_BLOCK, (stop - 1) // SAMPLE_BLOCK + 1):
+        rng = np.random.default_rng([seed, block])
+        b0 = block * SAMPLE_BLOCK
+        lo, hi = max(start, b0) - b0, min(stop, b0 + SAMPLE_BLOCK) - b0
+        for name in drawn:
+            parts[name].append(uncertain[name].sample(rng, SAMPLE_BLOCK)[lo:hi])
+    for name in drawn:
+        samples[name] = np.concatenate(parts[name])
+    return samples
+
+
+def _check_names(uncertain, populations, bio_in):
+    pop_names = {p.name for p in populations}
+    known = {"w", *PARCEL_PARAMETERS}
+    known |= {f"{p}.{a}" for p in pop_names for a in POPULATION_ATTRS}
+    if bio_in is not None:
+        known |= {f"{bio_in.name}.{a}" for a in IN_ATTRS}
+    unknown = sorted(set(uncertain) - known)
+    if unknown:
+        raise ValueError(f"Unknown uncertain parameter(s) {unknown}; expected some of {sorted(known)}")
+
+
+# -----------------------
+# Ensemble runs
+# -----------------------
+def run_ensemble(
+    n,
+    populations,
+    bio_in=None,
+    uncertain=None,
+    w=1.0,
+    seed=0,
+    chunk_size=8192,
+    T0=273.15,
+    RH0=0.95,
+    cooling_per_w=0.01,
+    k_liquid=0.2,
+    k_ice=2.0,
+    qi_growth_coeff=0.0,
+    liquid_sink="relax",
+    N_threshold=1.0,
+    dt=1.0,
+    t_end=1200.0,
+    percentiles=PERCENTILES,
+    bins=40,
+    keep_samples=True,
+    progress=False,
+):
+    """
+    Run n parcels with uncertain parameters, chunk_size parcels per
+    run_batch call (working memory scales with chunk_size, not n).
+
+    Parameters
+    ----------
+    n : int
+        Ensemble size
+    populations : list of AerosolPopulation
+        Central values of the liquid CCN populations
+    bio_in : BiologicalIN, optional
+        Central values of the IN class (None: no ice)
+    uncertain : dict, optional
+        {name: distribution or sample array}. Names are "w", "T0", "RH0",
+        "k_liquid", "k_ice", "<population>.N|radius|kappa" and
+        "<bio_in.name>.N|T50|width"; other parameters keep their central value.
+    w : float
+        Updraft (m/s) when not uncertain; cooling rate = cooling_per_w * w (K/s)
+    seed : int
+        Seed of the sample generator
+    The remaining model arguments are passed to batch_parcel.run_batch (defaults
+    as in run_mixed_phase_updraft_sweep).
+
+    Returns
+    -------
+    dict with "n", "seed", "outputs" ({S_peak, t_peak, ice_onset_time}: arrays of
+    shape (n,), onset NaN where not reached), "samples" (if keep_samples),
+    "summary" (see summarize) and "convergence" (see convergence).
+    """
+    uncertain = dict(uncertain or {})
+    _check_names(uncertain, populations, bio_in)
+
+    outputs = {name: np.empty(n) for name in OUTPUTS}
+    samples = {name: np.empty(n) for name in uncertain} if keep_samples else None
+    base = {"w": w, "T0": T0, "RH0": RH0, "k_liquid": k_liquid, "k_ice": k_ice}
+
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        drawn = draw_samples(uncertain, seed, start, stop)
+        if keep_samples:
+            for name, values in drawn.items():
+                samples[name][start:stop] = values
+        value = {**base, **{k: v for k, v in drawn.items() if k in base}}
+
+        def attr(owner, name):
+            return drawn.get(f"{owner.name}.{name}", getattr(owner, name))
+
+        aerosol_N = [np.broadcast_to(attr(p, "N"), stop - start) for p in populations]
+        aerosol_radius = [np.broadcast_to(attr(p, "radius"), stop - start) for p in populations]
+        aerosol_kappa = [np.broadcast_to(attr(p, "kappa"), stop - start) for p in populations]
+
+        ice = {} if bio_in is None else {
+            "in_N": attr(bio_in, "N"), "in_T50": attr(bio_in, "T50"), "in_width": attr(bio_in, "width"),
+        }
+
+        res = run_batch(
+            value["T0"], value["RH0"], cooling_per_w * np.asarray(value["w"]),
+            np.array(aerosol_N), np.array(aerosol_radius), np.array(aerosol_kappa), **ice,
+            N_threshold=N_threshold, k_liquid=value["k_liquid"], k_ice=value["k_ice"],
+            qi_growth_coeff=qi_growth_coeff, liquid_sink=liquid_sink, dt=dt, t_end=t_end,
+        )
+        for name in OUTPUTS:
+            outputs[name][start:stop] = res[name]
+        if progress:
+            print(f"ensemble: {stop}/{n} parcels", flush=True)
+
+    return {
+        "n": n,
+        "seed": seed,
+        "outputs": outputs,
+        "samples": samples,
+        "summary": summarize(outputs, percentiles=percentiles, bins=bins),
+        "convergence": convergence(outputs, percentiles=percentiles),
+    }
+
+
+# -----------------------
+# Statistics
+# -----------------------
+def summarize(outputs, percentiles=PERCENTILES, bins=40):
+    """
+    Statistics of each output array over the samples where it is defined
+    (ice onset: where reached).
+
+    Returns {name: {"n_valid", "fraction" (valid / total), "fraction_stderr",
+    "mean", "std", "stderr", "percentiles" ({p: value}), "histogram"
+    ((counts, edges))}}.
+    """
+    summary = {}
+    for name, values in outputs.items():
+        values = np.asarray(values, dtype=float)
+        valid = values[np.isfinite(values)]
+        n_total, n_valid = len(values), len(valid)
+        fraction = n_valid / n_total if n_total else math.nan
+        stats = {
+            "n_valid": n_valid,
+            "fraction": fraction,
+            "fraction_stderr": math.sqrt(fraction * (1.0 - fraction) / n_total) if n_total else math.nan,
+            "mean": math.nan,
+            "std": math.nan,
+            "stderr": math.nan,
+            "percentiles": {p: math.nan for p in percentiles},
+            "histogram": (np.zeros(bins, dtype=int), np.full(bins + 1, np.nan)),
+        }
+        if n_valid:
+            std = float(valid.std(ddof=1)) if n_valid > 1 else 0.0
+            stats.update(
+                mean=float(valid.mean()),
+                std=std,
+                stderr=std / math.sqrt(n_valid),
+                percentiles=dict(zip(percentiles, np.percentile(valid, percentiles).tolist())),
+                histogram=np.histogram(valid, bins=bins),
+            )
+        summary[name] = stats
+    return summary
+
+
+def convergence(outputs, percentiles=PERCENTILES, n_points=12, n_min=100):
+    """
+    Running estimates over the first n samples, at n_points sample counts
+    log-spaced from n_min to the ensemble size, to judge whether the
+    ensemble is large enough.
+
+    Returns {name: {"n", "mean", "stderr", "fraction", "percentiles" ({p: array}),
+    "half_change"}}. half_change is the largest change of any percentile
+    between the first half of the samples and the full ensemble, relative
+    to the full-ensemble interquartile range (small: converged).
+    """
+    diagnostics = {}
+    for name, values in outputs.items():
+        values = np.asarray(values, dtype=float)
+        n = len(values)
+        counts = np.unique(np.geomspace(min(n_min, n), n, n_points).astype(int)) if n else np.array([], int)
+        finite = np.isfinite(values)
+        d = {"n": counts, "mean": [], "stderr": [], "fraction": [],
+             "percentiles": {p: [] for p in percentiles}}
+        for k in counts:
+            valid = values[:k][finite[:k]]
+            d["fraction"].append(len(valid) / k)
+            if len(valid) > 1:
+                d["mean"].append(valid.mean())
+                d["stderr"].append(valid.std(ddof=1) / math.sqrt(len(valid)))
+                q = np.percentile(valid, percentiles)
+            else:
+                d["mean"].append(math.nan)
+                d["stderr"].append(math.nan)
+                q = np.full(len(percentiles), np.nan)
+            for p, v in zip(percentiles, q):
+                d["percentiles"][p].append(v)
+        for key in ("mean", "stderr", "fraction"):
+            d[key] = np.asarray(d[key])
+        d["percentiles"] = {p: np.asarray(v) for p, v in d["percentiles"].items()}
+
+        d["half_change"] = math.nan
+        valid_all, valid_half = values[finite], values[: n // 2][finite[: n // 2]]
+        if len(valid_half) > 1:
+            q_all = np.percentile(valid_all, percentiles)
+            q_half = np.percentile(valid_half, percentiles)
+            iqr = np.subtract(*np.percentile(valid_all, [75.0, 25.0]))
+            scale = iqr if iqr > 0.0 else max(abs(float(np.median(valid_all))), 1e-300)
+            d["half_change"] = float(np.max(np.abs(q_all - q_half)) / scale)
+        diagnostics[name] = d
+    return diagnostics
+
+
+def report(result, file=None):
+    """
+    Print percentiles and convergence of each output of run_ensemble.
+    """
+    summary, diagnostics = result["summary"], result["convergence"]
+    first = next(iter(summary.values()))
+    header = "".join(f"{'p' + format(p, 'g'):>11s}" for p in first["percentiles"])
+    print(f"Ensemble: n={result['n']} seed={result['seed']}", file=file)
+    print(f"{'output':15s} {'valid':>7s} {'mean':>11s} {'stderr':>10s}{header} {'half_change':>12s}", file=file)
+    for name, stats in summary.items():
+        values = "".join(f"{v:11.3e}" for v in stats["percentiles"].values())
+        print(f"{name:15s} {stats['fraction']:7.1%} {stats['mean']:11.3e} {stats['stderr']:10.2e}{values} "
+              f"{diagnostics[name]['half_change']:12.3f}", file=file)
+
+
+def run():
+    from aerosol import AerosolPopulation
+    from biological_in import BiologicalIN
+
+    sulfate = AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+    pollen = AerosolPopulation(name="pollen", N=3000.0, radius=5e-6, kappa=0.1, rho_p=1000.0)
+    bio = BiologicalIN(name="bioIN", N=50.0, T50=263.15, width=2.0)
+
+    uncertain = {
+        "sulfate.N": LogNormal(500e6, 1.3),
+        "sulfate.radius": LogNormal(30e-9, 1.2),
+        "sulfate.kappa": Normal(1.0, 0.15, lo=0.1, hi=1.3),
+        "pollen.N": LogUniform(300.0, 30000.0),
+        "pollen.kappa": Uniform(0.05, 0.2),
+        "bioIN.T50": Normal(263.15, 1.5),
+        "bioIN.width": Uniform(1.0, 3.0),
+        "w": LogNormal(1.0, 1.5),
+    }
+    result = run_ensemble(20000, [sulfate, pollen], bio_in=bio, uncertain=uncertain, seed=42)
+    report(result)
+
+
+if __name__ == "__main__":
+    run()
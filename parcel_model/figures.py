@@ -0,0 +1,413 @@
+# figures.py
+# Headless figure pipeline: compute results once into a ResultStore, then render
+# every configured figure from the stored arrays with the Agg backend, in
+# parallel worker processes, skipping figures whose inputs have not changed
+#
+# Usage:
+#   python figures.py --compute            # run the model, store results, render
+#   python figures.py                      # re-render changed figures only
+#   python figures.py --only pollen --force
+#
+# The plot_*.py scripts each render their figure(s) into the working
+# directory through render_figure.
+#
+# matplotlib is imported only inside the render functions, so importing this
+# module (or any model module) never pays its import cost.
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from result_store import ResultStore
+
+
+DEFAULT_STORE = "results"
+DEFAULT_OUTDIR = "figures"
+MANIFEST = ".figures.json"
+
+# inputs: ("table", name) or ("series", params dict)
+Figure = namedtuple("Figure", ["name", "filename", "inputs", "render"])
+
+MIXED_NO_ICE = {"driver": "mixed_phase_minimal", "w": 1.0, "include_ice": False}
+MIXED_ICE = {"driver": "mixed_phase_minimal", "w": 1.0, "include_ice": True}
+
+
+def _pyplot():
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+# -----------------------
+# Results
+# -----------------------
+def compute_results(store):
+    """
+    Run the drivers behind the figures and store their results.
+    """
+    from biological_in import ice_onset
+    from sweep import run_sweep
+    from threshold_search import find_drop, pollen_S_peak
+    import run_mixed_phase_minimal
+    import run_mixed_phase_updraft_sweep
+    import run_parcel_competition
+    import run_updraft_sensitivity
+
+    w = np.array([0.2, 0.5, 1.0, 2.0])
+
+    rows = [run_updraft_sensitivity.parcel_run(0.01 * wi, "") for wi in w]
+    store.write_table("updraft_sensitivity", w=w, S_peak=[r[0] for r in rows], t_peak=[r[1] for r in rows])
+
+    pollen_N = [0.0, 100.0, 300.0, 1000.0, 3000.0, 10000.0]
+    table = {"dt": [], "pollen_N": [], "S_peak": [], "t_peak": []}
+    for dt in [0.5, 1.0, 2.0]:
+        for pN in pollen_N:
+            S_peak, t_peak = run_parcel_competition.parcel_run(pN, "", dt=dt, verbose=False)
+            for column, value in zip(table, (dt, pN, S_peak, t_peak)):
+                table[column].append(value)
+    store.write_table("pollen_competition", **table)
+
+    S_ref = pollen_S_peak(0.0)
+    drop = [0.1, 0.25, 0.5]
+    store.write_table("pollen_transition", drop=drop,
+                      pollen_N=[find_drop(pollen_S_peak, 10.0, 1e5, f, reference=S_ref)[0] for f in drop])
+
+    rows = run_sweep(run_mixed_phase_updraft_sweep.run_case, {"w": list(w), "include_ice": [False, True]},
+                     workers=1, progress=False)
+    store.write_sweep("mixed_phase_updraft", rows, ["S_peak", "t_peak", "ice_onset_time", "ice_onset_T"])
+
+    onset_t, onset_T = ice_onset(273.15, 0.01 * w, 50.0, 263.15, 2.0, t_end=1200.0, dt=1.0)
+    store.write_table("bioIN_onset", w=w, onset_time=onset_t, onset_T=onset_T)
+
+    onsets = []
+    for params in (MIXED_NO_ICE, MIXED_ICE):
+        t, S, qi, onset_t, _ = run_mixed_phase_minimal.run_case("", params["w"], include_ice=params["include_ice"],
+                                                                verbose=False)
+        t = np.asarray(t)
+        store.write_series(params, t=t, T=273.15 - 0.01 * params["w"] * t, S=S, qi=qi)
+        onsets.append(onset_t)
+    store.write_table("mixed_phase_minimal", include_ice=[False, True], ice_onset_time=onsets)
+
+
+# -----------------------
+# Figures: render(inputs, path), inputs loaded in the order of Figure.inputs
+# -----------------------
+def render_pollen(inputs, path):
+    plt = _pyplot()
+    table, transition = inputs
+    rows = table["dt"] == 1.0
+    pollen_N = np.where(table["pollen_N"][rows] == 0.0, 1.0, table["pollen_N"][rows])
+    S_peak = table["S_peak"][rows]
+    pN_10 = float(transition["pollen_N"][transition["drop"] == 0.1][0])
+
+    plt.figure(figsize=(6.5, 4.2), dpi=120)
+    plt.plot(pollen_N, S_peak, marker="o", markersize=5, linewidth=1.5)
+    plt.xscale("log")
+    plt.xlabel(r"Pollen number concentration (m$^{-3}$)")
+    plt.ylabel(r"Peak supersaturation, $S_{\mathrm{peak}}$")
+    plt.title("Dependence of peak supersaturation on pollen concentration")
+    plt.axvline(pN_10, linestyle="--", linewidth=1.0)
+    plt.text(1.05 * pN_10, S_peak.max() * 0.98, "onset of strong\ncompetition\n(10% drop)", fontsize=9, va="top")
+    plt.grid(True, which="both", linestyle=":", linewidth=0.8)
+    plt.tight_layout()
+    plt.savefig(path, dpi=300)
+    plt.close("all")
+
+
+def render_pollen_plain(inputs, path):
+    plt = _pyplot()
+    (table,) = inputs
+    rows = table["dt"] == 1.0
+    pollen_N = np.where(table["pollen_N"][rows] == 0.0, 1.0, table["pollen_N"][rows])
+    plt.figure()
+    plt.plot(pollen_N, table["S_peak"][rows], marker="o", linestyle="-")
+    plt.xscale("log")
+    plt.xlabel("Pollen number concentration (m$^{-3}$)")
+    plt.ylabel("Peak supersaturation")
+    plt.title("Effect of pollen concentration on peak supersaturation")
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path, dpi=200)
+    plt.close("all")
+
+
+def render_updraft_sensitivity(inputs, path):
+    plt = _pyplot()
+    (table,) = inputs
+    plt.figure()
+    plt.plot(table["w"], table["S_peak"], marker="o")
+    plt.xlabel("Updraft velocity, w (m/s)")
+    plt.ylabel(r"Peak supersaturation, $S_{\mathrm{peak}}$")
+    plt.title("Updraft sensitivity: peak supersaturation vs updraft velocity")
+    plt.grid(True)
+    plt.savefig(path, dpi=300, bbox_inches="tight")
+    plt.close("all")
+
+
+def render_bioIN_onset(inputs, path):
+    plt = _pyplot()
+    (table,) = inputs
+    plt.figure(figsize=(6, 4))
+    plt.plot(table["w"], table["onset_time"], marker="o", linewidth=2)
+    plt.xlabel("Updraft velocity (m s$^{-1}$)")
+    plt.ylabel("Ice onset time (s)")
+    plt.title("Biological IN: Ice onset time vs updraft velocity")
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path, dpi=300)
+    plt.close("all")
+
+
+def render_mixed_phase_updraft(inputs, path):
+    plt = _pyplot()
+    (table,) = inputs
+    ice = table["include_ice"]
+    plt.figure(figsize=(7, 4.5))
+    plt.plot(table["w"][~ice], table["S_peak"][~ice], marker="o", linewidth=2, label="No ice (liquid-only)")
+    plt.plot(table["w"][ice], table["S_peak"][ice], marker="o", linewidth=2, label="With biological IN (mixed-phase)")
+    plt.xlabel("Updraft velocity, $w$ (m s$^{-1}$)", fontsize=11)
+    plt.ylabel(r"Peak supersaturation, $S_{\mathrm{peak}}$", fontsize=11)
+    plt.title("Effect of updraft velocity on peak supersaturation", fontsize=12)
+    plt.grid(True, alpha=0.3)
+    plt.legend(frameon=False, fontsize=10)
+    plt.tight_layout()
+    plt.savefig(path, dpi=300)
+    plt.close("all")
+
+
+def _onset_time(table):
+    onset = float(table["ice_onset_time"][table["include_ice"]][0])
+    return None if np.isnan(onset) else onset
+
+
+def render_mixed_phase_compare(inputs, path):
+    plt = _pyplot()
+    no_ice, ice, minimal = inputs
+    plt.figure(figsize=(7, 4))
+    plt.plot(no_ice["t"], no_ice["S"], label="No ice")
+    plt.plot(ice["t"], ice["S"], label="Biological IN enabled")
+    onset = _onset_time(minimal)
+    if onset is not None:
+        plt.axvline(onset, linestyle="--", label=f"Ice onset ({onset:.0f}s)")
+    plt.axhline(0.0, linestyle="--")
+    plt.xlabel("Time (s)")
+    plt.ylabel("Supersaturation, S")
+    plt.title("Mixed-phase prototype: S(t) comparison (w=1.0 m/s)")
+    plt.grid(True, alpha=0.3)
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(path, dpi=200)
+    plt.close("all")
+
+
+def render_mixed_phase_qi(inputs, path):
+    plt = _pyplot()
+    ice, minimal = inputs
+    plt.figure()
+    plt.plot(ice["t"], ice["qi"], label="qi (ice mass proxy)")
+    onset = _onset_time(minimal)
+    if onset is not None:
+        plt.axvline(onset, linestyle="--", label="Ice onset")
+    plt.xlabel("Time (s)")
+    plt.ylabel("qi (arb. units)")
+    plt.title("Mixed-phase parcel: ice growth proxy qi(t)")
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(path, dpi=200)
+    plt.close("all")
+
+
+def render_mixed_phase_growth(inputs, path):
+    plt = _pyplot()
+    no_ice, ice, minimal = inputs
+    plt.figure()
+    plt.plot(no_ice["t"], no_ice["S"], label="No ice")
+    plt.plot(ice["t"], ice["S"], label="Bio IN + ice growth")
+    onset = _onset_time(minimal)
+    if onset is not None:
+        plt.axvline(onset, linestyle="--", label=f"Ice onset (t={onset:.0f}s)")
+    plt.xlabel("Time (s)")
+    plt.ylabel("Supersaturation S")
+    plt.title("Mixed-phase parcel: S(t) with/without ice growth")
+    plt.legend()
+    plt.tight_layout()
+    plt.savefig(path, dpi=200)
+    plt.close("all")
+
+
+def render_temperature(inputs, path):
+    plt = _pyplot()
+    (series,) = inputs
+    plt.figure()
+    plt.plot(series["t"], series["T"])
+    plt.xlabel("Time (s)")
+    plt.ylabel("Temperature (K)")
+    plt.title("Parcel temperature evolution T(t)")
+    plt.tight_layout()
+    plt.savefig(path, dpi=200)
+    plt.close("all")
+
+
+def render_dt_table(inputs, path):
+    plt = _pyplot()
+    (table,) = inputs
+    key_cases = [0.0, 3000.0, 10000.0]
+    rows = []
+    for dt in np.unique(table["dt"]):
+        S = {pN: S for pN, S in zip(table["pollen_N"][table["dt"] == dt], table["S_peak"][table["dt"] == dt])}
+        stable = all(S[pN] > 0.0 for pN in key_cases)
+        rows.append([f"{dt:.1f}"] + [f"{S[pN]:.3e}" for pN in key_cases]
+                    + ["Stable" if stable else "Unstable (negative S)"])
+    columns = ["dt (s)"] + [f"Peak S ({int(pN)})" for pN in key_cases] + ["Numerical behaviour"]
+
+    fig, ax = plt.subplots(figsize=(9, 2.2), dpi=150)
+    ax.axis("off")
+    table_artist = ax.table(cellText=rows, colLabels=columns, loc="center", cellLoc="center")
+    table_artist.auto_set_font_size(False)
+    table_artist.set_fontsize(10)
+    table_artist.scale(1, 1.4)
+    plt.tight_layout()
+    plt.savefig(path, dpi=300)
+    plt.close("all")
+
+
+FIGURES = [
+    Figure("pollen", "peak_supersaturation_vs_pollen.png",
+           [("table", "pollen_competition"), ("table", "pollen_transition")], render_pollen),
+    Figure("pollen_plain", "peak_supersaturation_vs_pollen_plain.png",
+           [("table", "pollen_competition")], render_pollen_plain),
+    Figure("updraft_sensitivity", "updraft_sensitivity_Speak_vs_w.png",
+           [("table", "updraft_sensitivity")], render_updraft_sensitivity),
+    Figure("bioIN_onset", "bioIN_onset_vs_updraft.png", [("table", "bioIN_onset")], render_bioIN_onset),
+    Figure("mixed_phase_updraft", "mixed_phase_Speak_vs_updraft.png",
+           [("table", "mixed_phase_updraft")], render_mixed_phase_updraft),
+    Figure("mixed_phase_compare", "mixed_phase_S_vs_time.png",
+           [("series", MIXED_NO_ICE), ("series", MIXED_ICE), ("table", "mixed_phase_minimal")],
+           render_mixed_phase_compare),
+    Figure("mixed_phase_growth", "mixed_phase_S_vs_time_growth.png",
+           [("series", MIXED_NO_ICE), ("series", MIXED_ICE), ("table", "mixed_phase_minimal")],
+           render_mixed_phase_growth),
+    Figure("mixed_phase_qi", "mixed_phase_qi_vs_time.png",
+           [("series", MIXED_ICE), ("table", "mixed_phase_minimal")], render_mixed_phase_qi),
+    Figure("temperature", "temperature_vs_time.png", [("series", MIXED_NO_ICE)], render_temperature),
+    Figure("dt_table", "dt_sensitivity_table.png", [("table", "pollen_competition")], render_dt_table),
+]
+
+
+# -----------------------
+# Pipeline
+# -----------------------
+def _load(store, item):
+    kind, name = item
+    return store.table(name) if kind == "table" else store.series(name)
+
+
+def fingerprint(store, figure):
+    """
+    Hash of a figure's input arrays and its render function source.
+    """
+    digest = hashlib.sha256(inspect.getsource(figure.render).encode())
+    for item in figure.inputs:
+        digest.update(json.dumps(item, sort_keys=True).encode())
+        for column, array in sorted(_load(store, item).items()):
+            digest.update(column.encode())
+            digest.update(str(array.dtype).encode())
+            digest.update(np.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def _render(store_root, figure_name, path):
+    store = ResultStore(store_root)
+    figure = next(f for f in FIGURES if f.name == figure_name)
+    figure.render([_load(store, item) for item in figure.inputs], path)
+    return figure_name
+
+
+def render_figure(name, store_root=DEFAULT_STORE, outdir="."):
+    """
+    Render one figure into outdir, first computing and storing the model
+    results if the store does not hold its inputs yet. Returns the path.
+    """
+    store = ResultStore(store_root)
+    figure = next(f for f in FIGURES if f.name == name)
+    try:
+        inputs = [_load(store, item) for item in figure.inputs]
+    except KeyError:
+        compute_results(store)
+        inputs = [_load(store, item) for item in figure.inputs]
+    path = os.path.join(outdir, figure.filename)
+    figure.render(inputs, path)
+    return path
+
+
+def render_figures(store_root=DEFAULT_STORE, outdir=DEFAULT_OUTDIR, only=None, force=False, workers=None):
+    """
+    Render figures whose inputs (or render code) changed since the last run.
+    Returns (rendered names, skipped names).
+    """
+    store = ResultStore(store_root)
+    os.makedirs(outdir, exist_ok=True)
+    manifest_path = os.path.join(outdir, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    todo, skipped, prints = [], [], {}
+    for figure in FIGURES:
+        if only and only not in figure.name:
+            continue
+        path = os.path.join(outdir, figure.filename)
+        fp = fingerprint(store, figure)
+        if not force and manifest.get(figure.name) == fp and os.path.exists(path):
+            skipped.append(figure.name)
+            continue
+        todo.append((figure.name, path))
+        prints[figure.name] = fp
+
+    if todo:
+        workers = workers or min(len(todo), os.cpu_count() or 1)
+        if workers == 1:
+            for name, path in todo:
+                _render(store_root, name, path)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_render, store_root, name, path) for name, path in todo]
+                for future in futures:
+                    future.result()
+        manifest.update(prints)
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f, indent=1)
+
+    return [name for name, _ in todo], skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render parcel-model figures from stored results.")
+    parser.add_argument("--store", default=DEFAULT_STORE, help="ResultStore directory")
+    parser.add_argument("--outdir", default=DEFAULT_OUTDIR, help="figure output directory")
+    parser.add_argument("--compute", action="store_true", help="run the model and store results first")
+    parser.add_argument("--only", default=None, help="only figures whose name contains this")
+    parser.add_argument("--force", action="store_true", help="re-render even if inputs are unchanged")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.compute:
+        compute_results(ResultStore(args.store))
+    rendered, skipped = render_figures(args.store, args.outdir, only=args.only, force=args.force,
+                                       workers=args.workers)
+    for name in rendered:
+        print(f"Rendered: {name}")
+    if skipped:
+        print(f"Unchanged (skipped): {', '.join(skipped)}")
+
+
+if __name__ == "__main__":
+    main()
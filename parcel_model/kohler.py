@@ -2,8 +2,33 @@
 # Simple kappa-Kohler critical supersaturation approximation
 
 import math
+from functools import lru_cache
+
+import numpy as np
 from constants import R, Mw, rho_w
 
+# Bounded cache sizes (entries): A(T) values, Sc coefficients per (Dp, kappa, sigma)
+KELVIN_CACHE_SIZE = 4096
+COEFFICIENT_CACHE_SIZE = 4096
+
+_SCALAR = (int, float)
+
+
+def kelvin_parameter(T, sigma=0.072):
+    """
+    Kelvin term A = 4 sigma Mw / (R T rho_w) (m).
+    Scalar T is memoized (bounded LRU); array T is evaluated directly.
+    """
+    if isinstance(T, _SCALAR):
+        return _kelvin_parameter_cached(T, sigma)
+    return (4.0 * sigma * Mw) / (R * np.asarray(T) * rho_w)
+
+
+@lru_cache(maxsize=KELVIN_CACHE_SIZE)
+def _kelvin_parameter_cached(T, sigma):
+    return (4.0 * sigma * Mw) / (R * T * rho_w)
+
+
 def critical_supersaturation(Dp, kappa, sigma=0.072, T=298.15):
     """
     Approximate critical supersaturation (dimensionless, e.g. 0.001 = 0.1%)
@@ -11,9 +36,60 @@ def critical_supersaturation(Dp, kappa, sigma=0.072, T=298.15):
     kappa : hygroscopicity parameter
     sigma : surface tension of water (N/m)
     T : temperature (K)
+    Dp, kappa and T may be NumPy arrays (broadcast together); kappa <= 0 gives inf.
+    """
+    if isinstance(Dp, _SCALAR) and isinstance(kappa, _SCALAR) and isinstance(T, _SCALAR):
+        if kappa <= 0:
+            return float("inf")
+        A = _kelvin_parameter_cached(T, sigma)
+        Sc = (4.0 * A**3) / (27.0 * (Dp**3) * kappa)
+        return Sc
+
+    Dp = np.asarray(Dp, dtype=float)
+    kappa = np.asarray(kappa, dtype=float)
+    A = kelvin_parameter(np.asarray(T, dtype=float), sigma)
+    with np.errstate(divide="ignore"):
+        Sc = (4.0 * A**3) / (27.0 * (Dp**3) * kappa)
+    return np.where(kappa > 0, Sc, np.inf)
+
+
+def critical_supersaturation_coefficient(Dp, kappa, sigma=0.072):
+    """
+    Temperature-independent part of critical_supersaturation:
+    Sc(T) = coefficient / T**3. Lets a parcel loop precompute Sc once per population.
+    Dp and kappa may be NumPy arrays (one entry per size bin).
+    """
+    A_T = (4.0 * sigma * Mw) / (R * rho_w)  # A * T
+    if isinstance(Dp, _SCALAR) and isinstance(kappa, _SCALAR):
+        if kappa <= 0:
+            return float("inf")
+        return (4.0 * A_T**3) / (27.0 * (Dp**3) * kappa)
+
+    Dp = np.asarray(Dp)
+    kappa = np.asarray(kappa)
+    with np.errstate(divide="ignore"):
+        coeff = (4.0 * A_T**3) / (27.0 * (Dp**3) * kappa)
+    return np.where(kappa > 0, coeff, np.inf).astype(np.result_type(Dp, kappa), copy=False)
+
+
+@lru_cache(maxsize=COEFFICIENT_CACHE_SIZE)
+def _coefficient_cached(Dp, kappa, sigma):
+    return critical_supersaturation_coefficient(Dp, kappa, sigma)
+
+
+def critical_supersaturation_fast(Dp, kappa, sigma=0.072, T=298.15):
+    """
+    Scalar Sc(T) = coefficient(Dp, kappa, sigma) / T**3 with the coefficient
+    memoized per population (bounded LRU), for per-step activation checks.
+    Equal to critical_supersaturation up to round-off.
+    """
+    return _coefficient_cached(Dp, kappa, sigma) / T**3
+
+
+def clear_cache():
+    """
+    Drop all memoized A(T) values and Sc coefficients. Both caches are keyed
+    by sigma as well, so a sigma change never returns stale values.
     """
-    if kappa <= 0:
-        return float("inf")
-    A = (4.0 * sigma * Mw) / (R * T * rho_w)
-    Sc = (4.0 * A**3) / (27.0 * (Dp**3) * kappa)
-    return Sc
+    _kelvin_parameter_cached.cache_clear()
+    _coefficient_cached.cache_clear()
@@ -0,0 +1,659 @@
+# parcel.py
+# Reusable scalar parcel integrator with pluggable process terms
+
+import math
+
+import numpy as np
+
+from thermodynamics import saturation_vapor_pressure, supersaturation
+from kohler import critical_supersaturation_coefficient
+from aerosol import AerosolSpectrum
+from biological_in import check_ice_nucleation
+from profiling import profiled_steps
+
+
+class ParcelState:
+    """
+    Integration state of a single parcel (everything needed to continue a run).
+    """
+
+    __slots__ = (
+        "t", "T", "e", "es", "S", "qi",
+        "ice_active", "ice_onset_time", "ice_onset_T",
+        "S_peak", "t_peak",
+    )
+
+    def __init__(self, T, e):
+        self.t = 0.0
+        self.T = T
+        self.e = e
+        self.es = None
+        self.S = None
+        self.qi = 0.0
+        self.ice_active = False
+        self.ice_onset_time = None
+        self.ice_onset_T = None
+        self.S_peak = -999.0
+        self.t_peak = None
+
+
+# -----------------------
+# Process terms
+# -----------------------
+METHODS = ("euler", "exponential", "rk23")
+
+
+class ProcessTerm:
+    """
+    Base class for a process applied once per step, in registration order.
+
+    setup(sim) is called once before the loop (precompute invariants there).
+    apply(state, sim) is called after es, S and activation have been updated;
+    vapour sinks must use state.S / state.es (the pre-sink values).
+
+    The adaptive integrator does not call apply(). It calls update(state, sim)
+    at the start of each step (switches and diagnostics, no vapour removal),
+    tendency(S, es, state, sim) at every stage, returning (de/dt, dqi/dt),
+    and switch(T, S, state, sim) to detect a switch inside a trial step.
+
+    The exponential scheme also calls update(), then sums rate(state, sim),
+    the linear relaxation rate k (1/s) of a sink with de/dt = -k * S * es,
+    and hands each term the exact step integral of S * es via accumulate().
+
+    methods lists the integration methods a term supports; a term that only
+    implements apply() sets methods = ("euler",), and ParcelSimulation
+    rejects any other method before the first step.
+
+    Terms that carry state from step to step return it from checkpoint() as
+    {name: float or array} and take it back in restore(data), after setup()
+    (see checkpoint.py). parameters() returns the inputs that define the term
+    (by default its public scalar attributes); a snapshot is only restored
+    into a run whose terms have the same parameters.
+    """
+
+    methods = METHODS
+
+    def setup(self, sim):
+        pass
+
+    def apply(self, state, sim):
+        pass
+
+    def update(self, state, sim):
+        pass
+
+    def tendency(self, S, es, state, sim):
+        return 0.0, 0.0
+
+    def switch(self, T, S, state, sim):
+        return None
+
+    def rate(self, state, sim):
+        return 0.0
+
+    def accumulate(self, state, sim, S_es_integral):
+        pass
+
+    def checkpoint(self):
+        return {}
+
+    def restore(self, data):
+        pass
+
+    def parameters(self):
+        return {k: v for k, v in vars(self).items()
+                if not k.startswith("_") and isinstance(v, (bool, int, float, str))}
+
+
+def _remove_vapour(state, de):
+    state.e = state.e - de
+    if state.e < 0.0:
+        state.e = 0.0
+
+
+class INOnset(ProcessTerm):
+    """
+    Biological IN onset switch: sets state.ice_active once N_active >= N_threshold.
+    The threshold is inverted once per run to an onset temperature, so each
+    step is a single comparison instead of a logistic evaluation.
+    """
+
+    def __init__(self, bio_in, N_threshold=1.0):
+        self.bio_in = bio_in
+        self.N_threshold = N_threshold
+
+    def setup(self, sim):
+        self.T_onset = self.bio_in.onset_temperature(self.N_threshold)
+
+    def apply(self, state, sim):
+        self.update(state, sim)
+
+    def update(self, state, sim):
+        if not state.ice_active and state.T <= self.T_onset + 1e-6:
+            # Confirm with the logistic itself, so onset falls on exactly the
+            # same step as evaluating check_ice_nucleation every step
+            nucleated, N_active = check_ice_nucleation(state.T, self.bio_in, N_threshold=self.N_threshold)
+            if nucleated:
+                state.ice_active = True
+                state.ice_onset_time = state.t
+                state.ice_onset_T = state.T
+
+    def switch(self, T, S, state, sim):
+        return state.ice_active or check_ice_nucleation(T, self.bio_in, N_threshold=self.N_threshold)[0]
+
+    def parameters(self):
+        return {"N": self.bio_in.N, "T50": self.bio_in.T50, "width": self.bio_in.width,
+                "N_threshold": self.N_threshold}
+
+
+class LiquidRelaxation(ProcessTerm):
+    """
+    Liquid vapour relaxation: e -= k_relax * S * es * dt when supersaturated.
+    With require_activation=True the sink only acts once any population is activated.
+    """
+
+    def __init__(self, k_relax, require_activation=True):
+        self.k_relax = k_relax
+        self.require_activation = require_activation
+
+    def apply(self, state, sim):
+        if state.S > 0.0 and (not self.require_activation or sim.any_activated()):
+            _remove_vapour(state, self.k_relax * state.S * state.es * sim.dt)
+
+    def tendency(self, S, es, state, sim):
+        if S > 0.0 and (not self.require_activation or sim.any_activated()):
+            return -self.k_relax * S * es, 0.0
+        return 0.0, 0.0
+
+    def rate(self, state, sim):
+        if not self.require_activation or sim.any_activated():
+            return self.k_relax
+        return 0.0
+
+
+class SurfaceAreaSink(ProcessTerm):
+    """
+    Condensation sink scaled by the activated surface-area proxy sum(N * r^2),
+    normalised by sink_ref (default: N * r^2 of the first population, or the
+    whole of a first AerosolSpectrum). The last sink_norm is kept as a diagnostic.
+    """
+
+    def __init__(self, k_base, sink_ref=None):
+        self.k_base = k_base
+        self.sink_ref = sink_ref
+        self.sink_norm = 0.0
+
+    def setup(self, sim):
+        if self.sink_ref is not None:
+            self._sink_ref = self.sink_ref
+        elif not sim.populations:
+            self._sink_ref = 0.0
+        elif isinstance(sim.populations[0], AerosolSpectrum):
+            self._sink_ref = sim.populations[0].area_total
+        else:
+            self._sink_ref = sim.populations[0].N * (sim.populations[0].radius ** 2)
+
+    def apply(self, state, sim):
+        self.update(state, sim)
+        if state.S > 0.0:
+            _remove_vapour(state, self.k_base * self.sink_norm * state.S * state.es * sim.dt)
+
+    def update(self, state, sim):
+        sink_strength = sim.activated_area()
+        self.sink_norm = sink_strength / self._sink_ref if self._sink_ref > 0 else 0.0
+
+    def checkpoint(self):
+        return {"sink_norm": self.sink_norm}
+
+    def restore(self, data):
+        self.sink_norm = float(data["sink_norm"])
+
+    def parameters(self):
+        return {"k_base": self.k_base, "sink_ref": self.sink_ref}
+
+    def tendency(self, S, es, state, sim):
+        if S > 0.0:
+            return -self.k_base * self.sink_norm * S * es, 0.0
+        return 0.0, 0.0
+
+    def rate(self, state, sim):
+        return self.k_base * self.sink_norm
+
+
+class IceDeposition(ProcessTerm):
+    """
+    Ice deposition sink (active after IN onset) plus the simple qi growth proxy.
+    """
+
+    def __init__(self, k_ice, qi_growth_coeff=0.0):
+        self.k_ice = k_ice
+        self.qi_growth_coeff = qi_growth_coeff
+
+    def apply(self, state, sim):
+        if state.ice_active and state.S > 0.0:
+            _remove_vapour(state, self.k_ice * state.S * state.es * sim.dt)
+            state.qi += self.qi_growth_coeff * state.S * state.es * sim.dt
+
+    def tendency(self, S, es, state, sim):
+        if state.ice_active and S > 0.0:
+            return -self.k_ice * S * es, self.qi_growth_coeff * S * es
+        return 0.0, 0.0
+
+    def rate(self, state, sim):
+        return self.k_ice if state.ice_active else 0.0
+
+    def accumulate(self, state, sim, S_es_integral):
+        if state.ice_active:
+            state.qi += self.qi_growth_coeff * S_es_integral
+
+
+# -----------------------
+# Simulation core
+# -----------------------
+class ParcelSimulation:
+    """
+    Ascending parcel cooled at a prescribed rate.
+
+    Each step: es(T) (once), S, activation of all populations, registered
+    process terms in order, S after sinks, peak tracking, optional callback,
+    then cooling.
+
+    Parameters
+    ----------
+    T0 : float
+        Initial temperature (K)
+    RH0 : float
+        Initial relative humidity (0-1)
+    cooling_rate : float
+        Cooling rate (K/s)
+    populations : list of AerosolPopulation / AerosolSpectrum
+        Liquid CCN populations (their .activated flags are updated every step;
+        a spectrum is activated in one vectorized call for all of its bins)
+    processes : list of ProcessTerm
+        Process terms, applied in order
+    dt, t_end : float
+        Time step and end time (s)
+    """
+
+    # es(T); an instance attribute overrides it when profiling
+    _es = staticmethod(saturation_vapor_pressure)
+    profiler = None
+
+    def __init__(self, T0, RH0, cooling_rate, populations=(), processes=(), dt=1.0, t_end=600.0):
+        self.T0 = T0
+        self.RH0 = RH0
+        self.cooling_rate = cooling_rate
+        self.populations = list(populations)
+        self.processes = []
+        self.dt = dt
+        self.t_end = t_end
+        for term in processes:
+            self.add_process(term)
+
+    def add_process(self, term):
+        """
+        Register a process term (applied after those already registered).
+        """
+        self.processes.append(term)
+        return term
+
+    def any_activated(self):
+        for pop in self._bulk:
+            if pop.activated:
+                return True
+        for spectrum in self._spectra:
+            if spectrum.N_activated > 0.0:
+                return True
+        return False
+
+    def activated_area(self):
+        """
+        Surface-area proxy sum(N * r^2) over activated populations and bins.
+        """
+        total = 0.0
+        for pop, area in zip(self._bulk, self._areas):
+            if pop.activated:
+                total += area
+        for spectrum in self._spectra:
+            total += spectrum.area_activated
+        return total
+
+    def _setup(self):
+        # Invariants: Sc(T) = coeff / T**3 per population, N * r^2, cooling per step
+        self._spectra = [pop for pop in self.populations if isinstance(pop, AerosolSpectrum)]
+        self._bulk = [pop for pop in self.populations if not isinstance(pop, AerosolSpectrum)]
+        self._sc_coeffs = [
+            critical_supersaturation_coefficient(2.0 * pop.radius, pop.kappa)
+            for pop in self._bulk
+        ]
+        self._areas = [pop.N * (pop.radius ** 2) for pop in self._bulk]
+        self._dT = self.cooling_rate * self.dt
+        for pop in self._bulk:
+            pop.activated = False
+        for spectrum in self._spectra:
+            spectrum.activate(-1.0)
+        for term in self.processes:
+            term.setup(self)
+        self.state = ParcelState(self.T0, self.RH0 * self._es(self.T0))
+        self.n_steps = 0
+        self.n_rejected = 0
+        self.n_rhs = 0
+
+    def _activate(self, S, T):
+        T3 = T**3
+        for pop, coeff in zip(self._bulk, self._sc_coeffs):
+            pop.activated = (S >= coeff / T3)
+        for spectrum in self._spectra:
+            spectrum.activate(S, T)
+
+    def _track_peak(self, state):
+        if state.S > state.S_peak:
+            state.S_peak = state.S
+            state.t_peak = state.t
+
+    def step(self):
+        """
+        Advance the parcel by one fixed (explicit Euler) time step.
+        """
+        state = self.state
+        es = self._es(state.T)
+        state.es = es
+        state.S = supersaturation(state.e, es)
+
+        # Liquid activation
+        self._activate(state.S, state.T)
+
+        for term in self.processes:
+            term.apply(state, self)
+
+        # S after sinks (es unchanged: T only changes at the end of the step)
+        state.S = supersaturation(state.e, es)
+        self._track_peak(state)
+        self.n_steps += 1
+
+    def _sink_rate(self, state):
+        K = 0.0
+        for term in self.processes:
+            K += term.rate(state, self)
+        return K
+
+    def step_exponential(self, h):
+        """
+        Advance the parcel from t to t + h (including cooling), solving the
+        relaxation sinks exactly.
+
+        With x = e - es, cooling as a constant forcing g = (es(t) - es(t+h)) / h
+        and all sinks together giving de/dt = -K * x (K = sum of term rates,
+        switches frozen at the start of the step):
+
+            dx/dt = -K * x + g  ->  x(h) = x0 * exp(-K h) + g / K * (1 - exp(-K h))
+
+        x relaxes monotonically towards g / K (the quasi-steady S * es), so S
+        stays non-negative and non-oscillating for any h, and the sinks see
+        the cooling inside the step instead of after it. A sub-saturated start
+        is integrated without sinks up to the S = 0 crossing, then with the
+        sinks switched on by activation at the predicted end-of-step S.
+        """
+        state = self.state
+        es = self._es(state.T)
+        state.es = es
+        state.S = supersaturation(state.e, es)
+
+        # Liquid activation, IN onset and other switches at the start of the step
+        self._activate(state.S, state.T)
+        for term in self.processes:
+            term.update(state, self)
+
+        T_end = state.T - self.cooling_rate * h
+        es_end = self._es(T_end)
+        g = (es - es_end) / h
+        x0 = state.e - es
+
+        # Time without sinks: all of the step if sub-saturated throughout
+        tau = h
+        K = 0.0
+        if x0 > 0.0:
+            tau = 0.0
+            K = self._sink_rate(state)
+        elif g > 0.0 and x0 + g * h > 0.0:
+            tau = -x0 / g
+            self._activate(supersaturation(state.e, es_end), T_end)
+            for term in self.processes:
+                term.update(state, self)
+            K = self._sink_rate(state)
+
+        if K > 0.0:
+            x = max(x0 + g * tau, 0.0)
+            h_sink = h - tau
+            if g < 0.0 and x * K + g < 0.0:
+                # Warming: sinks stop where x reaches 0
+                h_sink = min(h_sink, math.log1p(-x * K / g) / K)
+            one_minus_decay = -math.expm1(-K * h_sink)
+            x_integral = x * one_minus_decay / K + g * (h_sink - one_minus_decay / K) / K
+            removed = K * x_integral
+            state.e = max(state.e - removed, 0.0)
+            for term in self.processes:
+                term.accumulate(state, self, x_integral)
+
+        state.t = state.t + h
+        state.T = T_end
+        state.es = es_end
+        state.S = supersaturation(state.e, es_end)
+        self._track_peak(state)
+        self.n_steps += 1
+
+    def run(self, callback=None, method="euler", profile=False, **options):
+        """
+        Integrate from t = 0 to t_end. callback(state), if given, is called
+        at every point yielded by steps() (see there for each method).
+
+        method : "euler" (fixed dt, default), "exponential" (fixed dt, exact
+        relaxation sinks, see step_exponential) or "rk23" (adaptive, see
+        run_adaptive; options are passed on to it).
+        profile : record call counts and time per kernel / process term
+        (see profiling.StepProfiler); off by default and then free.
+
+        Returns a summary dict: S_peak, t_peak, ice_onset_time, ice_onset_T, qi,
+        n_steps (and n_rejected, n_rhs for adaptive runs, profile if profiled).
+        """
+        if callback is None:
+            for _ in self.steps(method, profile=profile, **options):
+                pass
+        else:
+            for state in self.steps(method, profile=profile, **options):
+                callback(state)
+        return self.summary()
+
+    def steps(self, method="euler", profile=False, **options):
+        """
+        Generator form of run(): yields the live ParcelState (updated in
+        place, so copy what you keep) at each output point, and leaves the
+        summary available from summary() once exhausted.
+
+        "euler"       : every step, after the sinks and before cooling
+        "exponential" : t = 0 and the end of every step
+        "rk23"        : t = 0 and every accepted step
+
+        "euler" takes checkpoint=Checkpointer(...) (see checkpoint.py) to
+        resume from and periodically write state snapshots.
+        With profile=True the run is instrumented (sim.profiler).
+        """
+        if method not in METHODS:
+            raise ValueError(f"Unknown method: {method!r}")
+        for term in self.processes:
+            if method not in term.methods:
+                raise ValueError(f"{type(term).__name__} supports methods {term.methods}, got method={method!r}")
+        if method == "rk23":
+            steps = self._adaptive_steps(**options)
+        elif method == "exponential":
+            steps = self._exponential_steps()
+        else:
+            steps = self._euler_steps(**options)
+        if profile:
+            return profiled_steps(self, steps)
+        self.profiler = None
+        return steps
+
+    def _euler_steps(self, checkpoint=None):
+        self._setup()
+        if checkpoint is not None:
+            checkpoint.restore(self)
+        state = self.state
+        while state.t <= self.t_end:
+            self.step()
+            yield state
+            state.T = state.T - self._dT
+            state.t = state.t + self.dt
+            if checkpoint is not None:
+                checkpoint.after_step(self)
+
+    def run_exponential(self, callback=None):
+        """
+        Fixed-step integration with step_exponential; the last step is
+        shortened to end exactly at t_end.
+        """
+        return self.run(callback=callback, method="exponential")
+
+    def _exponential_steps(self):
+        self._setup()
+        state = self.state
+        state.es = self._es(state.T)
+        state.S = supersaturation(state.e, state.es)
+        self._track_peak(state)
+        yield state
+        while self.t_end - state.t > 1e-9 * self.dt:
+            self.step_exponential(min(self.dt, self.t_end - state.t))
+            yield state
+
+    # -----------------------
+    # Adaptive integration (Bogacki-Shampine RK3(2))
+    # -----------------------
+    def _rhs(self, t, e, state):
+        """
+        de/dt and dqi/dt at time t (T is linear in t), switches frozen.
+        """
+        T = self.T0 - self.cooling_rate * t
+        es = self._es(T)
+        S = supersaturation(e, es)
+        de_dt = 0.0
+        dqi_dt = 0.0
+        for term in self.processes:
+            de, dqi = term.tendency(S, es, state, self)
+            de_dt += de
+            dqi_dt += dqi
+        self.n_rhs += 1
+        return de_dt, dqi_dt
+
+    def _switches(self, T, S, state):
+        """
+        Everything that changes the right-hand side discontinuously:
+        activation, S > 0 and term switches such as IN onset.
+        """
+        T3 = T**3
+        key = [S >= coeff / T3 for coeff in self._sc_coeffs]
+        for spectrum in self._spectra:
+            key.append(int(np.count_nonzero(S >= spectrum.critical_supersaturation(T))))
+        key.append(S > 0.0)
+        for term in self.processes:
+            key.append(term.switch(T, S, state, self))
+        return key
+
+    def run_adaptive(self, callback=None, rtol=1e-3, atol=1e-7, h_max=None, t_event=0.01):
+        """
+        Adaptive integration of the continuous vapour/temperature system
+
+            dT/dt = -cooling_rate,   de/dt = sum of term tendencies,
+
+        which the fixed-step loop approaches as dt -> 0. An embedded RK3(2) pair
+        estimates the local error of S; steps are accepted when
+        |err_S| <= atol + rtol * |S| and resized accordingly (dt is the first step).
+
+        Switches (activation, S crossing 0, IN onset) and S peaks (S falling by
+        more than the error tolerance after rising) are located by halving a
+        trial step that crosses them until it is shorter than t_event (s), so
+        long sub-saturated stretches take large steps while activation, peak S
+        and ice onset are resolved to t_event.
+
+        callback(state) is called at t = 0 and after every accepted step.
+        """
+        return self.run(callback=callback, method="rk23", rtol=rtol, atol=atol,
+                        h_max=h_max, t_event=t_event)
+
+    def _adaptive_steps(self, rtol=1e-3, atol=1e-7, h_max=None, t_event=0.01):
+        self._setup()
+        state = self.state
+        h_max = self.t_end if h_max is None else h_max
+        h = min(self.dt, h_max)
+        rising = True
+
+        while True:
+            es = self._es(state.T)
+            state.es = es
+            state.S = supersaturation(state.e, es)
+            self._activate(state.S, state.T)
+            for term in self.processes:
+                term.update(state, self)
+            self._track_peak(state)
+            yield state
+            if state.t >= self.t_end:
+                break
+
+            t, e, qi = state.t, state.e, state.qi
+            start = self._switches(state.T, state.S, state)
+            k1 = self._rhs(t, e, state)
+
+            while True:
+                h = min(h, self.t_end - t)
+                k2 = self._rhs(t + 0.5 * h, e + 0.5 * h * k1[0], state)
+                k3 = self._rhs(t + 0.75 * h, e + 0.75 * h * k2[0], state)
+                e_new = e + h * (2.0 / 9.0 * k1[0] + 1.0 / 3.0 * k2[0] + 4.0 / 9.0 * k3[0])
+                qi_new = qi + h * (2.0 / 9.0 * k1[1] + 1.0 / 3.0 * k2[1] + 4.0 / 9.0 * k3[1])
+                k4 = self._rhs(t + h, e_new, state)
+                err_e = h * (-5.0 / 72.0 * k1[0] + 1.0 / 12.0 * k2[0] + 1.0 / 9.0 * k3[0] - 1.0 / 8.0 * k4[0])
+
+                T_new = self.T0 - self.cooling_rate * (t + h)
+                es_new = self._es(T_new)
+                S_new = supersaturation(e_new, es_new)
+                tol = atol + rtol * max(abs(S_new), abs(state.S))
+                err = abs(err_e / es_new) / tol
+
+                if err > 1.0:
+                    self.n_rejected += 1
+                    h = h * max(0.2, 0.9 * err ** (-1.0 / 3.0))
+                    continue
+
+                if h > t_event and (
+                    (rising and S_new < state.S - tol)
+                    or self._switches(T_new, S_new, state) != start
+                ):
+                    self.n_rejected += 1
+                    h = max(0.5 * h, t_event)
+                    continue
+                break
+
+            rising = S_new >= state.S
+            state.t = t + h
+            state.T = T_new
+            state.e = max(e_new, 0.0)
+            state.qi = qi_new
+            self.n_steps += 1
+
+            factor = 5.0 if err == 0.0 else min(5.0, 0.9 * err ** (-1.0 / 3.0))
+            h = min(h * factor, h_max)
+
+    def summary(self):
+        state = self.state
+        result = {
+            "S_peak": state.S_peak,
+            "t_peak": state.t_peak,
+            "ice_onset_time": state.ice_onset_time,
+            "ice_onset_T": state.ice_onset_T,
+            "qi": state.qi,
+            "n_steps": self.n_steps,
+        }
+        if self.n_rhs:
+            result["n_rejected"] = self.n_rejected
+            result["n_rhs"] = self.n_rhs
+        if self.profiler is not None:
+            result["profile"] = self.profiler.as_dict()
+        return result
@@ -1,18 +1,14 @@
-import matplotlib.pyplot as plt
+# plot_bioIN_onset.py
+# Biological IN: ice onset time vs updraft velocity
+# Rendered headless (Agg) from the stored model results in results/ by the
+# figure pipeline; the first run computes and stores them (see figures.py)
 
-# Data from run_bioIN_onset.py output
-updraft_velocity = [0.2, 0.5, 1.0, 2.0]   # m/s
-onset_time = [1109, 444, 222, 111]        # seconds
+from figures import render_figure
 
-plt.figure(figsize=(6, 4))
-plt.plot(updraft_velocity, onset_time, marker='o', linewidth=2)
 
-plt.xlabel("Updraft velocity (m s$^{-1}$)")
-plt.ylabel("Ice onset time (s)")
-plt.title("Biological IN: Ice onset time vs updraft velocity")
+def main():
+    print("Figure saved:", render_figure("bioIN_onset"))
 
-plt.grid(True)
-plt.tight_layout()
 
-plt.savefig("bioIN_onset_vs_updraft.png", dpi=300)
-plt.show()
+if __name__ == "__main__":
+    main()
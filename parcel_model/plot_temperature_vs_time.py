@@ -1,30 +1,14 @@
-import matplotlib.pyplot as plt
-import numpy as np
+# plot_temperature_vs_time.py
+# Parcel temperature evolution T(t)
+# Rendered headless (Agg) from the stored model results in results/ by the
+# figure pipeline; the first run computes and stores them (see figures.py)
 
-def main():
-    # Time setup
-    dt = 1.0          # seconds
-    t_end = 1200.0    # seconds
-    t = np.arange(0, t_end + dt, dt)
-
-    # Initial temperature
-    T0 = 273.15       # K
-    w = 1.0           # m/s
-    cooling_rate = 0.01 * w  # K/s
+from figures import render_figure
 
-    # Temperature evolution
-    T = T0 - cooling_rate * t
 
-    # Plot
-    plt.figure()
-    plt.plot(t, T)
-    plt.xlabel("Time (s)")
-    plt.ylabel("Temperature (K)")
-    plt.title("Parcel temperature evolution T(t)")
-    plt.tight_layout()
-    plt.savefig("temperature_vs_time.png", dpi=200)
+def main():
+    print("Figure saved:", render_figure("temperature"))
 
-    print("Saved: temperature_vs_time.png")
 
 if __name__ == "__main__":
     main()
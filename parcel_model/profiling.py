@@ -0,0 +1,155 @@
+# profiling.py
+# Opt-in instrumentation of the parcel step loop: call counts and wall time per
+# kernel / process term, sub- vs supersaturated steps, and a cProfile helper
+#
+# Enabled per run with ParcelSimulation.run(..., profile=True); the counters are
+# attached to the summary as result["profile"]. Disabled runs are not touched.
+
+import contextlib
+import cProfile
+import io
+import json
+import pstats
+import sys
+from collections import defaultdict
+from time import perf_counter
+
+
+# Process-term methods timed when present on the term's class
+TERM_METHODS = ("apply", "update", "tendency", "rate", "accumulate", "switch")
+
+
+class StepProfiler:
+    """
+    Counters for one run. Times are inclusive (a term method calling another
+    timed method counts both), "output" is the time spent in the callback or
+    sinks between steps, and "total" is the wall time of the whole run.
+    """
+
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.time = defaultdict(float)
+        self.steps = 0
+        self.steps_subsaturated = 0
+        self.steps_supersaturated = 0
+        self.wall_time = 0.0
+
+    def timed(self, name, func):
+        calls, time = self.calls, self.time
+
+        def wrapper(*args, **kwargs):
+            t0 = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                time[name] += perf_counter() - t0
+                calls[name] += 1
+
+        return wrapper
+
+    def instrument(self, sim):
+        """
+        Wrap es evaluation, activation and the process-term methods of sim
+        with timers (as instance attributes). Returns a function undoing it.
+        """
+        patched = []
+
+        def patch(obj, attr, name):
+            setattr(obj, attr, self.timed(name, getattr(obj, attr)))
+            patched.append((obj, attr))
+
+        patch(sim, "_es", "saturation_vapor_pressure")
+        patch(sim, "_activate", "activation")
+
+        seen = defaultdict(int)
+        for term in sim.processes:
+            label = type(term).__name__
+            seen[label] += 1
+            if seen[label] > 1:
+                label = f"{label}[{seen[label] - 1}]"
+            for method in TERM_METHODS:
+                if method in vars(type(term)):
+                    patch(term, method, f"{label}.{method}")
+
+        def restore():
+            for obj, attr in patched:
+                delattr(obj, attr)
+
+        return restore
+
+    def count(self, state):
+        self.steps += 1
+        if state.S > 0.0:
+            self.steps_supersaturated += 1
+        else:
+            self.steps_subsaturated += 1
+
+    def as_dict(self):
+        return {
+            "steps": self.steps,
+            "steps_subsaturated": self.steps_subsaturated,
+            "steps_supersaturated": self.steps_supersaturated,
+            "wall_time": self.wall_time,
+            "calls": dict(self.calls),
+            "time": dict(self.time),
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.as_dict(), **kwargs)
+
+    def report(self, file=None):
+        """
+        Print a table of calls and time per timed function, largest first.
+        """
+        file = sys.stdout if file is None else file
+        print(f"steps: {self.steps} ({self.steps_supersaturated} supersaturated, "
+              f"{self.steps_subsaturated} subsaturated)   wall time: {self.wall_time * 1e3:.3f} ms", file=file)
+        print(f"{'function':40s} {'calls':>8s} {'time (ms)':>11s} {'share':>7s}", file=file)
+        for name, t in sorted(self.time.items(), key=lambda item: -item[1]):
+            share = t / self.wall_time if self.wall_time > 0.0 else 0.0
+            print(f"{name:40s} {self.calls[name]:8d} {t * 1e3:11.3f} {share:7.1%}", file=file)
+
+
+def profiled_steps(sim, steps):
+    """
+    Wrap a ParcelSimulation step generator: instrument sim for the duration
+    of the run, count steps and time the consumer between steps ("output").
+    The profiler is available as sim.profiler.
+    """
+    profiler = StepProfiler()
+    sim.profiler = profiler
+    restore = profiler.instrument(sim)
+    t_start = perf_counter()
+    try:
+        for state in steps:
+            profiler.count(state)
+            t0 = perf_counter()
+            yield state
+            profiler.time["output"] += perf_counter() - t0
+            profiler.calls["output"] += 1
+    finally:
+        profiler.wall_time = perf_counter() - t_start
+        restore()
+
+
+@contextlib.contextmanager
+def cprofile(sort="cumulative", limit=25, file=None, output=None):
+    """
+    Run the enclosed block under cProfile, then print the top `limit`
+    entries sorted by `sort` (to file, default stdout) and optionally dump
+    raw stats to `output` (for snakeviz / pstats).
+
+        with cprofile():
+            run_case(1.0)
+    """
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield profile
+    finally:
+        profile.disable()
+        if output is not None:
+            profile.dump_stats(output)
+        stream = io.StringIO()
+        pstats.Stats(profile, stream=stream).sort_stats(sort).print_stats(limit)
+        print(stream.getvalue(), file=sys.stdout if file is None else file)
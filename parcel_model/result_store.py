@@ -0,0 +1,246 @@
+# result_store.py
+# Columnar result store: per-run time series and sweep summary tables as .npy
+# columns (memory-mapped on read), indexed by run parameters
+
+import hashlib
+import json
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from sweep import to_json
+
+
+SERIES_FIELDS = ("t", "T", "S", "qi")
+
+
+def run_id(params):
+    """
+    Stable identifier for a set of run parameters (dict).
+    """
+    text = json.dumps(to_json(params), sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+def _matches(params, query):
+    return all(k in params and params[k] == v for k, v in query.items())
+
+
+class SeriesWriter:
+    """
+    Preallocated memory-mapped columns for one run's time series.
+
+    Use append(**values) per step, or pass the writer itself as the
+    ParcelSimulation callback (fields are read from ParcelState attributes).
+    Capacity doubles if exceeded. The run is registered in the store index
+    on close().
+    """
+
+    def __init__(self, store, params, capacity, fields=SERIES_FIELDS, dtype=np.float64):
+        self.store = store
+        self.params = to_json(params)
+        self.run_id = run_id(params)
+        self.fields = tuple(fields)
+        self.dtype = np.dtype(dtype)
+        self.length = 0
+        self._dir = os.path.join(store.root, "series", self.run_id)
+        os.makedirs(self._dir, exist_ok=True)
+        self.columns = {f: self._open(f, max(int(capacity), 1)) for f in self.fields}
+
+    def _open(self, field, capacity):
+        path = os.path.join(self._dir, f"{field}.npy")
+        return open_memmap(path, mode="w+", dtype=self.dtype, shape=(capacity,))
+
+    def _grow(self):
+        capacity = 2 * len(self.columns[self.fields[0]])
+        for f in self.fields:
+            old = np.array(self.columns[f][:self.length])
+            del self.columns[f]
+            self.columns[f] = self._open(f, capacity)
+            self.columns[f][:self.length] = old
+
+    def append(self, **values):
+        if self.length == len(self.columns[self.fields[0]]):
+            self._grow()
+        i = self.length
+        for f in self.fields:
+            self.columns[f][i] = values[f]
+        self.length = i + 1
+
+    def __call__(self, state):
+        if self.length == len(self.columns[self.fields[0]]):
+            self._grow()
+        i = self.length
+        for f in self.fields:
+            self.columns[f][i] = getattr(state, f)
+        self.length = i + 1
+
+    def close(self):
+        for column in self.columns.values():
+            column.flush()
+        self.columns = {}
+        self.store._register("series", self.run_id, {
+            "params": self.params,
+            "fields": list(self.fields),
+            "length": self.length,
+        })
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class ResultStore:
+    """
+    Directory of .npy columns plus a JSON index:
+
+    root/index.json               run parameters, fields and lengths
+    root/series/<run_id>/<f>.npy  time series of one run
+    root/tables/<name>/<c>.npy    summary table (one row per case)
+
+    Reads return memory-mapped arrays, so plots and analysis can slice long
+    series or large sweeps lazily without re-running the model.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(os.path.join(root, "series"), exist_ok=True)
+        os.makedirs(os.path.join(root, "tables"), exist_ok=True)
+        self._index_path = os.path.join(root, "index.json")
+        if os.path.exists(self._index_path):
+            with open(self._index_path) as f:
+                self.index = json.load(f)
+        else:
+            self.index = {"series": {}, "tables": {}}
+
+    def _register(self, kind, key, entry):
+        self.index[kind][key] = entry
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.index, f, indent=1)
+        os.replace(tmp, self._index_path)
+
+    # -----------------------
+    # Time series
+    # -----------------------
+    def series_writer(self, params, capacity, fields=SERIES_FIELDS, dtype=np.float64):
+        """
+        SeriesWriter for a run identified by params (dict), with room for
+        capacity steps (e.g. int(t_end / dt) + 1).
+        """
+        return SeriesWriter(self, params, capacity, fields=fields, dtype=dtype)
+
+    def write_series(self, params, **columns):
+        """
+        Store complete time series given as equal-length sequences,
+        e.g. write_series({"w": 1.0}, t=times, S=S_series, qi=qi_series).
+        """
+        arrays = {f: np.asarray(v, dtype=float) for f, v in columns.items()}
+        length = len(next(iter(arrays.values())))
+        with self.series_writer(params, length, fields=tuple(arrays)) as writer:
+            for f, a in arrays.items():
+                writer.columns[f][:length] = a
+            writer.length = length
+        return writer.run_id
+
+    def series(self, params, mmap_mode="r"):
+        """
+        Time series of one run as {field: array}, looked up by params (dict)
+        or run_id (str). Arrays are memory-mapped unless mmap_mode=None.
+        """
+        key = params if isinstance(params, str) else run_id(params)
+        entry = self.index["series"].get(key)
+        if entry is None:
+            raise KeyError(f"No stored series for {params!r}")
+        directory = os.path.join(self.root, "series", key)
+        return {
+            f: np.load(os.path.join(directory, f"{f}.npy"), mmap_mode=mmap_mode)[:entry["length"]]
+            for f in entry["fields"]
+        }
+
+    def find(self, **query):
+        """
+        (run_id, params) of stored series whose parameters match query.
+        """
+        return [(key, entry["params"]) for key, entry in self.index["series"].items()
+                if _matches(entry["params"], query)]
+
+    # -----------------------
+    # Summary tables
+    # -----------------------
+    def write_table(self, name, **columns):
+        """
+        Store a columnar table: every column is a 1-D sequence with one entry
+        per row. None entries become NaN.
+        """
+        directory = os.path.join(self.root, "tables", name)
+        os.makedirs(directory, exist_ok=True)
+        n_rows = None
+        for c, values in columns.items():
+            if not isinstance(values, np.ndarray):
+                values = [np.nan if v is None else v for v in values]
+            a = np.asarray(values)
+            if a.dtype == object or a.ndim != 1:
+                raise ValueError(f"Column {c!r} must be a 1-D numeric, bool or string sequence")
+            if n_rows is not None and len(a) != n_rows:
+                raise ValueError(f"Column {c!r} has {len(a)} rows, expected {n_rows}")
+            n_rows = len(a)
+            np.save(os.path.join(directory, f"{c}.npy"), a)
+        self._register("tables", name, {"columns": list(columns), "n_rows": n_rows or 0})
+
+    def open_table(self, name, n_rows, dtypes):
+        """
+        Preallocated memory-mapped table for filling in place (e.g. chunk by
+        chunk from a streaming run): {column: writable array of n_rows}.
+        dtypes maps column names to dtypes; float columns start as NaN. The
+        table is registered at once, so partial fills are readable.
+        """
+        directory = os.path.join(self.root, "tables", name)
+        os.makedirs(directory, exist_ok=True)
+        columns = {}
+        for c, dtype in dtypes.items():
+            a = open_memmap(os.path.join(directory, f"{c}.npy"), mode="w+", dtype=dtype, shape=(n_rows,))
+            if a.dtype.kind == "f":
+                a[:] = np.nan
+            columns[c] = a
+        self._register("tables", name, {"columns": list(dtypes), "n_rows": n_rows})
+        return columns
+
+    def write_sweep(self, name, rows, result_names):
+        """
+        Store run_sweep output [(params, result), ...] as a table with one
+        column per parameter and one per element of result (named by
+        result_names, or dict keys if result is a dict).
+        """
+        param_names = list(rows[0][0]) if rows else []
+        columns = {p: [params[p] for params, _ in rows] for p in param_names}
+        for i, r in enumerate(result_names):
+            if r in columns:
+                raise ValueError(f"Result column {r!r} clashes with a parameter name")
+            columns[r] = [res[r] if isinstance(res, dict) else res[i] for _, res in rows]
+        self.write_table(name, **columns)
+
+    def table(self, name, mmap_mode="r"):
+        """
+        Summary table as {column: array} (memory-mapped unless mmap_mode=None).
+        """
+        entry = self.index["tables"].get(name)
+        if entry is None:
+            raise KeyError(f"No stored table {name!r}")
+        directory = os.path.join(self.root, "tables", name)
+        return {c: np.load(os.path.join(directory, f"{c}.npy"), mmap_mode=mmap_mode)
+                for c in entry["columns"]}
+
+    def select(self, name, **query):
+        """
+        Boolean row mask of table name where every queried column equals its value.
+        """
+        table = self.table(name)
+        mask = np.ones(self.index["tables"][name]["n_rows"], dtype=bool)
+        for c, v in query.items():
+            mask &= table[c] == v
+        return mask
@@ -1,4 +1,4 @@
-from biological_in import BiologicalIN, check_ice_nucleation
+from biological_in import BiologicalIN
 
 
 def run_case(cooling_rate, label):
@@ -13,24 +13,10 @@ def run_case(cooling_rate, label):
         width=2.0
     )
 
-    t = 0.0
-    T = T0
-
-    onset_time = None
-    onset_T = None
-    onset_Nactive = None
-
-    while t <= t_end:
-        nucleated, N_active = check_ice_nucleation(T, bio, N_threshold=1.0)
-        if nucleated:
-            onset_time = t
-            onset_T = T
-            onset_Nactive = N_active
-            break
-
-        # cool parcel
-        T = T - cooling_rate * dt
-        t += dt
+    # Closed-form onset at the first 1 s step where N_active >= threshold
+    # (same result as stepping T down and calling check_ice_nucleation)
+    onset_time, onset_T = bio.onset(T0, cooling_rate, N_threshold=1.0, t_end=t_end, dt=dt)
+    onset_Nactive = None if onset_time is None else bio.active_IN_number(onset_T)
 
     return onset_time, onset_T, onset_Nactive
 
@@ -0,0 +1,256 @@
+# run_cache.py
+# Content-addressed on-disk cache of parcel runs with a size cap and LRU eviction
+#
+#   from run_cache import cached
+#   run_case = cached(ignore=("label", "verbose"))(run_mixed_phase_minimal.run_case)
+#
+# The key hashes the function name, every argument (defaults included; aerosol /
+# IN objects by their attributes, arrays by their bytes) and the code version,
+# so editing any model module invalidates earlier results.
+
+import functools
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import types
+
+import numpy as np
+
+
+DEFAULT_CACHE_DIR = ".parcel_cache"
+DEFAULT_MAX_BYTES = 512 * 1024**2
+
+_MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+_code_version = None
+
+
+def code_version():
+    """
+    Hash of the model sources (all .py files here except test_* and plot_*).
+    """
+    global _code_version
+    if _code_version is None:
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(_MODEL_DIR, "*.py"))):
+            name = os.path.basename(path)
+            if name.startswith(("test_", "plot_")):
+                continue
+            digest.update(name.encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        _code_version = digest.hexdigest()[:16]
+    return _code_version
+
+
+def _code_digest(code):
+    """
+    Hash of a code object's bytecode, constants (nested code recursively)
+    and referenced names; stable across processes.
+    """
+    digest = hashlib.sha256(code.co_code)
+    for const in code.co_consts:
+        digest.update((_code_digest(const) if isinstance(const, types.CodeType) else repr(const)).encode())
+    digest.update(repr(code.co_names).encode())
+    return digest.hexdigest()
+
+
+def _cell_value(cell):
+    try:
+        return cell.cell_contents
+    except ValueError:  # cell not yet filled
+        return None
+
+
+def canonical(value):
+    """
+    JSON-serializable canonical form of an argument for hashing: objects by
+    class name and attributes, arrays by dtype, shape and content hash,
+    functions by name, code, defaults and closure values.
+    """
+    if value is None or isinstance(value, (bool, int, str)):
+        return value
+    if isinstance(value, float):
+        return repr(value)  # exact, and distinguishes 1.0 from 1
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return {"ndarray": str(data.dtype), "shape": list(data.shape),
+                "sha256": hashlib.sha256(data.tobytes()).hexdigest()}
+    if isinstance(value, np.generic):
+        return canonical(value.item())
+    if isinstance(value, dict):
+        return {str(k): canonical(v) for k, v in sorted(value.items(), key=lambda kv: str(kv[0]))}
+    if isinstance(value, (list, tuple)):
+        return [type(value).__name__] + [canonical(v) for v in value]
+    if callable(value) and hasattr(value, "__qualname__"):
+        key = {"callable": f"{getattr(value, '__module__', None)}.{value.__qualname__}"}
+        if isinstance(value, types.MethodType):
+            key["self"] = canonical(value.__self__)
+            value = value.__func__
+        if isinstance(value, types.FunctionType):
+            # Every <lambda> and every closure of a factory shares its qualname:
+            # key on the code, defaults and captured values as well
+            key["code"] = _code_digest(value.__code__)
+            key["defaults"] = canonical(value.__defaults__)
+            key["kwdefaults"] = canonical(value.__kwdefaults__)
+            key["closure"] = canonical([_cell_value(c) for c in value.__closure__ or ()])
+        return key
+
+    attrs = getattr(value, "__dict__", None)
+    if attrs is None:
+        slots = [s for cls in type(value).__mro__ for s in getattr(cls, "__slots__", ())]
+        attrs = {s: getattr(value, s) for s in slots if hasattr(value, s)}
+    # Flags set during a run (e.g. AerosolPopulation.activated) are outputs, not inputs
+    attrs = {k: v for k, v in attrs.items() if k != "activated"}
+    return {"object": type(value).__qualname__, "attrs": canonical(attrs)}
+
+
+def make_key(name, arguments, version=None):
+    """
+    Stable hex key for a call: name, canonical arguments and code version.
+    """
+    payload = json.dumps(
+        [name, canonical(arguments), code_version() if version is None else version],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class RunCache:
+    """
+    Pickled results in root/<key[:2]>/<key>.pkl. Reads refresh the file's
+    modification time; when a write takes the total size over max_bytes the
+    least recently used entries are removed.
+    """
+
+    def __init__(self, root=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root or os.environ.get("PARCEL_CACHE_DIR", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key + ".pkl")
+
+    def get(self, key, default=None):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            self.misses += 1
+            return default
+        os.utime(path)
+        self.hits += 1
+        return value
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self.evict()
+
+    def entries(self):
+        """
+        (mtime, size, path) of every cached result, oldest first.
+        """
+        out = []
+        for path in glob.glob(os.path.join(self.root, "*", "*.pkl")):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            out.append((st.st_mtime, st.st_size, path))
+        return sorted(out)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        self.evict(max_bytes=0)
+        self.hits = 0
+        self.misses = 0
+
+
+_default_cache = None
+
+
+def default_cache():
+    """
+    Shared RunCache in $PARCEL_CACHE_DIR (default ./.parcel_cache).
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RunCache()
+    return _default_cache
+
+
+def cached(cache=None, ignore=(), version=None):
+    """
+    Decorator memoizing a driver function on disk.
+
+    Parameters
+    ----------
+    cache : RunCache, optional
+        Defaults to default_cache()
+    ignore : tuple of str
+        Arguments that do not affect the result (e.g. "label", "verbose")
+    version : str, optional
+        Overrides code_version() in the key
+
+    The wrapped function gets .key(*args, **kwargs) and .cache (None: the
+    default cache) attributes.
+    Results are stored as returned (time series or summaries alike) and must
+    be picklable.
+    """
+    def decorate(func):
+        signature = inspect.signature(func)
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        def key(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = {k: v for k, v in bound.arguments.items() if k not in ignore}
+            return make_key(name, arguments, version=version)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            store = cache or default_cache()
+            k = key(*args, **kwargs)
+            missing = object()
+            result = store.get(k, missing)
+            if result is missing:
+                result = func(*args, **kwargs)
+                store.put(k, result)
+            return result
+
+        wrapper.key = key
+        wrapper.cache = cache
+        return wrapper
+
+    return decorate
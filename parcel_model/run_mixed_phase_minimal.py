@@ -1,16 +1,18 @@
-from thermodynamics import saturation_vapor_pressure, supersaturation
 from aerosol import AerosolPopulation
-from activation import check_activation
-from biological_in import BiologicalIN, check_ice_nucleation
+from biological_in import BiologicalIN
+from parcel import ParcelSimulation, INOnset, LiquidRelaxation, IceDeposition
+from stream import ArrayCollector, Decimate, TextLogger, run_with_sinks
 
 
-def run_case(label, w, include_ice=True, verbose=True):
+def run_case(label, w, include_ice=True, verbose=True, dt=1.0, method="euler"):
     """
     Minimal mixed-phase prototype:
     - Liquid activation (kappa-Köhler)
     - Biological IN onset (optional)
     - Simple vapour relaxation + simple ice deposition sink
     - Simple ice growth proxy qi(t)
+    method: "euler" (explicit sinks) or "exponential" (exact relaxation sinks,
+    stable at coarse dt)
     Returns: times, S_series, qi_series, ice_onset_time, ice_onset_T
     """
 
@@ -46,109 +48,53 @@ def run_case(label, w, include_ice=True, verbose=True):
     # -----------------------
     # Parcel setup
     # -----------------------
-    dt = 1.0
-    t_end = 1200.0
-
-    T = 273.15          # start at 0C
-    RH0 = 0.95
-    e = RH0 * saturation_vapor_pressure(T)
-
     # Updraft -> cooling-rate mapping (simple, consistent with earlier)
     cooling_rate = 0.01 * w  # K/s
 
-    # Liquid vapour relaxation (stable small coefficient)
-    k_relax = 0.2
-
-    # Ice deposition sink coefficient (make small; increase later if needed)
-    k_ice = 0.4
-
-    # -----------------------
-    # Ice growth proxy qi(t)
-    # -----------------------
-    qi = 0.0
-    qi_growth_coeff = 5e-12  # controls qi increase rate (tunable)
-
-    # Ice onset control
-    ice_active = False
-    ice_onset_time = None
-    ice_onset_T = None
+    processes = []
+    if include_ice:
+        # Step 1: Biological IN onset switch
+        processes.append(INOnset(bio, N_threshold=1.0))
+
+    # Liquid vapour relaxation (stable small coefficient, only when activated)
+    processes.append(LiquidRelaxation(k_relax=0.2))
+
+    if include_ice:
+        # Step 2: Minimal ice deposition sink + simple growth proxy qi(t)
+        # (k_ice small; qi_growth_coeff controls qi increase rate, tunable)
+        processes.append(IceDeposition(k_ice=0.4, qi_growth_coeff=5e-12))
+
+    sim = ParcelSimulation(
+        T0=273.15,      # start at 0C
+        RH0=0.95,
+        cooling_rate=cooling_rate,
+        populations=[sulfate, pollen],
+        processes=processes,
+        dt=dt,
+        t_end=1200.0,
+    )
 
     # Output time series for plotting
-    times = []
-    S_series = []
-    qi_series = []
-
-    # Track peak S (diagnostic)
-    S_peak = -999.0
-    t_peak = None
+    series = ArrayCollector(fields=("t", "S", "qi"))
+    sinks = [series]
 
     if verbose:
         print(f"\n=== {label} | w={w:.2f} m/s | include_ice={include_ice} ===")
         print("t(s)   T(K)      S         ice_active    qi        sulfate_act  pollen_act")
 
-    t = 0.0
-    while t <= t_end:
-        es = saturation_vapor_pressure(T)
-        S = supersaturation(e, es)
-
-        # Liquid activation
-        check_activation(S, sulfate, T=T)
-        check_activation(S, pollen, T=T)
-
-        # -----------------------
-        # Step 1: Biological IN onset switch
-        # -----------------------
-        if include_ice and (not ice_active):
-            nucleated, N_active = check_ice_nucleation(T, bio, N_threshold=1.0)
-            if nucleated:
-                ice_active = True
-                ice_onset_time = t
-                ice_onset_T = T
-
-        # -----------------------
-        # Liquid vapour relaxation (only when supersaturated and activated)
-        # -----------------------
-        if S > 0.0 and (sulfate.activated or pollen.activated):
-            e = e - (k_relax * S * es * dt)
-            if e < 0.0:
-                e = 0.0
-
-        # -----------------------
-        # Step 2: Minimal ice deposition sink + simple growth proxy
-        # -----------------------
-        if ice_active and S > 0.0:
-            # remove additional vapour when supersaturated (simple deposition)
-            e = e - (k_ice * S * es * dt)
-            if e < 0.0:
-                e = 0.0
-
-            # update qi proxy (just to show growth once ice is active)
-            qi += qi_growth_coeff * S * es * dt
-
-        # Recompute S after sinks
-        es2 = saturation_vapor_pressure(T)
-        S2 = supersaturation(e, es2)
-
-        # Save time series
-        times.append(t)
-        S_series.append(S2)
-        qi_series.append(qi)
-
-        # Track peak S
-        if S2 > S_peak:
-            S_peak = S2
-            t_peak = t
-
         # Print every 60s
-        if verbose and (int(t) % 60 == 0):
-            print(
-                f"{int(t):4d}  {T:7.2f}  {S2: .3e}    {str(ice_active):>5}   "
-                f"{qi:10.3e}     {str(sulfate.activated):>5}       {str(pollen.activated):>5}"
+        def line(state):
+            return (
+                f"{int(state.t):4d}  {state.T:7.2f}  {state.S: .3e}    {str(state.ice_active):>5}   "
+                f"{state.qi:10.3e}     {str(sulfate.activated):>5}       {str(pollen.activated):>5}"
             )
 
-        # Update temperature (cooling)
-        T = T - cooling_rate * dt
-        t += dt
+        sinks.append(Decimate(TextLogger(line), every_t=60.0))
+
+    result = run_with_sinks(sim, sinks, method=method)
+    S_peak, t_peak = result["S_peak"], result["t_peak"]
+    ice_onset_time, ice_onset_T = result["ice_onset_time"], result["ice_onset_T"]
+    ice_active = ice_onset_time is not None
 
     if verbose:
         print(f"Peak S: {S_peak:.3e} at t={t_peak:.0f}s")
@@ -158,7 +104,7 @@ def run_case(label, w, include_ice=True, verbose=True):
             else:
                 print("Ice onset: not reached within simulation")
 
-    return times, S_series, qi_series, ice_onset_time, ice_onset_T
+    return series.data["t"], series.data["S"], series.data["qi"], ice_onset_time, ice_onset_T
 
 
 def run():
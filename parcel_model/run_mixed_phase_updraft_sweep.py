@@ -1,15 +1,23 @@
-from thermodynamics import saturation_vapor_pressure, supersaturation
 from aerosol import AerosolPopulation
-from activation import check_activation
-from biological_in import BiologicalIN, check_ice_nucleation
+from biological_in import BiologicalIN
+from parcel import ParcelSimulation, INOnset, LiquidRelaxation, IceDeposition
+from ice_growth import IceGrowth
 
 
-def run_case(w, include_ice=True, dt=1.0, t_end=1200.0):
+def run_case(w, include_ice=True, dt=1.0, t_end=1200.0, method="euler", ice_model="proxy", **solver_options):
     """
     Run one parcel case at a given updraft velocity w (m/s).
+    method / solver_options are passed to ParcelSimulation.run
+    (e.g. method="rk23", rtol=1e-4).
+    ice_model: "proxy" (constant k_ice sink) or "capacitance" (IceGrowth
+    crystals; method="euler" only).
     Returns:
         S_peak, t_peak, ice_onset_time, ice_onset_T
     """
+    if ice_model not in ("proxy", "capacitance"):
+        raise ValueError(f"ice_model must be 'proxy' or 'capacitance', got {ice_model!r}")
+    if include_ice and ice_model == "capacitance" and method != "euler":
+        raise ValueError(f"ice_model='capacitance' supports method='euler' only, got {method!r}")
 
     # -----------------------
     # Liquid CCN populations
@@ -43,67 +51,33 @@ def run_case(w, include_ice=True, dt=1.0, t_end=1200.0):
     # -----------------------
     # Parcel setup
     # -----------------------
-    T = 273.15          # start at 0C
-    RH0 = 0.95
-    e = RH0 * saturation_vapor_pressure(T)
-
-    # Simple mapping: updraft -> cooling rate
-    cooling_rate = 0.01 * w  # K/s
-
-    # Liquid vapour relaxation
-    k_relax = 0.2
-
-    # Ice deposition sink (only when ice_active)
-    k_ice = 2.0
-
-    ice_active = False
-    ice_onset_time = None
-    ice_onset_T = None
-
-    S_peak = -999.0
-    t_peak = None
-
-    t = 0.0
-    while t <= t_end:
-        es = saturation_vapor_pressure(T)
-        S = supersaturation(e, es)
-
-        # Liquid activation checks
-        check_activation(S, sulfate, T=T)
-        check_activation(S, pollen, T=T)
-
+    processes = []
+    if include_ice and ice_model == "proxy":
         # Ice nucleation onset (switch)
-        if include_ice and (not ice_active):
-            nucleated, N_active = check_ice_nucleation(T, bio, N_threshold=1.0)
-            if nucleated:
-                ice_active = True
-                ice_onset_time = t
-                ice_onset_T = T
-
-        # Liquid relaxation (condensation)
-        if S > 0.0 and (sulfate.activated or pollen.activated):
-            e = e - (k_relax * S * es * dt)
-            if e < 0.0:
-                e = 0.0
-
-        # Ice deposition sink (very simple)
-        if ice_active and S > 0.0:
-            e = e - (k_ice * S * es * dt)
-            if e < 0.0:
-                e = 0.0
-
-        # Track peak supersaturation using updated e
-        es2 = saturation_vapor_pressure(T)
-        S2 = supersaturation(e, es2)
-        if S2 > S_peak:
-            S_peak = S2
-            t_peak = t
-
-        # Cool parcel
-        T = T - cooling_rate * dt
-        t += dt
-
-    return S_peak, t_peak, ice_onset_time, ice_onset_T
+        processes.append(INOnset(bio, N_threshold=1.0))
+
+    # Liquid relaxation (condensation)
+    processes.append(LiquidRelaxation(k_relax=0.2))
+
+    if include_ice and ice_model == "proxy":
+        # Ice deposition sink (very simple, only when ice_active)
+        processes.append(IceDeposition(k_ice=2.0))
+    elif include_ice:
+        # Crystals nucleated from the IN, capacitance deposition growth
+        processes.append(IceGrowth(bio, N_threshold=1.0))
+
+    sim = ParcelSimulation(
+        T0=273.15,                  # start at 0C
+        RH0=0.95,
+        cooling_rate=0.01 * w,      # simple mapping: updraft -> cooling rate (K/s)
+        populations=[sulfate, pollen],
+        processes=processes,
+        dt=dt,
+        t_end=t_end,
+    )
+    result = sim.run(method=method, **solver_options)
+
+    return result["S_peak"], result["t_peak"], result["ice_onset_time"], result["ice_onset_T"]
 
 
 def run():
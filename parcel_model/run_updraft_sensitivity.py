@@ -1,9 +1,8 @@
-from thermodynamics import saturation_vapor_pressure, supersaturation
 from aerosol import AerosolPopulation
-from activation import check_activation
+from parcel import ParcelSimulation, LiquidRelaxation
 
 
-def parcel_run(cooling_rate, label):
+def parcel_run(cooling_rate, label, method="euler", **solver_options):
     # --- Aerosol population (keep it simple for stability test) ---
     sulfate = AerosolPopulation(
         name="sulfate",
@@ -13,44 +12,18 @@ def parcel_run(cooling_rate, label):
         rho_p=1770.0
     )
 
-    # --- Parcel setup ---
-    dt = 1.0
-    t_end = 600.0
-
-    T = 288.0
-    RH0 = 0.95
-    es0 = saturation_vapor_pressure(T)
-    e = RH0 * es0
-
-    # Track peak supersaturation
-    S_peak = -999.0
-    t_peak = None
-
-    t = 0.0
-    while t <= t_end:
-        es = saturation_vapor_pressure(T)
-        S = supersaturation(e, es)
-
-        # Activation check (not strictly required for this test, but informative)
-        act, Sc = check_activation(S, sulfate, T=T)
-
-        # --- Simple explicit condensation sink (stability-focused) ---
-        if S > 0.0:
-            e = e - (0.5 * S * es * dt)
-            if e < 0.0:
-                e = 0.0
-            S = supersaturation(e, es)
-
-        # Track peak S
-        if S > S_peak:
-            S_peak = S
-            t_peak = t
-
-        # Update temperature (cooling)
-        T = T - cooling_rate * dt
-        t = t + dt
-
-    return S_peak, t_peak
+    # --- Parcel setup: simple explicit condensation sink (stability-focused) ---
+    sim = ParcelSimulation(
+        T0=288.0,
+        RH0=0.95,
+        cooling_rate=cooling_rate,
+        populations=[sulfate],  # activation is informative only here
+        processes=[LiquidRelaxation(k_relax=0.5, require_activation=False)],
+        dt=1.0,
+        t_end=600.0,
+    )
+    result = sim.run(method=method, **solver_options)
+    return result["S_peak"], result["t_peak"]
 
 
 def run():
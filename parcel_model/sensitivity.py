@@ -0,0 +1,213 @@
+# sensitivity.py
+# Forward-mode (tangent-linear) sensitivities of the batch parcel integration:
+# derivatives of e, T, S and qi are stepped alongside the state, giving
+# dS_peak/dθ and d(ice onset)/dθ for several inputs θ from a single run
+#
+#   res = parcel_sensitivities([sulfate, pollen], wrt=("w", "pollen.N", "k_liquid"), w=1.0)
+#   res["d_S_peak"]["pollen.N"]
+#
+# The tangents are stepped inside batch_parcel.run_batch (wrt=...), so the
+# state is that of run_batch exactly. Activation and IN onset are switches
+# evaluated at whole steps, so their timing is piecewise constant in the
+# inputs: aerosol N and radius enter S_peak only through the surface-area
+# sink weights, kappa not at all (rejected), and the onset derivative is that
+# of the continuous threshold crossing (biological_in.ice_onset).
+
+import numpy as np
+
+from batch_parcel import run_batch
+from biological_in import onset_temperature
+
+
+# Names of the scalar drivers' liquid sink coefficients
+ALIASES = {"k_relax": "k_liquid", "k_base": "k_liquid", "k_cond": "k_liquid"}
+
+
+def run_tangent(
+    T0,
+    RH0,
+    cooling_rate,
+    aerosol_N,
+    aerosol_radius,
+    aerosol_kappa,
+    wrt=("cooling_rate",),
+    **options,
+):
+    """
+    batch_parcel.run_batch with tangent-linear derivatives.
+
+    Parameters are those of run_batch (options: in_N, in_spectrum,
+    liquid_sink, T_path, p_path, checkpoint, ...), plus
+    wrt : sequence of str
+        Inputs to differentiate with respect to: any of
+        batch_parcel.TANGENT_INPUTS, or "aerosol_N[i]", "aerosol_radius[i]"
+        for population i (surface-area sink only). Inputs that act only
+        through the activation or onset switches (kappa, N_threshold, ...)
+        are rejected rather than given a zero derivative.
+
+    Returns
+    -------
+    The run_batch result dict, plus {name: {input: array (n,)}} entries
+    "d_S_peak", "d_qi" (final), "d_ice_onset_time" and "d_ice_onset_T"
+    (NaN where onset is not reached; 0 where it is reached at t = 0).
+    """
+    wrt = list(wrt)
+    res = run_batch(T0, RH0, cooling_rate, aerosol_N, aerosol_radius, aerosol_kappa, wrt=wrt, **options)
+    n = len(res["S_peak"])
+
+    def seed(name):
+        d = np.zeros((len(wrt), n))
+        if name in wrt:
+            d[wrt.index(name)] = 1.0
+        return d
+
+    # -----------------------
+    # Onset: derivative of the continuous crossing T*, where the active IN
+    # number reaches N_threshold (T* = T50 - width * log(p / (1 - p)),
+    # p = N_threshold / N, for one IN class), reached at t* = (T0 - T*) /
+    # cooling_rate, or on a prescribed T_path at its local cooling rate
+    # -----------------------
+    d_onset_time = np.full((len(wrt), n), np.nan)
+    d_onset_T = np.full((len(wrt), n), np.nan)
+    in_N, in_spectrum = options.get("in_N"), options.get("in_spectrum")
+    N_threshold = options.get("N_threshold", 1.0)
+    T_path = options.get("T_path")
+    if in_N is not None or in_spectrum is not None:
+        dt = options.get("dt", 1.0)
+        reached = np.isfinite(res["ice_onset_time"])
+        if in_spectrum is not None:
+            T_star = np.full(n, in_spectrum.onset_temperature(N_threshold))
+            dT_star = np.zeros((len(wrt), n))
+        else:
+            in_N = np.broadcast_to(np.asarray(in_N, dtype=float), (n,))
+            in_T50 = np.broadcast_to(np.asarray(options.get("in_T50", 263.15), dtype=float), (n,))
+            in_width = np.maximum(np.broadcast_to(np.asarray(options.get("in_width", 2.0), dtype=float), (n,)), 1e-12)
+            T_star = onset_temperature(in_N, in_T50, in_width, N_threshold)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                p = N_threshold / in_N
+                logit = np.log(p / (1.0 - p))
+                dT_star = seed("in_T50") - seed("in_width") * logit + seed("in_N") * in_width / (in_N * (1.0 - p))
+
+        if T_path is None:
+            T0 = np.broadcast_to(np.asarray(T0, dtype=float), (n,))
+            cooling_rate = np.broadcast_to(np.asarray(cooling_rate, dtype=float), (n,))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                t_star = (T0 - T_star) / cooling_rate
+                d_t_star = (seed("T0") - dT_star - t_star * seed("cooling_rate")) / cooling_rate
+        else:
+            # Path cooling rate over the step that crossed T*
+            T_path = np.broadcast_to(np.asarray(T_path, dtype=float).reshape(len(T_path), -1), (len(T_path), n))
+            T0 = T_path[0]
+            k = np.clip(np.nan_to_num(res["ice_onset_time"] / dt).astype(int), 1, len(T_path) - 1)
+            rate = (T_path[k - 1, np.arange(n)] - T_path[k, np.arange(n)]) / dt
+            with np.errstate(divide="ignore", invalid="ignore"):
+                d_t_star = -dT_star / rate
+        at_start = reached & (T0 <= T_star)
+        d_onset_T = np.where(reached, dT_star, np.nan)
+        d_onset_T = np.where(at_start, seed("T0"), d_onset_T)
+        d_onset_time = np.where(reached, d_t_star, np.nan)
+        d_onset_time = np.where(at_start, 0.0, d_onset_time)
+
+    res["d_S_peak"] = dict(zip(wrt, res["d_S_peak"]))
+    res["d_qi"] = dict(zip(wrt, res["d_qi"]))
+    res["d_ice_onset_time"] = dict(zip(wrt, d_onset_time))
+    res["d_ice_onset_T"] = dict(zip(wrt, d_onset_T))
+    return res
+
+
+def parcel_sensitivities(
+    populations,
+    bio_in=None,
+    wrt=("w",),
+    w=1.0,
+    cooling_per_w=0.01,
+    T0=273.15,
+    RH0=0.95,
+    k_liquid=0.2,
+    k_ice=2.0,
+    qi_growth_coeff=0.0,
+    liquid_sink="relax",
+    N_threshold=1.0,
+    dt=1.0,
+    t_end=1200.0,
+):
+    """
+    Sensitivities of a parcel built from AerosolPopulation / BiologicalIN
+    objects, with inputs named as in ensemble.run_ensemble: "w",
+    "cooling_rate", "T0", "RH0", "k_liquid" (or "k_relax" / "k_base"),
+    "k_ice", "qi_growth_coeff", "<population>.N|radius|kappa" and
+    "<bio_in.name>.N|T50|width". w may be an array (one parcel per value).
+
+    Returns the run_tangent result with the d_* dicts keyed by these names.
+    """
+    names = {"w": "cooling_rate"}
+    for i, p in enumerate(populations):
+        for attr in ("N", "radius", "kappa"):
+            names[f"{p.name}.{attr}"] = f"aerosol_{attr}[{i}]"
+    if bio_in is not None:
+        for attr in ("N", "T50", "width"):
+            names[f"{bio_in.name}.{attr}"] = f"in_{attr}"
+
+    inputs = []
+    for name in wrt:
+        name = ALIASES.get(name, name)
+        inputs.append(names.get(name, name))
+    ice = {} if bio_in is None else {"in_N": bio_in.N, "in_T50": bio_in.T50, "in_width": bio_in.width}
+
+    # Population attributes may be arrays (one value per parcel)
+    shape = np.broadcast_shapes(*(np.shape(getattr(p, a)) for p in populations for a in ("N", "radius", "kappa")))
+
+    def stack(attr):
+        return np.array([np.broadcast_to(np.asarray(getattr(p, attr), dtype=float), shape) for p in populations])
+
+    res = run_tangent(
+        T0, RH0, cooling_per_w * np.asarray(w, dtype=float),
+        stack("N"), stack("radius"), stack("kappa"),
+        **ice, N_threshold=N_threshold, k_liquid=k_liquid, k_ice=k_ice,
+        qi_growth_coeff=qi_growth_coeff, liquid_sink=liquid_sink, dt=dt, t_end=t_end,
+        wrt=list(dict.fromkeys(inputs)),
+    )
+    for key in ("d_S_peak", "d_qi", "d_ice_onset_time", "d_ice_onset_T"):
+        d = res[key]
+        # Chain rule for w: cooling_rate = cooling_per_w * w
+        res[key] = {
+            name: d[inputs[k]] * (cooling_per_w if ALIASES.get(name, name) == "w" else 1.0)
+            for k, name in enumerate(wrt)
+        }
+    return res
+
+
+def run():
+    from aerosol import AerosolPopulation
+    from biological_in import BiologicalIN
+
+    sulfate = AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+    pollen = AerosolPopulation(name="pollen", N=3000.0, radius=5e-6, kappa=0.1, rho_p=1000.0)
+    bio = BiologicalIN(name="bioIN", N=50.0, T50=263.15, width=2.0)
+
+    print("Pollen competition (surface-area sink): dS_peak / d(input), one run per pollen_N")
+    wrt = ("pollen.N", "pollen.radius", "sulfate.N", "k_base", "w")
+    pollen_N = np.array([100.0, 300.0, 1000.0, 3000.0, 10000.0])
+    pollen = AerosolPopulation(name="pollen", N=pollen_N, radius=5e-6, kappa=0.1, rho_p=1000.0)
+    res = parcel_sensitivities([sulfate, pollen], wrt=wrt, w=1.0, T0=288.0, k_liquid=0.5,
+                               liquid_sink="surface_area", t_end=600.0)
+    print(f"{'pollen_N':>9s} {'S_peak':>11s}" + "".join(f"{name:>15s}" for name in wrt))
+    for i, pN in enumerate(pollen_N):
+        print(f"{pN:9.0f} {res['S_peak'][i]:11.3e}" + "".join(f"{res['d_S_peak'][name][i]:15.3e}" for name in wrt))
+
+    print()
+    print("Mixed-phase updraft sweep: sensitivities of S_peak and ice onset time")
+    w = np.array([0.2, 0.5, 1.0, 2.0])
+    pollen = AerosolPopulation(name="pollen", N=3000.0, radius=5e-6, kappa=0.1, rho_p=1000.0)
+    wrt = ("w", "k_relax", "k_ice", "bioIN.T50", "bioIN.N", "bioIN.width")
+    res = parcel_sensitivities([sulfate, pollen], bio_in=bio, wrt=wrt, w=w)
+    print(f"{'w':>5s} {'S_peak':>11s} {'onset (s)':>10s}" + "".join(f"{'dS/d' + n:>15s}" for n in wrt[:3])
+          + "".join(f" {'dt_on/d' + n:>17s}" for n in (wrt[0],) + wrt[3:]))
+    for i, wi in enumerate(w):
+        print(f"{wi:5.2f} {res['S_peak'][i]:11.3e} {res['ice_onset_time'][i]:10.0f}"
+              + "".join(f"{res['d_S_peak'][n][i]:15.3e}" for n in wrt[:3])
+              + "".join(f"{res['d_ice_onset_time'][n][i]:18.3e}" for n in (wrt[0],) + wrt[3:]))
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,145 @@
+# stream.py
+# Streaming output from ParcelSimulation.steps(): decimation and pluggable sinks
+#
+# A sink is any callable sink(state) with an optional close(); the
+# result_store.SeriesWriter is one. Wrap a sink in Decimate to only see
+# every n-th step or one step per time interval, so undecimated runs pay
+# no formatting or I/O cost.
+
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+
+StepRecord = namedtuple("StepRecord", ["t", "T", "e", "S", "qi", "ice_active"])
+
+
+def record(state):
+    """
+    Immutable snapshot of a ParcelState.
+    """
+    return StepRecord(state.t, state.T, state.e, state.S, state.qi, state.ice_active)
+
+
+class Every:
+    """
+    Decimation predicate: due(state) is True every n-th call (every=n) or at
+    the first step at or after each multiple of every_t seconds (every_t=...),
+    starting at t = 0. Time-based decimation gives one output per interval for
+    any dt, including fractional and adaptive steps.
+    """
+
+    def __init__(self, every=None, every_t=None):
+        if (every is None) == (every_t is None):
+            raise ValueError("Give exactly one of every (steps) or every_t (seconds)")
+        self.every = every
+        self.every_t = every_t
+        self._count = 0
+        self._next_t = 0.0
+
+    def __call__(self, state):
+        if self.every is not None:
+            due = self._count % self.every == 0
+            self._count += 1
+            return due
+        t = state.t
+        if t < self._next_t - 1e-9 * self.every_t:
+            return False
+        self._next_t = (int(t / self.every_t + 1e-9) + 1) * self.every_t
+        return True
+
+
+class Decimate:
+    """
+    Pass only due steps on to sink (see Every).
+    """
+
+    def __init__(self, sink, every=None, every_t=None):
+        self.sink = sink
+        self.due = Every(every=every, every_t=every_t)
+
+    def __call__(self, state):
+        if self.due(state):
+            self.sink(state)
+
+    def close(self):
+        close = getattr(self.sink, "close", None)
+        if close is not None:
+            close()
+
+
+class TextLogger:
+    """
+    Formatted text output, one line per step: format(state) -> str.
+    Lines are written to file (default sys.stdout) in blocks of buffer_lines
+    and on close().
+    """
+
+    def __init__(self, format, file=None, buffer_lines=256):
+        self.format = format
+        self.file = sys.stdout if file is None else file
+        self.buffer_lines = buffer_lines
+        self._lines = []
+
+    def __call__(self, state):
+        self._lines.append(self.format(state))
+        if len(self._lines) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        if self._lines:
+            self.file.write("\n".join(self._lines) + "\n")
+            self._lines = []
+
+    def close(self):
+        self.flush()
+
+
+class ArrayCollector:
+    """
+    Collect state fields per step; data[field] is a list, arrays() gives
+    NumPy arrays.
+    """
+
+    def __init__(self, fields=("t", "T", "e", "S", "qi")):
+        self.fields = tuple(fields)
+        self.data = {f: [] for f in self.fields}
+        self._appends = [(f, self.data[f].append) for f in self.fields]
+
+    def __call__(self, state):
+        for f, append in self._appends:
+            append(getattr(state, f))
+
+    def arrays(self):
+        return {f: np.asarray(v) for f, v in self.data.items()}
+
+
+def run_with_sinks(sim, sinks=(), method="euler", profile=False, **options):
+    """
+    Run sim, passing every step to each sink, then close the sinks.
+    Returns the run summary dict (profiled if profile=True; sink time is
+    reported as "output").
+    """
+    sinks = list(sinks)
+    try:
+        for state in sim.steps(method, profile=profile, **options):
+            for sink in sinks:
+                sink(state)
+    finally:
+        for sink in sinks:
+            close = getattr(sink, "close", None)
+            if close is not None:
+                close()
+    return sim.summary()
+
+
+def stream(sim, every=None, every_t=None, method="euler", profile=False, **options):
+    """
+    Generator of StepRecord snapshots, decimated by step count (every) or
+    time (every_t); all steps if neither is given.
+    """
+    due = None if every is None and every_t is None else Every(every=every, every_t=every_t)
+    for state in sim.steps(method, profile=profile, **options):
+        if due is None or due(state):
+            yield record(state)
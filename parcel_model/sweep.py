@@ -0,0 +1,231 @@
+# sweep.py
+# Parallel parameter-sweep runner: process pool, chunking, ordered output, resume
+#
+# Example (CLI):
+#   python sweep.py run_mixed_phase_updraft_sweep:run_case \
+#       --grid w=0.2,0.5,1.0,2.0 --grid include_ice=False,True \
+#       --workers 4 --chunk-size 2 --manifest sweep_manifest.jsonl
+
+import argparse
+import ast
+import hashlib
+import importlib
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+
+def parameter_grid(grid):
+    """
+    Expand {name: [values, ...]} into a list of parameter dicts
+    (Cartesian product, last name varying fastest). A list of dicts is
+    returned unchanged.
+    """
+    if isinstance(grid, dict):
+        names = list(grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    return list(grid)
+
+
+def to_json(value):
+    """
+    Convert a result to plain JSON types (tuples -> lists, NumPy -> Python).
+    Fresh and resumed results go through the same conversion.
+    """
+    if isinstance(value, dict):
+        return {str(k): to_json(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_json(v) for v in value]
+    if hasattr(value, "tolist"):
+        return to_json(value.tolist())
+    return value
+
+
+def _func_name(func):
+    return f"{func.__module__}:{func.__qualname__}"
+
+
+def _sweep_key(func, cases, fixed):
+    text = json.dumps([_func_name(func), to_json(fixed), to_json(cases)], sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _run_chunk(func, fixed, chunk):
+    return [(index, to_json(func(**fixed, **params))) for index, params in chunk]
+
+
+def _read_manifest(path, key):
+    """
+    Completed {index: result} from a manifest written for the same sweep, and
+    the length in bytes of its complete lines. Reading stops at a partial or
+    unreadable line (an interrupted write); run_sweep truncates the file to
+    that length before appending.
+    """
+    done = {}
+    if not path or not os.path.exists(path):
+        return done, 0
+    with open(path, "rb") as f:
+        lines = f.readlines()
+    end = 0
+    for i, line in enumerate(lines):
+        if not line.endswith(b"\n"):
+            break  # partial last line from an interrupted write
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            break
+        if i == 0:
+            if record.get("sweep") != key:
+                raise ValueError(f"Manifest {path} belongs to a different sweep "
+                                 "(function, grid or fixed arguments changed)")
+        else:
+            done[record["index"]] = record["result"]
+        end += len(line)
+    return done, end
+
+
+def run_sweep(func, grid, fixed=None, workers=None, chunk_size=16, manifest=None, progress=True):
+    """
+    Run func(**fixed, **params) for every case of a parameter grid.
+
+    Parameters
+    ----------
+    func : callable
+        Module-level function (must be importable by worker processes),
+        e.g. run_mixed_phase_updraft_sweep.run_case
+    grid : dict or list of dict
+        {name: values} (Cartesian product) or an explicit list of cases
+    fixed : dict, optional
+        Keyword arguments shared by all cases
+    workers : int, optional
+        Worker processes (default: os.cpu_count()); 1 runs in-process
+    chunk_size : int
+        Cases per task sent to a worker
+    manifest : str, optional
+        JSON-lines file recording completed cases; an interrupted sweep
+        restarted with the same manifest only runs the missing cases
+    progress : bool
+        Print "completed/total" to stderr as chunks finish
+
+    Returns
+    -------
+    list of (params, result), in grid order regardless of completion order
+    """
+    fixed = dict(fixed or {})
+    cases = parameter_grid(grid)
+    n_cases = len(cases)
+    workers = workers or os.cpu_count() or 1
+    key = _sweep_key(func, cases, fixed)
+
+    results, end = _read_manifest(manifest, key)
+    todo = [(i, params) for i, params in enumerate(cases) if i not in results]
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+
+    out = None
+    if manifest:
+        if os.path.exists(manifest):
+            # Drop a partial last line so new records start on a line of their own
+            with open(manifest, "r+b") as f:
+                f.truncate(end)
+        out = open(manifest, "a")
+        if end == 0:
+            out.write(json.dumps({"sweep": key, "function": _func_name(func), "n_cases": n_cases}) + "\n")
+            out.flush()
+
+    def record(chunk_results):
+        for index, result in chunk_results:
+            results[index] = result
+            if out is not None:
+                out.write(json.dumps({"index": index, "params": to_json(cases[index]), "result": result}) + "\n")
+        if out is not None:
+            out.flush()
+        if progress:
+            print(f"\rsweep: {len(results)}/{n_cases} cases", end="", file=sys.stderr, flush=True)
+
+    try:
+        if workers == 1:
+            for chunk in chunks:
+                record(_run_chunk(func, fixed, chunk))
+        elif chunks:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                # Bounded number of chunks in flight keeps memory flat for 10^5 cases
+                pending = set()
+                chunk_iter = iter(chunks)
+                for chunk in itertools.islice(chunk_iter, 4 * workers):
+                    pending.add(pool.submit(_run_chunk, func, fixed, chunk))
+                while pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        record(future.result())
+                        chunk = next(chunk_iter, None)
+                        if chunk is not None:
+                            pending.add(pool.submit(_run_chunk, func, fixed, chunk))
+    finally:
+        if out is not None:
+            out.close()
+        if progress:
+            print(file=sys.stderr)
+
+    return [(cases[i], results[i]) for i in range(n_cases)]
+
+
+# -----------------------
+# Command line
+# -----------------------
+def _parse_value(text):
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def _parse_assignment(text):
+    name, _, values = text.partition("=")
+    if not name or not values:
+        raise argparse.ArgumentTypeError(f"expected name=value[,value...], got {text!r}")
+    return name, [_parse_value(v) for v in values.split(",")]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a parcel-model parameter sweep in parallel.")
+    parser.add_argument("function", help="module:function, e.g. run_mixed_phase_updraft_sweep:run_case")
+    parser.add_argument("--grid", action="append", type=_parse_assignment, default=[],
+                        help="name=v1,v2,... (repeatable; Cartesian product)")
+    parser.add_argument("--set", action="append", type=_parse_assignment, default=[],
+                        help="name=value fixed keyword argument (repeatable)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=16)
+    parser.add_argument("--manifest", default=None, help="JSON-lines manifest for progress / resume")
+    parser.add_argument("--output", default=None, help="write ordered results as JSON lines")
+    parser.add_argument("--store", default=None, help="ResultStore directory for a summary table")
+    parser.add_argument("--table", default="sweep", help="table name in --store")
+    parser.add_argument("--columns", default=None, help="names of the result elements, comma-separated")
+    args = parser.parse_args(argv)
+
+    module_name, _, func_name = args.function.partition(":")
+    func = getattr(importlib.import_module(module_name), func_name)
+    grid = {name: values for name, values in args.grid}
+    fixed = {name: values[0] for name, values in args.set}
+
+    rows = run_sweep(func, grid, fixed=fixed, workers=args.workers,
+                     chunk_size=args.chunk_size, manifest=args.manifest)
+
+    if args.store:
+        from result_store import ResultStore
+        if not args.columns:
+            parser.error("--store needs --columns")
+        ResultStore(args.store).write_sweep(args.table, rows, args.columns.split(","))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            for params, result in rows:
+                f.write(json.dumps({"params": to_json(params), "result": result}) + "\n")
+    else:
+        for params, result in rows:
+            print(json.dumps(to_json(params)), json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
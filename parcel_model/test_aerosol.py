@@ -13,3 +13,26 @@ print("N:", pollen.N)
 print("Radius (m):", pollen.radius)
 print("Kappa:", pollen.kappa)
 print("Activated:", pollen.activated)
+
+# Size-resolved spectrum (structure of arrays)
+import numpy as np
+from aerosol import AerosolSpectrum
+
+sulfate = AerosolSpectrum.lognormal(
+    name="sulfate",
+    N=500e6,
+    r_median=30e-9,
+    sigma_g=1.6,
+    kappa=1.0,
+    rho_p=1770.0,
+    n_bins=1000
+)
+
+print("\nSpectrum:", sulfate.name, "bins:", len(sulfate))
+print("N_total (m^-3):", sulfate.N_total)
+print("Memory (bytes):", sulfate.nbytes,
+      "| float32:", AerosolSpectrum(sulfate.name, sulfate.N, sulfate.radius, 1.0, 1770.0, dtype=np.float32).nbytes)
+
+for S in [1e-6, 1e-5, 1e-4]:
+    activated, Sc, N_act, area_act = sulfate.activate(S, T=288.0)
+    print(f"S = {S:.0e}: activated bins = {activated.sum():4d}  N_act = {N_act:.3e}  sum(N r^2) = {area_act:.3e}")
@@ -0,0 +1,53 @@
+import contextlib
+import io
+
+import numpy as np
+
+from batch_parcel import run_batch, populations_to_arrays
+from aerosol import AerosolPopulation
+import run_parcel_competition
+import run_updraft_sensitivity
+import run_mixed_phase_updraft_sweep
+
+
+def run():
+    sulfate = AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+
+    print("Batch engine vs scalar loops (max |difference|)")
+    print("-------------------------------------------------------------")
+
+    # --- Updraft sensitivity: single sulfate mode, unconditional sink ---
+    rates = np.array([0.002, 0.005, 0.010, 0.020])
+    N, r, kappa = populations_to_arrays([sulfate])
+    res = run_batch(288.0, 0.95, rates, N, r, kappa, k_liquid=0.5, liquid_sink="always",
+                    dt=1.0, t_end=600.0)
+    ref = np.array([run_updraft_sensitivity.parcel_run(rate, "") for rate in rates])
+    print(f"updraft sensitivity   S_peak {np.max(np.abs(res['S_peak'] - ref[:, 0])):.3e}"
+          f"   t_peak {np.max(np.abs(res['t_peak'] - ref[:, 1])):.3e}")
+
+    # --- Pollen competition: surface-area sink ---
+    pollen_N = np.array([0.0, 100.0, 300.0, 1000.0, 3000.0, 10000.0])
+    N = np.array([np.full_like(pollen_N, 500e6), pollen_N])
+    r = np.array([30e-9, 5e-6])
+    kappa = np.array([1.0, 0.1])
+    res = run_batch(288.0, 0.95, 0.01, N, r, kappa, k_liquid=0.5, liquid_sink="surface_area",
+                    dt=1.0, t_end=600.0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        ref = np.array([run_parcel_competition.parcel_run(pN, "") for pN in pollen_N])
+    print(f"pollen competition    S_peak {np.max(np.abs(res['S_peak'] - ref[:, 0])):.3e}"
+          f"   t_peak {np.max(np.abs(res['t_peak'] - ref[:, 1])):.3e}")
+
+    # --- Mixed-phase updraft sweep: relaxation + ice onset ---
+    w = np.array([0.2, 0.5, 1.0, 2.0])
+    res = run_batch(273.15, 0.95, 0.01 * w, [500e6, 3000.0], [30e-9, 5e-6], [1.0, 0.1],
+                    in_N=50.0, in_T50=263.15, in_width=2.0, k_liquid=0.2, k_ice=2.0,
+                    liquid_sink="relax", dt=1.0, t_end=1200.0)
+    ref = np.array([run_mixed_phase_updraft_sweep.run_case(wi, include_ice=True) for wi in w],
+                   dtype=float)
+    for i, name in enumerate(["S_peak", "t_peak", "ice_onset_time", "ice_onset_T"]):
+        diff = np.nanmax(np.abs(res[name] - ref[:, i]))
+        print(f"mixed-phase sweep     {name:15s} {diff:.3e}")
+
+
+if __name__ == "__main__":
+    run()
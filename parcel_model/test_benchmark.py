@@ -0,0 +1,49 @@
+import contextlib
+import copy
+import io
+import json
+import os
+import tempfile
+
+import benchmark
+
+
+def run():
+    print("Benchmark suite: quick run and compare")
+    print("-------------------------------------------------------------")
+
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "bench.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            status = benchmark.main(["run", "--quick", "--repeat", "1", "--min-time", "0.001", "--output", path])
+        with open(path) as f:
+            report = json.load(f)
+        results = report["results"]
+        expected = set(benchmark.benchmarks(quick=True))
+        print(f"run --quick: exit {status}, {len(results)} benchmarks timed, all present {set(results) == expected}, "
+              f"all positive {all(r['min'] > 0.0 for r in results.values())}")
+        print(f"metadata: {sorted(report['metadata'])}")
+
+        # Synthetic changes: one 2x slower, one 2x faster, one removed, one added
+        names = sorted(results)
+        current = copy.deepcopy(report)
+        current["results"][names[0]]["min"] *= 2.0
+        current["results"][names[1]]["min"] *= 0.5
+        del current["results"][names[2]]
+        current["results"]["kernel/new"] = {"min": 1e-6}
+        statuses = {name: status for name, *_, status in benchmark.compare(report, current)}
+        print(f"compare: {names[0]} {statuses[names[0]]}, {names[1]} {statuses[names[1]]}, "
+              f"{names[2]} {statuses[names[2]]}, kernel/new {statuses['kernel/new']}, "
+              f"unchanged ok: {sum(s == 'ok' for s in statuses.values())} of {len(names) - 3}")
+
+        current_path = os.path.join(root, "current.json")
+        with open(current_path, "w") as f:
+            json.dump(current, f)
+        with contextlib.redirect_stdout(io.StringIO()):
+            same = benchmark.main(["compare", path, path])
+            slower = benchmark.main(["compare", path, current_path])
+        print(f"compare exit status: identical runs {same}, with a regression {slower}")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,4 +1,9 @@
-from biological_in import BiologicalIN, check_ice_nucleation
+import time
+
+import numpy as np
+
+from batch_parcel import run_batch
+from biological_in import BiologicalIN, INSpectrum, check_ice_nucleation, ice_onset, onset_temperature
 
 
 def run():
@@ -27,6 +32,85 @@ def run():
         nucleated, N_active = check_ice_nucleation(T, bio, N_threshold=1.0)
         print(f"{T:6.2f}     {frac:8.3f}        {N_active:10.3e}        {nucleated}")
 
+    print()
+    print("Closed-form onset temperature (N_threshold = 1 m^-3)")
+    for N in [0.5, 1.0, 2.0, 50.0, 1000.0]:
+        print(f"N = {N:7.1f} m^-3   T_onset = {onset_temperature(N, bio.T50, bio.width):8.3f} K")
+
+    print()
+    print("Onset under linear cooling from 273.15 K (t_end = 1200 s): exact vs dt = 1 s steps")
+    rates = np.array([0.0005, 0.002, 0.005, 0.010, 0.020])
+    t_exact, T_exact = ice_onset(273.15, rates, bio.N, bio.T50, bio.width, t_end=1200.0)
+    t_step, T_step = ice_onset(273.15, rates, bio.N, bio.T50, bio.width, t_end=1200.0, dt=1.0)
+    for rate, te, Te, ts, Ts in zip(rates, t_exact, T_exact, t_step, T_step):
+        print(f"cooling {rate:.4f} K/s   exact t = {te:8.2f} s  T = {Te:7.3f} K   stepped t = {ts:6.0f} s  T = {Ts:7.3f} K")
+
+    # Many IN classes in one call vs the stepping loop
+    rng = np.random.default_rng(1)
+    n = 500
+    N = 10 ** rng.uniform(-0.5, 3.0, n)
+    T50 = rng.uniform(255.0, 270.0, n)
+    width = rng.uniform(0.3, 4.0, n)
+    rate = rng.uniform(0.001, 0.03, n)
+    t_onset, _ = ice_onset(273.15, rate, N, T50, width, t_end=1200.0, dt=1.0)
+    mismatches = 0
+    for i in range(n):
+        cls = BiologicalIN("x", N[i], T50[i], width[i])
+        t, T, ref = 0.0, 273.15, np.nan
+        while t <= 1200.0:
+            if check_ice_nucleation(T, cls)[0]:
+                ref = t
+                break
+            T -= rate[i]
+            t += 1.0
+        if not (ref == t_onset[i] or (np.isnan(ref) and np.isnan(t_onset[i]))):
+            mismatches += 1
+    print(f"{n} random IN classes: {np.isnan(t_onset).sum()} never reach onset, {mismatches} mismatches vs stepping")
+
+    # Multi-species spectrum: one species reproduces BiologicalIN
+    print()
+    print("INSpectrum")
+    single = INSpectrum.from_classes([bio])
+    T_grid = np.linspace(240.0, 280.0, 401)
+    ref = np.array([bio.active_IN_number(T) for T in T_grid])
+    print(f"1 species vs BiologicalIN     max |diff| = {np.max(np.abs(single.active_number(T_grid) - ref)):.3e}")
+    print(f"onset temperature             {single.onset_temperature(1.0):.6f} K  (BiologicalIN {bio.onset_temperature(1.0):.6f} K)")
+
+    # Dozens of species: table lookup vs direct evaluation
+    n_species = 48
+    spectrum = INSpectrum([f"in{i}" for i in range(n_species)], N[:n_species], T50[:n_species], width[:n_species])
+    table = spectrum.table()
+    T_many = rng.uniform(240.0, 275.0, 100_000)
+    total, per = spectrum.active_number(T_many, per_species=True)
+    total_t, per_t = spectrum.active_number(T_many, per_species=True, table=True)
+    print(f"{n_species} species: table {len(table.T)} points, {table.nbytes / 1e6:.2f} MB, "
+          f"max_error {table.max_error:.3e} m^-3 of N_total {spectrum.N_total:.3e}")
+    print(f"table vs exact (1e5 temperatures)   total {np.max(np.abs(total_t - total)):.3e}   "
+          f"per species {np.max(np.abs(per_t - per)):.3e}")
+    print(f"threshold_reached vs exact test   {np.sum(spectrum.threshold_reached(T_many, 100.0) != (total >= 100.0))} mismatches")
+
+    t0 = time.perf_counter()
+    spectrum.active_number(T_many)
+    t_exact_eval = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    spectrum.active_number(T_many, table=True)
+    t_table_eval = time.perf_counter() - t0
+    print(f"1e5 totals: exact {t_exact_eval * 1e3:.1f} ms, table {t_table_eval * 1e3:.1f} ms")
+
+    # Batch engine: 1-species spectrum matches per-parcel in_N/T50/width, and
+    # the multi-species onset is the first step below the onset temperature
+    w = np.array([0.2, 0.5, 1.0, 2.0])
+    common = dict(T0=273.15, RH0=0.95, cooling_rate=0.01 * w, aerosol_N=[500e6], aerosol_radius=[30e-9],
+                  aerosol_kappa=[1.0], k_ice=2.0, t_end=1200.0)
+    a = run_batch(in_N=bio.N, in_T50=bio.T50, in_width=bio.width, **common)
+    b = run_batch(in_spectrum=single, **common)
+    print(f"run_batch spectrum vs in_N   onset time max |diff| = {np.nanmax(np.abs(a['ice_onset_time'] - b['ice_onset_time'])):.3e}"
+          f"   S_peak max |diff| = {np.max(np.abs(a['S_peak'] - b['S_peak'])):.3e}")
+    c = run_batch(in_spectrum=spectrum, N_threshold=1000.0, **common)
+    T_on = spectrum.onset_temperature(1000.0)
+    print(f"{n_species}-species onset T (1000 m^-3) = {T_on:.3f} K; batch onset T per parcel: "
+          + " ".join(f"{x:.3f}" for x in c["ice_onset_T"]))
+
 
 if __name__ == "__main__":
     run()
@@ -0,0 +1,136 @@
+import os
+import tempfile
+
+import numpy as np
+
+from aerosol import AerosolPopulation, AerosolSpectrum
+from batch_parcel import run_batch
+from biological_in import BiologicalIN
+from checkpoint import Checkpointer
+from ice_growth import IceGrowth
+from parcel import ParcelSimulation, INOnset, LiquidRelaxation, IceDeposition
+from sectional import DropletBins, SectionalCondensation
+import run_mixed_phase_updraft_sweep
+
+
+class Interrupted(Exception):
+    pass
+
+
+class KilledAt(Checkpointer):
+    """
+    Checkpointer that stops the run at a given batch step, as if pre-empted.
+    """
+
+    def __init__(self, path, every, kill_step):
+        super().__init__(path, every)
+        self.kill_step = kill_step
+
+    def after_batch_step(self, step, config, arrays):
+        super().after_batch_step(step, config, arrays)
+        if step == self.kill_step:
+            raise Interrupted
+
+
+def equal(a, b):
+    if isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        return np.array_equal(a, b, equal_nan=True)
+    return a == b
+
+
+def run():
+    bio = BiologicalIN(name="bioIN", N=50.0, T50=263.15, width=2.0)
+    print("Checkpoint / restart")
+    print("-------------------------------------------------------------")
+
+    with tempfile.TemporaryDirectory() as root:
+        # --- Scalar parcel: kill after 450 steps, resume from the step-400 snapshot ---
+        def make_sim(k_ice=2.0, pollen_N=3000.0, in_N=50.0):
+            sulfate = AerosolSpectrum.lognormal("sulfate", N=500e6, r_median=30e-9, sigma_g=1.6,
+                                                kappa=1.0, rho_p=1770.0, n_bins=50)
+            pollen = AerosolPopulation(name="pollen", N=pollen_N, radius=5e-6, kappa=0.1, rho_p=1000.0)
+            in_source = BiologicalIN(name="bioIN", N=in_N, T50=263.15, width=2.0)
+            return ParcelSimulation(T0=273.15, RH0=0.95, cooling_rate=0.01, populations=[sulfate, pollen],
+                                    processes=[INOnset(in_source), LiquidRelaxation(0.2), IceDeposition(k_ice, 1e-3)],
+                                    dt=1.0, t_end=1200.0)
+
+        reference = make_sim().run()
+        path = os.path.join(root, "parcel.ckpt")
+        sim = make_sim()
+        for state in sim.steps(checkpoint=Checkpointer(path, every=100)):
+            if state.t >= 450.0:
+                break
+        ckpt = Checkpointer(path, every=100)
+        resumed = make_sim().run(checkpoint=ckpt)
+        same = all(equal(reference[k], resumed[k]) for k in reference)
+        print(f"parcel killed at t = 450 s, resumed (restored {ckpt.restored}): summary identical: {same}  "
+              f"(snapshot {os.path.getsize(path)} bytes)")
+
+        # --- Sectional bins and ice crystals are restored with the parcel ---
+        def make_micro():
+            sulfate = AerosolSpectrum.lognormal("sulfate", N=300e6, r_median=30e-9, sigma_g=1.6,
+                                                kappa=1.0, rho_p=1770.0, n_bins=100)
+            condensation = SectionalCondensation(DropletBins.from_populations([sulfate]), substeps=2)
+            ice = IceGrowth(BiologicalIN(name="bioIN", N=5e3, T50=268.0, width=1.0))
+            return ParcelSimulation(T0=272.0, RH0=0.97, cooling_rate=0.01,
+                                    processes=[condensation, ice], dt=1.0, t_end=600.0), condensation, ice
+
+        sim, condensation, ice = make_micro()
+        reference = sim.run()
+        r_ref, m_ref = condensation.bins.r.copy(), ice.crystals.m.copy()
+        path = os.path.join(root, "micro.ckpt")
+        sim, _, _ = make_micro()
+        for state in sim.steps(checkpoint=Checkpointer(path, every=50)):
+            if state.t >= 330.0:
+                break
+        sim, condensation, ice = make_micro()
+        resumed = sim.run(checkpoint=Checkpointer(path, every=50))
+        same = all(equal(reference[k], resumed[k]) for k in reference)
+        print(f"sectional + ice growth resumed: summary identical {same}, droplet radii identical "
+              f"{np.array_equal(r_ref, condensation.bins.r)}, crystal masses identical {np.array_equal(m_ref, ice.crystals.m)}")
+
+        # --- Drivers pass checkpoint through to the integrator ---
+        plain = run_mixed_phase_updraft_sweep.run_case(1.0)
+        ckpt = Checkpointer(os.path.join(root, "case.ckpt"), every=250)
+        with_ckpt = run_mixed_phase_updraft_sweep.run_case(1.0, checkpoint=ckpt)
+        print(f"run_case with checkpoints: identical {plain == with_ckpt}, {ckpt.n_saved} snapshots written")
+
+        # --- Batch: pre-empted at step 700, resumed from step 600 ---
+        rng = np.random.default_rng(0)
+        n = 5000
+        args = dict(T0=273.15, RH0=rng.uniform(0.9, 0.99, n), cooling_rate=0.01 * rng.lognormal(0.0, 0.7, n),
+                    aerosol_N=[500e6, 3000.0], aerosol_radius=[30e-9, 5e-6], aerosol_kappa=[1.0, 0.1],
+                    in_N=bio.N, in_T50=rng.normal(263.15, 1.5, n), in_width=bio.width, k_ice=2.0,
+                    qi_growth_coeff=1e-3, t_end=1200.0)
+        reference = run_batch(**args)
+        path = os.path.join(root, "batch.ckpt")
+        try:
+            run_batch(**args, checkpoint=KilledAt(path, every=200, kill_step=700))
+        except Interrupted:
+            pass
+        ckpt = Checkpointer(path, every=200)
+        resumed = run_batch(**args, checkpoint=ckpt)
+        same = all(equal(reference[k], resumed[k]) for k in reference)
+        print(f"batch of {n} killed at step 700, resumed (restored {ckpt.restored}): all outputs identical: {same}  "
+              f"(snapshot {os.path.getsize(path) / 1e3:.0f} kB)")
+
+        # --- A snapshot only restores into the run it came from ---
+        try:
+            run_batch(**{**args, "k_ice": 1.0}, checkpoint=Checkpointer(path))
+            print("different run accepted the snapshot (unexpected)")
+        except ValueError as err:
+            print(f"different run rejected: {err}")
+
+        # --- Scalar snapshots are matched on population and term parameters too ---
+        path = os.path.join(root, "parcel.ckpt")
+        for label, changes in (("IceDeposition k_ice", {"k_ice": 1.0}), ("pollen N", {"pollen_N": 1e4}),
+                               ("IN N", {"in_N": 100.0})):
+            try:
+                make_sim(**changes).run(checkpoint=Checkpointer(path))
+                print(f"parcel with a different {label} accepted the snapshot (unexpected)")
+            except ValueError:
+                print(f"parcel with a different {label} rejected")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+import figures
+from result_store import ResultStore
+
+
+def run():
+    print("Figure pipeline: headless rendering and skip-unchanged")
+    print("-------------------------------------------------------------")
+    print(f"import figures loads pyplot: {'matplotlib.pyplot' in sys.modules}")
+
+    with tempfile.TemporaryDirectory() as root:
+        store_root = os.path.join(root, "results")
+        outdir = os.path.join(root, "figures")
+        figures.compute_results(ResultStore(store_root))
+
+        rendered, skipped = figures.render_figures(store_root, outdir, workers=1)
+        missing = [f.filename for f in figures.FIGURES if not os.path.getsize(os.path.join(outdir, f.filename))]
+        print(f"first run: rendered {len(rendered)} of {len(figures.FIGURES)}, skipped {len(skipped)}, "
+              f"empty or missing files: {missing}")
+
+        rendered, skipped = figures.render_figures(store_root, outdir, workers=1)
+        print(f"unchanged inputs: rendered {rendered}, skipped {len(skipped)}")
+
+        # Changing one stored table re-renders only the figures that read it
+        store = ResultStore(store_root)
+        table = store.table("updraft_sensitivity", mmap_mode=None)
+        store.write_table("updraft_sensitivity", w=table["w"], S_peak=1.01 * table["S_peak"], t_peak=table["t_peak"])
+        rendered, skipped = figures.render_figures(store_root, outdir, workers=1)
+        print(f"updraft_sensitivity table changed: rendered {rendered}, skipped {len(skipped)}")
+
+        # A deleted output is rendered again even if its inputs are unchanged
+        os.remove(os.path.join(outdir, "temperature_vs_time.png"))
+        rendered, _ = figures.render_figures(store_root, outdir, workers=1)
+        print(f"temperature_vs_time.png deleted: rendered {rendered}")
+
+        # Plot scripts render into the working directory without a display
+        here = os.path.dirname(os.path.abspath(__file__))
+        env = {**os.environ, "MPLBACKEND": "", "DISPLAY": ""}
+        for script, filename in (("plot_updraft_sensitivity.py", "updraft_sensitivity_Speak_vs_w.png"),
+                                 ("make_table.py", "dt_sensitivity_table.png")):
+            out = subprocess.run([sys.executable, os.path.join(here, script)], cwd=root, env=env,
+                                 capture_output=True, text=True)
+            print(f"{script}: exit {out.returncode}, wrote {os.path.exists(os.path.join(root, filename))}")
+
+
+if __name__ == "__main__":
+    run()
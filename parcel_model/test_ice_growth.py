@@ -0,0 +1,87 @@
+import time
+
+import numpy as np
+
+from biological_in import BiologicalIN, INSpectrum
+from constants import Rv
+from ice_growth import IceCategories, IceGrowth, crystal_radius, deposition_rate, grow_masses
+from parcel import ParcelSimulation, LiquidRelaxation
+from thermodynamics import saturation_vapor_pressure, saturation_vapor_pressure_ice
+import run_mixed_phase_updraft_sweep
+
+
+def run():
+    T = 258.15
+    esi = saturation_vapor_pressure_ice(T)
+    S_i = saturation_vapor_pressure(T) / esi - 1.0  # water saturation
+
+    print("Ice deposition growth")
+    print("-------------------------------------------------------------")
+
+    # --- One step of grow_masses vs fine explicit integration of dm/dt ---
+    m0 = np.array([1e-15, 1e-12, 1e-9])
+    m = m0.copy()
+    for _ in range(100000):
+        m = m + deposition_rate(m, S_i, T, esi) * 1e-3
+    exact = grow_masses(m0, S_i, T, esi, 100.0)
+    print(f"100 s at water saturation (S_i = {S_i:.3f}): grow_masses vs 1e5 Euler steps   "
+          f"max rel diff = {np.max(np.abs(exact / m - 1.0)):.1e}")
+    print(f"radii {crystal_radius(m0[0]) * 1e6:.2f} um -> {crystal_radius(exact[0]) * 1e6:.2f} um")
+
+    # --- Ice water equals the vapour removed ---
+    bio = BiologicalIN(name="bioIN", N=5e4, T50=263.15, width=2.0)
+    ice = IceGrowth(bio, N_threshold=1.0)
+    sim = ParcelSimulation(T0=268.15, RH0=1.0, cooling_rate=0.01, processes=[ice], dt=1.0, t_end=900.0)
+    e_prev = sim.RH0 * saturation_vapor_pressure(sim.T0)
+    removed = 0.0
+    for state in sim.steps():
+        removed += (e_prev - state.e) / (Rv * state.T)
+        e_prev = state.e
+    print(f"no-liquid run: IWC {sim.state.qi * 1e3:.4e} g/m^3, vapour removed {removed * 1e3:.4e} g/m^3, "
+          f"N_ice {ice.N_ice.sum():.0f} m^-3 (of {bio.N:.0f})")
+
+    # --- Vapour never drawn below ice saturation ---
+    dense = IceGrowth(INSpectrum(["dense"], [1e9], [266.0], [0.5]), N_threshold=1.0)
+    sim = ParcelSimulation(T0=268.15, RH0=1.0, cooling_rate=0.01, processes=[dense], dt=1.0, t_end=300.0)
+    S_i_min = min(state.e / saturation_vapor_pressure_ice(state.T) - 1.0 for state in sim.steps()
+                  if state.ice_active)
+    print(f"1e9 m^-3 crystals: min S_i after onset = {S_i_min:.3e}")
+
+    # --- Many ice categories in one parcel ---
+    rng = np.random.default_rng(3)
+    n = 64
+    spectrum = INSpectrum([f"in{i}" for i in range(n)], 10 ** rng.uniform(0.0, 3.0, n),
+                          rng.uniform(255.0, 268.0, n), rng.uniform(0.5, 3.0, n))
+    crystals = IceCategories.from_spectrum(spectrum, capacitance=rng.choice([1.0, 2.0 / np.pi], n))
+    ice = IceGrowth(crystals)
+    sim = ParcelSimulation(T0=273.15, RH0=0.95, cooling_rate=0.01, processes=[LiquidRelaxation(0.2, False), ice],
+                           dt=1.0, t_end=1200.0)
+    t0 = time.perf_counter()
+    result = sim.run()
+    elapsed = time.perf_counter() - t0
+    print(f"{n} categories: IWC {result['qi'] * 1e3:.3e} g/m^3, N_ice {ice.N_ice.sum():.0f} m^-3, "
+          f"{elapsed / sim.n_steps * 1e6:.0f} us/step")
+
+    # --- Mixed-phase sweep: proxy sink vs capacitance growth ---
+    print("w (m/s)   S_peak proxy   S_peak capacitance   onset t proxy / capacitance")
+    for w in [0.2, 0.5, 1.0, 2.0]:
+        a = run_mixed_phase_updraft_sweep.run_case(w, ice_model="proxy")
+        b = run_mixed_phase_updraft_sweep.run_case(w, ice_model="capacitance")
+        print(f"{w:6.1f}    {a[0]:.4e}     {b[0]:.4e}           {a[2]:6.0f} / {b[2]:6.0f}")
+
+    # --- Methods without an IceGrowth tendency are rejected up front ---
+    for method in ("rk23", "exponential"):
+        try:
+            run_mixed_phase_updraft_sweep.run_case(1.0, ice_model="capacitance", method=method)
+            print(f"run_case capacitance, method={method}: accepted (unexpected)")
+        except ValueError as err:
+            print(f"run_case capacitance, method={method}: {err}")
+    sim = ParcelSimulation(T0=273.15, RH0=0.95, cooling_rate=0.01, processes=[IceGrowth(bio)])
+    try:
+        sim.run(method="rk23")
+    except ValueError as err:
+        print(f"ParcelSimulation with IceGrowth, method='rk23': {err}")
+
+
+if __name__ == "__main__":
+    run()
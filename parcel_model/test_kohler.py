@@ -0,0 +1,38 @@
+import numpy as np
+
+from kohler import critical_supersaturation, critical_supersaturation_fast, _coefficient_cached, clear_cache
+
+
+def run():
+    Dp = np.array([60e-9, 100e-9, 10e-6])   # sulfate-like, larger sulfate, pollen
+    kappa = np.array([1.0, 1.0, 0.1])
+    T = np.array([288.0, 273.15, 263.15])
+
+    print("Vectorized vs scalar critical supersaturation")
+    print("Dp (m)        kappa     T (K)      Sc (array)     Sc (scalar)    Sc (fast)")
+    print("--------------------------------------------------------------------------")
+    Sc = critical_supersaturation(Dp, kappa, T=T)
+    for i in range(len(Dp)):
+        Sc_scalar = critical_supersaturation(Dp[i], kappa[i], T=T[i])
+        Sc_fast = critical_supersaturation_fast(float(Dp[i]), float(kappa[i]), T=float(T[i]))
+        print(f"{Dp[i]:.2e}    {kappa[i]:4.2f}    {T[i]:7.2f}    {Sc[i]:.6e}   {Sc_scalar:.6e}   {Sc_fast:.6e}")
+
+    # Memoized per-population coefficient over a repeated cooling sweep
+    clear_cache()
+    temperatures = [273.15 - 0.01 * i for i in range(1200)]
+    for _ in range(3):
+        for Tk in temperatures:
+            critical_supersaturation_fast(60e-9, 1.0, T=Tk)
+    info = _coefficient_cached.cache_info()
+    print(f"\nSc coefficient cache: entries = {info.currsize}  hits = {info.hits}  misses = {info.misses}")
+
+    # sigma is part of the key: a new sigma gets its own coefficient
+    Sc_070 = critical_supersaturation_fast(60e-9, 1.0, sigma=0.070, T=273.15)
+    print(f"sigma = 0.070: Sc(273.15 K) = {Sc_070:.6e}  "
+          f"(direct {critical_supersaturation(60e-9, 1.0, sigma=0.070, T=273.15):.6e})")
+
+    clear_cache()
+
+
+if __name__ == "__main__":
+    run()
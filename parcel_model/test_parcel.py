@@ -0,0 +1,47 @@
+from run_mixed_phase_updraft_sweep import run_case
+from run_updraft_sensitivity import parcel_run
+from aerosol import AerosolPopulation
+from biological_in import BiologicalIN
+from parcel import ParcelSimulation, INOnset, LiquidRelaxation, IceDeposition
+
+
+def run():
+    print("Fixed-step (euler, exponential) vs adaptive (rk23) parcel integration")
+    print("Case                      method   dt / rtol      S_peak      t_peak (s)   ice_onset_t (s)")
+    print("------------------------------------------------------------------------------------------")
+
+    for w in [0.2, 1.0]:
+        for dt in [1.0, 0.1, 0.01]:
+            S_peak, t_peak, ton, _ = run_case(w, include_ice=True, dt=dt)
+            ton_str = f"{ton:.2f}" if ton is not None else "NA"
+            print(f"mixed-phase w = {w:.1f} m/s    euler    {dt:8.2f}    {S_peak: .4e}   {t_peak:9.2f}    {ton_str:>8}")
+        for dt in [5.0, 30.0]:
+            S_peak, t_peak, ton, _ = run_case(w, include_ice=True, dt=dt, method="exponential")
+            ton_str = f"{ton:.2f}" if ton is not None else "NA"
+            print(f"mixed-phase w = {w:.1f} m/s    expon.   {dt:8.2f}    {S_peak: .4e}   {t_peak:9.2f}    {ton_str:>8}")
+        for rtol in [1e-3, 1e-4]:
+            S_peak, t_peak, ton, _ = run_case(w, include_ice=True, method="rk23", rtol=rtol)
+            ton_str = f"{ton:.2f}" if ton is not None else "NA"
+            print(f"mixed-phase w = {w:.1f} m/s    rk23     {rtol:8.0e}    {S_peak: .4e}   {t_peak:9.2f}    {ton_str:>8}")
+
+    for rate in [0.002, 0.02]:
+        S_peak, t_peak = parcel_run(rate, "", method="rk23", rtol=1e-4)
+        print(f"updraft cooling = {rate:.3f} K/s  rk23     {1e-4:8.0e}    {S_peak: .4e}   {t_peak:9.2f}")
+
+    print()
+    print("Profiled mixed-phase run (w = 1 m/s, euler, dt = 1 s)")
+    sulfate = AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+    pollen = AerosolPopulation(name="pollen", N=3000.0, radius=5e-6, kappa=0.1, rho_p=1000.0)
+    bio = BiologicalIN(name="bioIN", N=50.0, T50=263.15, width=2.0)
+    sim = ParcelSimulation(273.15, 0.95, 0.01, populations=[sulfate, pollen],
+                           processes=[INOnset(bio), LiquidRelaxation(k_relax=0.2), IceDeposition(k_ice=2.0)],
+                           t_end=1200.0)
+    result = sim.run(profile=True)
+    sim.profiler.report()
+    plain = sim.run()
+    print("profiled S_peak == unprofiled S_peak:", result["S_peak"] == plain["S_peak"],
+          "  profile in unprofiled result:", "profile" in plain)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,40 @@
+import tempfile
+
+import numpy as np
+
+from result_store import ResultStore
+from sweep import run_sweep
+from run_mixed_phase_minimal import run_case as minimal_case
+from run_mixed_phase_updraft_sweep import run_case as sweep_case
+
+
+def run():
+    with tempfile.TemporaryDirectory() as root:
+        store = ResultStore(root)
+
+        # --- Time series: lists from run_mixed_phase_minimal ---
+        for include_ice in [False, True]:
+            times, S_series, qi_series, _, _ = minimal_case("", w=1.0, include_ice=include_ice, verbose=False)
+            store.write_series({"w": 1.0, "include_ice": include_ice}, t=times, S=S_series, qi=qi_series)
+
+        reopened = ResultStore(root)
+        print("Stored series:", [p for _, p in reopened.find(w=1.0)])
+        series = reopened.series({"w": 1.0, "include_ice": True})
+        times, S_series, qi_series, _, _ = minimal_case("", w=1.0, include_ice=True, verbose=False)
+        print(f"steps = {len(series['t'])}  memmap: {isinstance(series['S'], np.memmap)}"
+              f"  identical to run_case lists: {np.array_equal(series['S'], S_series) and np.array_equal(series['qi'], qi_series)}")
+
+        # --- Summary table from a sweep ---
+        rows = run_sweep(sweep_case, {"w": [0.2, 0.5, 1.0, 2.0], "include_ice": [False, True]},
+                         workers=1, progress=False)
+        store.write_sweep("updraft", rows, ["S_peak", "t_peak", "ice_onset_time", "ice_onset_T"])
+        table = store.table("updraft")
+        rows_ice = store.select("updraft", include_ice=True)
+        print()
+        print("updraft sweep table, include_ice=True rows")
+        for w, S_peak, ton in zip(table["w"][rows_ice], table["S_peak"][rows_ice], table["ice_onset_time"][rows_ice]):
+            print(f"w = {w:.1f} m/s  S_peak = {S_peak:.4e}  ice_onset_t = {ton:.1f}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,54 @@
+import tempfile
+import time
+
+from aerosol import AerosolPopulation
+from run_cache import RunCache, cached, make_key
+import run_mixed_phase_minimal
+import run_mixed_phase_updraft_sweep
+
+
+def run():
+    with tempfile.TemporaryDirectory() as root:
+        cache = RunCache(root, max_bytes=200 * 1024)
+        series_case = cached(cache, ignore=("label", "verbose"))(run_mixed_phase_minimal.run_case)
+        summary_case = cached(cache)(run_mixed_phase_updraft_sweep.run_case)
+
+        print("Run cache (time series and summary results)")
+        t0 = time.perf_counter()
+        first = series_case("A", 1.0, include_ice=True, verbose=False)
+        t1 = time.perf_counter()
+        second = series_case("another label", 1.0, include_ice=True, verbose=False)
+        t2 = time.perf_counter()
+        print(f"time series: miss {1e3 * (t1 - t0):7.2f} ms, hit {1e3 * (t2 - t1):7.2f} ms, identical: {first == second}")
+
+        s1 = summary_case(1.0)
+        s2 = summary_case(w=1.0, include_ice=True)  # same call with defaults spelled out
+        s3 = summary_case(1.0, dt=0.5)
+        print(f"summary: {s1 == s2}, hits = {cache.hits}, misses = {cache.misses}, dt=0.5 differs: {s3 != s1}")
+
+        # Keys follow the object contents, not identity
+        a = AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+        b = AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+        c = AerosolPopulation(name="sulfate", N=500e6, radius=31e-9, kappa=1.0, rho_p=1770.0)
+        print("equal populations share a key:", make_key("f", [a]) == make_key("f", [b]),
+              "  different radius:", make_key("f", [a]) != make_key("f", [c]))
+
+        # Lambdas and closures share a qualname; their code and captured values tell them apart
+        def scaled(k):
+            return lambda x: k * x
+        print("lambdas with different bodies differ:", make_key("f", [lambda x: x + 1]) != make_key("f", [lambda x: x + 2]),
+              "  closures over 1.0 / 2.0 differ:", make_key("f", [scaled(1.0)]) != make_key("f", [scaled(2.0)]),
+              "  equal closures share a key:", make_key("f", [scaled(1.0)]) == make_key("f", [scaled(1.0)]))
+
+        # LRU eviction under the size cap
+        for w in [0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8]:
+            series_case("", w, include_ice=False, verbose=False)
+        series_case("", 0.2, include_ice=False, verbose=False)  # refresh the oldest
+        series_case("", 0.9, include_ice=False, verbose=False)
+        print(f"cache size {cache.size() / 1024:.0f} kB (cap 200 kB), entries {len(cache.entries())},"
+              f" w=0.2 kept: {series_case.key('', 0.2, include_ice=False, verbose=False) in cache},"
+              f" w=0.3 evicted: {series_case.key('', 0.3, include_ice=False, verbose=False) not in cache}")
+
+
+if __name__ == "__main__":
+    run()
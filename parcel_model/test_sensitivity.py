@@ -0,0 +1,101 @@
+import os
+import tempfile
+
+import numpy as np
+
+from aerosol import AerosolPopulation
+from biological_in import BiologicalIN, INSpectrum
+from checkpoint import Checkpointer
+from batch_parcel import run_batch
+from sensitivity import run_tangent, parcel_sensitivities
+
+
+def central_difference(f, x, h):
+    return (f(x + h) - f(x - h)) / (2.0 * h)
+
+
+def run():
+    print("Tangent-linear sensitivities vs central differences (relative error; RH0 has no lasting effect)")
+    print("-------------------------------------------------------------")
+
+    # --- Pollen competition: surface-area sink ---
+    pollen_N = np.array([100.0, 1000.0, 3000.0])
+    base = dict(T0=288.0, RH0=0.95, cooling_rate=0.01, aerosol_N=np.array([np.full(3, 500e6), pollen_N]),
+                aerosol_radius=[30e-9, 5e-6], aerosol_kappa=[1.0, 0.1], k_liquid=0.5,
+                liquid_sink="surface_area", dt=1.0, t_end=600.0)
+    res = run_tangent(**base, wrt=["aerosol_N[1]", "cooling_rate", "k_liquid", "RH0"])
+    ref = run_batch(**base)
+    print(f"state identical to run_batch: {np.array_equal(res['S_peak'], ref['S_peak'])}")
+
+    def S_peak(**changes):
+        return run_batch(**{**base, **changes})["S_peak"]
+
+    checks = {
+        "aerosol_N[1]": central_difference(
+            lambda x: S_peak(aerosol_N=np.array([np.full(3, 500e6), x])), pollen_N, 1e-3 * pollen_N),
+        "cooling_rate": central_difference(lambda x: S_peak(cooling_rate=x), 0.01, 1e-6),
+        "k_liquid": central_difference(lambda x: S_peak(k_liquid=x), 0.5, 1e-5),
+        "RH0": central_difference(lambda x: S_peak(RH0=x), 0.95, 1e-6),
+    }
+    for name, fd in checks.items():
+        err = np.max(np.abs(res["d_S_peak"][name] - fd) / (np.abs(fd) + 1e-12))
+        print(f"pollen      dS_peak/d{name:15s} {err:.1e}")
+
+    # --- Mixed phase: S_peak and ice onset time vs w and IN parameters ---
+    sulfate = AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+    pollen = AerosolPopulation(name="pollen", N=3000.0, radius=5e-6, kappa=0.1, rho_p=1000.0)
+    bio = BiologicalIN(name="bioIN", N=50.0, T50=263.15, width=2.0)
+    w = np.array([0.5, 1.0, 2.0])
+    res = parcel_sensitivities([sulfate, pollen], bio_in=bio, wrt=["w", "k_relax", "bioIN.T50"], w=w)
+
+    fd = central_difference(
+        lambda x: run_batch(273.15, 0.95, 0.01 * x, [500e6, 3000.0], [30e-9, 5e-6], [1.0, 0.1],
+                            in_N=50.0, k_liquid=0.2, k_ice=2.0, t_end=1200.0)["S_peak"], w, 1e-4 * w)
+    print(f"mixed-phase dS_peak/dw               {np.max(np.abs(res['d_S_peak']['w'] - fd) / np.abs(fd)):.1e}")
+
+    # Onset: derivative of the continuous crossing time (biological_in.ice_onset)
+    from biological_in import ice_onset
+    for name, f, x, h in [
+        ("w", lambda x: ice_onset(273.15, 0.01 * x, 50.0, 263.15, 2.0)[0], w, 1e-6),
+        ("bioIN.T50", lambda x: ice_onset(273.15, 0.01 * w, 50.0, x, 2.0)[0], 263.15, 1e-6),
+    ]:
+        fd = central_difference(f, x, h)
+        err = np.max(np.abs(res["d_ice_onset_time"][name] - fd) / np.abs(fd))
+        print(f"mixed-phase d(onset time)/d{name:10s}{err:.1e}")
+
+    # --- run_batch options carry over: prescribed path, IN spectrum, checkpoints ---
+    mixed = dict(RH0=0.95, aerosol_N=[500e6, 3000.0], aerosol_radius=[30e-9, 5e-6], aerosol_kappa=[1.0, 0.1],
+                 k_liquid=0.2, k_ice=2.0, t_end=1200.0)
+    T_path = 273.15 - 0.01 * w * np.arange(1201)[:, None]
+    on_path = run_tangent(None, cooling_rate=None, T_path=T_path, in_N=50.0, **mixed, wrt=["k_liquid", "in_T50"])
+    linear = run_tangent(273.15, cooling_rate=0.01 * w, in_N=50.0, **mixed, wrt=["k_liquid", "in_T50"])
+    err = max(np.max(np.abs(on_path[key]["in_T50"] - linear[key]["in_T50"]) / np.abs(linear[key]["in_T50"]))
+              for key in ("d_ice_onset_time", "d_ice_onset_T"))
+    print(f"T_path: dS_peak/dk_liquid as for linear cooling {np.allclose(on_path['d_S_peak']['k_liquid'], linear['d_S_peak']['k_liquid'])}, "
+          f"onset derivatives {err:.1e}")
+
+    spectrum = INSpectrum(["a", "b"], N=[30.0, 40.0], T50=[265.0, 260.0], width=[1.5, 2.5])
+    res = run_tangent(273.15, cooling_rate=0.01 * w, in_spectrum=spectrum, **mixed, wrt=["cooling_rate"])
+    T_star = spectrum.onset_temperature(1.0)
+    fd = central_difference(lambda x: (273.15 - T_star) / x, 0.01 * w, 1e-8)
+    err = np.max(np.abs(res["d_ice_onset_time"]["cooling_rate"] - fd) / np.abs(fd))
+    print(f"in_spectrum: d(onset time)/dcooling_rate {err:.1e}")
+
+    with tempfile.TemporaryDirectory() as root:
+        ckpt = Checkpointer(os.path.join(root, "tangent.ckpt"), every=500)
+        first = run_tangent(273.15, cooling_rate=0.01 * w, in_N=50.0, **mixed, wrt=["k_ice"], checkpoint=ckpt)
+        resumed = run_tangent(273.15, cooling_rate=0.01 * w, in_N=50.0, **mixed, wrt=["k_ice"],
+                              checkpoint=Checkpointer(ckpt.path, every=500))
+        print(f"checkpoint: resumed tangents identical {np.array_equal(first['d_S_peak']['k_ice'], resumed['d_S_peak']['k_ice'])}")
+
+    # --- Inputs acting only through the activation switch are rejected ---
+    for name, sink in (("aerosol_kappa[1]", "surface_area"), ("aerosol_N[1]", "relax")):
+        try:
+            run_tangent(**{**base, "liquid_sink": sink}, wrt=[name])
+            print(f"{name} ({sink}) accepted (unexpected)")
+        except ValueError as err:
+            print(f"{name} ({sink}) rejected: {err}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,36 @@
+import io
+
+from aerosol import AerosolPopulation
+from parcel import ParcelSimulation, LiquidRelaxation
+from stream import ArrayCollector, Decimate, TextLogger, run_with_sinks, stream
+
+
+def make_sim(dt):
+    sulfate = AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+    return ParcelSimulation(288.0, 0.95, 0.01, populations=[sulfate],
+                            processes=[LiquidRelaxation(k_relax=0.5)], dt=dt, t_end=600.0)
+
+
+def run():
+    print("Decimated output (every_t = 60 s): records per run")
+    print("dt (s)   records   first t values")
+    for dt in [0.5, 1.0, 7.0]:
+        records = list(stream(make_sim(dt), every_t=60.0))
+        print(f"{dt:5.1f}    {len(records):5d}     {[round(r.t, 1) for r in records[:4]]}")
+
+    print()
+    sim = make_sim(1.0)
+    summary = sim.run()
+    collector = ArrayCollector()
+    text = io.StringIO()
+    logger = Decimate(TextLogger(lambda s: f"{s.t:6.1f} {s.S: .4e}", file=text), every=100)
+    streamed = run_with_sinks(make_sim(1.0), [collector, logger])
+    arrays = collector.arrays()
+    print("run() summary == run_with_sinks summary:", summary == streamed)
+    print(f"collected steps = {len(arrays['t'])}  max S = {arrays['S'].max():.4e}  S_peak = {summary['S_peak']:.4e}")
+    print("logger lines (every 100 steps):")
+    print(text.getvalue(), end="")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,48 @@
+import os
+import tempfile
+
+from sweep import run_sweep, parameter_grid, _read_manifest, _sweep_key
+from run_mixed_phase_updraft_sweep import run_case
+
+
+def run():
+    grid = {"w": [0.2, 0.5, 1.0, 2.0], "include_ice": [False, True]}
+    print(f"Sweep of {len(parameter_grid(grid))} cases (run_mixed_phase_updraft_sweep.run_case)")
+    print("-------------------------------------------------------------")
+
+    serial = run_sweep(run_case, grid, workers=1, progress=False)
+    parallel = run_sweep(run_case, grid, workers=4, chunk_size=3, progress=False)
+    print("parallel == serial (same order):", parallel == serial)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = os.path.join(tmp, "manifest.jsonl")
+        run_sweep(run_case, grid, workers=2, chunk_size=2, manifest=manifest, progress=False)
+
+        # Simulate an interrupted sweep: keep the header and the first 3 cases
+        with open(manifest) as f:
+            lines = f.readlines()
+        with open(manifest, "w") as f:
+            f.writelines(lines[:4])
+
+        resumed = run_sweep(run_case, grid, workers=2, chunk_size=2, manifest=manifest, progress=False)
+        with open(manifest) as f:
+            n_records = len(f.readlines()) - 1
+        print("resumed == serial:", resumed == serial, f"  manifest records: {n_records}")
+
+        # Interrupted mid-write: the last line is cut off halfway
+        with open(manifest, "w") as f:
+            f.writelines(lines[:4])
+            f.write(lines[4][:len(lines[4]) // 2])
+        resumed = run_sweep(run_case, grid, workers=2, chunk_size=2, manifest=manifest, progress=False)
+        done, _ = _read_manifest(manifest, _sweep_key(run_case, parameter_grid(grid), {}))
+        print("resumed after a partial line == serial:", resumed == serial,
+              f"  records readable on the next resume: {len(done)} of {len(serial)}")
+
+    print()
+    for params, (S_peak, t_peak, ton, _) in serial:
+        ton_str = f"{ton:.1f}" if ton is not None else "NA"
+        print(f"w = {params['w']:.1f} m/s  ice = {params['include_ice']!s:5}  S_peak = {S_peak:.4e}  ice_onset_t = {ton_str}")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,6 +1,16 @@
-from thermodynamics import saturation_vapor_pressure
+import numpy as np
+
+from thermodynamics import saturation_vapor_pressure, saturation_vapor_pressure_ice
 
 T = 288.0  # Representative temperature (Kelvin)
 es = saturation_vapor_pressure(T)
 
 print("Saturation vapor pressure =", es, "Pa")
+
+# Array evaluation and ice branch
+temperatures = np.array([233.15, 253.15, 263.15, 273.15])
+print("\nT (K)      es_liquid (Pa)   es_ice (Pa)")
+for Tk, es_l, es_i in zip(temperatures, saturation_vapor_pressure(temperatures),
+                          saturation_vapor_pressure_ice(temperatures)):
+    print(f"{Tk:7.2f}    {es_l:10.3f}      {es_i:10.3f}")
+
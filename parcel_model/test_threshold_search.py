@@ -0,0 +1,37 @@
+import math
+
+import numpy as np
+
+from biological_in import onset_temperature
+from threshold_search import brent, find_drop, find_onset, pollen_S_peak, ice_onset_reached
+
+
+def run():
+    print("Brent root finder")
+    for f, a, b, exact, label in [
+        (lambda x: x**3 - 2.0, 0.0, 2.0, 2.0 ** (1.0 / 3.0), "x^3 - 2"),
+        (lambda x: math.cos(x) - x, 0.0, 1.0, 0.7390851332151607, "cos x - x"),
+        (lambda x: math.tanh(20.0 * (x - 0.3)), -1.0, 1.0, 0.3, "tanh(20(x - 0.3))"),
+    ]:
+        evals = []
+        root = brent(lambda x: evals.append(x) or f(x), a, b, xtol=1e-12)
+        print(f"{label:20s} root = {root:.12f}  error = {abs(root - exact):.1e}  evaluations = {len(evals)}")
+
+    print()
+    print("Pollen 10% S_peak drop: Brent vs dense log grid")
+    S_ref = pollen_S_peak(0.0)
+    pN, samples = find_drop(pollen_S_peak, 10.0, 1e4, 0.1, reference=S_ref)
+    grid = np.logspace(1, 4, 301)
+    S = np.array([pollen_S_peak(x) for x in grid])
+    i = np.argmax(S <= 0.9 * S_ref)
+    print(f"Brent: pollen_N = {pN:.1f} m^-3 ({samples.n_evals} runs)   grid: between {grid[i - 1]:.1f} and {grid[i]:.1f} ({len(grid)} runs)")
+
+    print()
+    w_onset, samples = find_onset(ice_onset_reached, 0.05, 2.0, xtol=1e-4)
+    dT = 273.15 - onset_temperature(50.0, 263.15, 2.0)
+    print(f"Ice onset within 1200 s for w >= {w_onset:.4f} m/s ({samples.n_evals} runs);"
+          f" closed form {dT:.4f} K / (0.01 K/m * 1200 s) = {dT / 12.0:.4f} m/s")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,73 @@
+import os
+import tempfile
+
+import numpy as np
+
+from aerosol import AerosolPopulation, AerosolSpectrum
+from batch_parcel import run_batch
+from biological_in import BiologicalIN
+from trajectory import TrajectorySet, run_trajectories
+
+
+def run():
+    sulfate = AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+    pollen = AerosolPopulation(name="pollen", N=3000.0, radius=5e-6, kappa=0.1, rho_p=1000.0)
+    bio = BiologicalIN(name="bioIN", N=50.0, T50=263.15, width=2.0)
+
+    print("Trajectory-driven parcels")
+    print("-------------------------------------------------------------")
+
+    rng = np.random.default_rng(0)
+    n, n_time = 500, 1201
+    w = np.repeat(rng.uniform(0.1, 3.0, (n, 1)), n_time, axis=1)
+
+    with tempfile.TemporaryDirectory() as root:
+        # --- Constant updrafts reproduce run_batch with cooling = 0.01 w ---
+        os.makedirs(os.path.join(root, "w_only"))
+        np.save(os.path.join(root, "w_only", "w.npy"), w)
+        trajectories = TrajectorySet.load(os.path.join(root, "w_only"), dt=1.0)
+        table = run_trajectories(trajectories, os.path.join(root, "store"), "w_only",
+                                 [sulfate, pollen], bio_in=bio, chunk_size=128)
+        ref = run_batch(273.15, 0.95, 0.01 * w[:, 0], [500e6, 3000.0], [30e-9, 5e-6], [1.0, 0.1],
+                        in_N=bio.N, in_T50=bio.T50, in_width=bio.width, k_ice=2.0, t_end=1200.0)
+        for name in ("S_peak", "t_peak", "ice_onset_time", "qi"):
+            print(f"w trajectories vs run_batch   {name:15s} max |diff| = "
+                  f"{np.nanmax(np.abs(table[name] - ref[name])):.3e}")
+
+        # --- The same paths given as T(t), with constant p, in other chunks ---
+        T = trajectories.chunk(0, n)["T_path"].T
+        os.makedirs(os.path.join(root, "T_p"))
+        np.save(os.path.join(root, "T_p", "T.npy"), T)
+        np.save(os.path.join(root, "T_p", "p.npy"), np.full((n, n_time), 850.0))
+        table_T = run_trajectories(TrajectorySet.load(os.path.join(root, "T_p"), dt=1.0),
+                                   os.path.join(root, "store"), "T_p", [sulfate, pollen], bio_in=bio, chunk_size=77)
+        print(f"T(t) + constant p, chunk 77 vs w(t), chunk 128   S_peak max |diff| = "
+              f"{np.max(np.abs(table_T['S_peak'] - table['S_peak'])):.3e}")
+
+        # --- Raw float32 binary files match the same data as float32 .npy ---
+        T32 = T.astype(np.float32)
+        T32.tofile(os.path.join(root, "T.f32"))
+        a = run_trajectories(TrajectorySet.from_binary({"T": os.path.join(root, "T.f32")}, n_time, dt=1.0),
+                             os.path.join(root, "store"), "binary", [sulfate, pollen], chunk_size=200)
+        b = run_trajectories(TrajectorySet(1.0, T=T32), os.path.join(root, "store"), "array",
+                             [sulfate, pollen], chunk_size=500)
+        print(f"float32 binary vs in-memory float32   S_peak max |diff| = {np.max(np.abs(a['S_peak'] - b['S_peak'])):.3e}")
+
+        # --- Expansion (falling p) lowers e at fixed mixing ratio ---
+        p = 900.0 * np.exp(-np.arange(n_time) * 1e-4) * np.ones((n, 1))
+        expanding = run_trajectories(TrajectorySet(1.0, T=T, p=p), os.path.join(root, "store"), "expanding",
+                                     [sulfate, pollen], bio_in=bio)
+        print(f"falling pressure: median S_peak {np.median(expanding['S_peak']):.3e} "
+              f"vs {np.median(table['S_peak']):.3e} at constant p")
+
+        # --- Activated number fraction of a lognormal spectrum ---
+        spectrum = AerosolSpectrum.lognormal("sulfate_ln", N=500e6, r_median=30e-9, sigma_g=1.6,
+                                             kappa=1.0, rho_p=1770.0, n_bins=40)
+        ln = run_trajectories(trajectories, os.path.join(root, "store"), "lognormal", [spectrum, pollen])
+        frac = np.asarray(ln["activated_sulfate_ln"])
+        print(f"lognormal sulfate activated fraction: {frac.min():.3f} to {frac.max():.3f} "
+              f"(increasing with w: {bool(np.all(np.diff(frac[np.argsort(w[:, 0])]) >= -1e-12))})")
+
+
+if __name__ == "__main__":
+    run()
@@ -1,16 +1,35 @@
 # thermodynamics.py
 
 import math
-from constants import Lv, Rv
+import numpy as np
+from constants import Lv, Ls, Rv
+
+_SCALAR = (int, float)
+
 
 def saturation_vapor_pressure(T):
     """
     Saturation vapor pressure (Pa) using a simple Clausius–Clapeyron form.
-    T : temperature in Kelvin
+    T : temperature in Kelvin (float, or array for element-wise evaluation)
+    """
+    T0 = 273.15
+    es0 = 610.94  # Pa at T0
+    if isinstance(T, _SCALAR):
+        return es0 * math.exp((Lv / Rv) * (1 / T0 - 1 / T))
+    return es0 * np.exp((Lv / Rv) * (1 / T0 - 1 / np.asarray(T, dtype=float)))
+
+
+def saturation_vapor_pressure_ice(T):
+    """
+    Saturation vapor pressure over ice (Pa), same Clausius–Clapeyron form with
+    the latent heat of sublimation (equal to the liquid value at 273.15 K).
+    T : temperature in Kelvin (float, or array for element-wise evaluation)
     """
     T0 = 273.15
     es0 = 610.94  # Pa at T0
-    return es0 * math.exp((Lv / Rv) * (1 / T0 - 1 / T))
+    if isinstance(T, _SCALAR):
+        return es0 * math.exp((Ls / Rv) * (1 / T0 - 1 / T))
+    return es0 * np.exp((Ls / Rv) * (1 / T0 - 1 / np.asarray(T, dtype=float)))
 
 
 def supersaturation(e, es):
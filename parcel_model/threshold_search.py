@@ -0,0 +1,249 @@
+# threshold_search.py
+# Adaptive search for regime transitions (pollen competition, ice onset vs updraft)
+# and adaptive refinement of response curves, instead of dense hand-picked grids
+
+import math
+
+import run_parcel_competition
+import run_mixed_phase_updraft_sweep
+
+
+class Samples:
+    """
+    Memoized wrapper around a scalar model function f(x), recording every
+    evaluation in points (x, f(x)) so searches can report their cost.
+    """
+
+    def __init__(self, f):
+        self.f = f
+        self.points = {}
+
+    def __call__(self, x):
+        if x not in self.points:
+            self.points[x] = self.f(x)
+        return self.points[x]
+
+    @property
+    def n_evals(self):
+        return len(self.points)
+
+    def sorted(self):
+        xs = sorted(self.points)
+        return xs, [self.points[x] for x in xs]
+
+
+# -----------------------
+# Root finding
+# -----------------------
+def brent(f, a, b, xtol=1e-6, rtol=1e-10, maxiter=100):
+    """
+    Root of f in [a, b] by Brent's method (inverse quadratic interpolation
+    with bisection fallback); f(a) and f(b) must differ in sign.
+    Converges to |dx| <= xtol + rtol * |x|.
+    """
+    x_pre, x_cur = a, b
+    f_pre, f_cur = f(a), f(b)
+    if f_pre * f_cur > 0.0:
+        raise ValueError(f"f(a) = {f_pre:.3e} and f(b) = {f_cur:.3e} do not bracket a root")
+    if f_pre == 0.0:
+        return a
+    if f_cur == 0.0:
+        return b
+
+    x_blk = f_blk = s_pre = s_cur = 0.0
+    for _ in range(maxiter):
+        if f_pre != 0.0 and f_cur != 0.0 and (f_pre < 0.0) != (f_cur < 0.0):
+            x_blk, f_blk = x_pre, f_pre
+            s_pre = s_cur = x_cur - x_pre
+        if abs(f_blk) < abs(f_cur):
+            x_pre, x_cur, x_blk = x_cur, x_blk, x_cur
+            f_pre, f_cur, f_blk = f_cur, f_blk, f_cur
+
+        delta = 0.5 * (xtol + rtol * abs(x_cur))
+        s_bis = 0.5 * (x_blk - x_cur)
+        if f_cur == 0.0 or abs(s_bis) < delta:
+            return x_cur
+
+        if abs(s_pre) > delta and abs(f_cur) < abs(f_pre):
+            if x_pre == x_blk:
+                # Secant
+                s_try = -f_cur * (x_cur - x_pre) / (f_cur - f_pre)
+            else:
+                # Inverse quadratic interpolation
+                d_pre = (f_pre - f_cur) / (x_pre - x_cur)
+                d_blk = (f_blk - f_cur) / (x_blk - x_cur)
+                s_try = -f_cur * (f_blk * d_blk - f_pre * d_pre) / (d_blk * d_pre * (f_blk - f_pre))
+            if 2.0 * abs(s_try) < min(abs(s_pre), 3.0 * abs(s_bis) - delta):
+                s_pre, s_cur = s_cur, s_try
+            else:
+                s_pre = s_cur = s_bis
+        else:
+            s_pre = s_cur = s_bis
+
+        x_pre, f_pre = x_cur, f_cur
+        x_cur += s_cur if abs(s_cur) > delta else math.copysign(delta, s_bis)
+        f_cur = f(x_cur)
+    return x_cur
+
+
+def bisect_event(event, a, b, xtol=1e-3):
+    """
+    Smallest x in [a, b] (to within xtol) at which the boolean event(x) is
+    True, given event(a) False and event(b) True. For switch-like responses
+    (e.g. ice onset reached / not reached) where Brent has nothing to interpolate.
+    """
+    if event(a):
+        raise ValueError("event is already True at the lower bound")
+    if not event(b):
+        raise ValueError("event is not True at the upper bound")
+    while b - a > xtol:
+        mid = 0.5 * (a + b)
+        if event(mid):
+            b = mid
+        else:
+            a = mid
+    return b
+
+
+def _to_search(x, log):
+    return math.log10(x) if log else x
+
+
+def _from_search(u, log):
+    return 10.0 ** u if log else u
+
+
+def find_drop(metric, lo, hi, fraction, reference=None, log=True, xtol=1e-3):
+    """
+    Parameter x in [lo, hi] where metric(x) has dropped by fraction relative
+    to reference, i.e. metric(x) = (1 - fraction) * reference (Brent's method).
+
+    Parameters
+    ----------
+    metric : callable
+        Scalar response, e.g. S_peak as a function of pollen_N
+    lo, hi : float
+        Search bracket (both > 0 if log)
+    fraction : float
+        Relative drop, e.g. 0.1 for a 10% reduction in S_peak
+    reference : float, optional
+        Unperturbed value (e.g. S_peak without pollen); default metric(lo)
+    log : bool
+        Search in log10(x) (appropriate for concentrations)
+    xtol : float
+        Tolerance in the search variable (log10 units if log: 1e-3 ~ 0.23%)
+
+    Returns
+    -------
+    x, samples : transition parameter and the Samples of all model runs
+    """
+    samples = metric if isinstance(metric, Samples) else Samples(metric)
+    if reference is None:
+        reference = samples(lo)
+    target = (1.0 - fraction) * reference
+    u = brent(lambda u: samples(_from_search(u, log)) - target,
+              _to_search(lo, log), _to_search(hi, log), xtol=xtol)
+    return _from_search(u, log), samples
+
+
+def find_onset(event, lo, hi, log=False, xtol=1e-3):
+    """
+    Smallest x in [lo, hi] at which event(x) becomes True (bisection),
+    e.g. the updraft at which ice onset first happens within t_end.
+
+    Returns
+    -------
+    x, samples : transition parameter and the Samples of all model runs
+    """
+    samples = event if isinstance(event, Samples) else Samples(event)
+    u = bisect_event(lambda u: samples(_from_search(u, log)),
+                     _to_search(lo, log), _to_search(hi, log), xtol=xtol)
+    return _from_search(u, log), samples
+
+
+def refine_curve(f, lo, hi, n_initial=5, tol=0.01, max_evals=40, log=True, min_width=1.0 / 256):
+    """
+    Sample f on [lo, hi] adaptively: start from n_initial evenly spaced points
+    (in log10 x if log) and repeatedly bisect the interval whose midpoint
+    departs most from linear interpolation of its end points, until every
+    departure is below tol * (max f - min f) or max_evals runs are spent.
+    Points concentrate where the curve bends; intervals narrower than
+    min_width of the range are not split further (so jumps are not chased).
+
+    Returns
+    -------
+    xs, ys : sorted sample points and values; samples.n_evals runs were made
+    """
+    samples = f if isinstance(f, Samples) else Samples(f)
+    u_lo, u_hi = _to_search(lo, log), _to_search(hi, log)
+    du_min = min_width * (u_hi - u_lo)
+    us = [u_lo + (u_hi - u_lo) * i / (n_initial - 1) for i in range(n_initial)]
+    ys = [samples(_from_search(u, log)) for u in us]
+
+    # Candidate intervals with their midpoint departure (evaluated lazily)
+    departures = {}
+    while samples.n_evals < max_evals:
+        scale = (max(ys) - min(ys)) or 1.0
+        worst, worst_i = 0.0, None
+        for i in range(len(us) - 1):
+            key = (us[i], us[i + 1])
+            if key[1] - key[0] < 2.0 * du_min:
+                continue
+            if key not in departures:
+                if samples.n_evals >= max_evals:
+                    break
+                u_mid = 0.5 * (us[i] + us[i + 1])
+                y_mid = samples(_from_search(u_mid, log))
+                departures[key] = (abs(y_mid - 0.5 * (ys[i] + ys[i + 1])), u_mid, y_mid)
+            if departures[key][0] > worst:
+                worst, worst_i = departures[key][0], i
+        if worst_i is None or worst <= tol * scale:
+            break
+        _, u_mid, y_mid = departures.pop((us[worst_i], us[worst_i + 1]))
+        us.insert(worst_i + 1, u_mid)
+        ys.insert(worst_i + 1, y_mid)
+
+    return samples.sorted()
+
+
+# -----------------------
+# Model responses
+# -----------------------
+def pollen_S_peak(pollen_N, dt=1.0, method="euler"):
+    """
+    S_peak of run_parcel_competition.parcel_run (no printing).
+    """
+    return run_parcel_competition.parcel_run(pollen_N, "", dt=dt, method=method, verbose=False)[0]
+
+
+def ice_onset_reached(w, **options):
+    """
+    True if run_mixed_phase_updraft_sweep.run_case reaches ice onset at updraft w.
+    """
+    return run_mixed_phase_updraft_sweep.run_case(w, include_ice=True, **options)[2] is not None
+
+
+def run():
+    S_ref = pollen_S_peak(0.0)
+
+    print("Pollen competition: pollen_N at which S_peak drops by a given fraction")
+    print("drop      pollen_N (m^-3)    S_peak       model runs")
+    print("------------------------------------------------------")
+    for fraction in [0.1, 0.25, 0.5]:
+        pN, samples = find_drop(pollen_S_peak, 10.0, 1e5, fraction, reference=S_ref)
+        print(f"{fraction:4.0%}       {pN:12.1f}      {samples(pN): .3e}      {samples.n_evals:4d}")
+
+    print()
+    print("Mixed-phase updraft sweep: smallest w with ice onset within t_end = 1200 s")
+    w_onset, samples = find_onset(ice_onset_reached, 0.05, 2.0, xtol=1e-3)
+    print(f"w_onset = {w_onset:.4f} m/s  ({samples.n_evals} model runs)")
+
+    print()
+    xs, ys = refine_curve(pollen_S_peak, 10.0, 1e4, n_initial=4, tol=0.01, max_evals=16)
+    print(f"Adaptive S_peak(pollen_N) curve: {len(xs)} points")
+    for x, y in zip(xs, ys):
+        print(f"{x:12.1f}    {y: .3e}")
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,238 @@
+# trajectory.py
+# Trajectory-driven parcels: prescribed T(t), p(t) or w(t) per parcel, read
+# from memory-mapped .npy / raw binary files in chunks of trajectories, run
+# with batch_parcel and streamed to a memory-mapped summary table
+#
+#   trajectories = TrajectorySet.load("trajectories/", dt=1.0)    # T.npy, p.npy, w.npy
+#   table = run_trajectories(trajectories, ResultStore("results"), "traj",
+#                            [sulfate, pollen], bio_in=bio, chunk_size=4096)
+#
+# Files hold one trajectory per row, shape (n_traj, n_time), any float dtype.
+# Only one chunk (chunk_size x n_time, float64) is in memory at a time, so
+# memory stays flat however many trajectories the files hold.
+
+import os
+import time
+
+import numpy as np
+
+from batch_parcel import run_batch, populations_to_arrays
+from result_store import ResultStore
+
+
+FIELDS = ("T", "p", "w")
+SUMMARY = ("S_peak", "t_peak", "ice_onset_time", "ice_onset_T", "qi")
+
+
+class TrajectorySet:
+    """
+    Parcel trajectories sampled every dt seconds.
+
+    Parameters
+    ----------
+    dt : float
+        Sampling interval (s), also the integration time step
+    T, p, w : array_like, shape (n_traj, n_time), optional
+        Temperature (K), pressure (any unit) and updraft (m/s), typically
+        memory-mapped. T or w is required; without T, the temperature
+        follows T0 cooled at cooling_per_w * w (as in the drivers).
+    RH0 : array_like, shape (n_traj,), optional
+        Initial relative humidity per trajectory
+    """
+
+    def __init__(self, dt, T=None, p=None, w=None, RH0=None):
+        if T is None and w is None:
+            raise ValueError("TrajectorySet needs T or w")
+        self.dt = dt
+        self.T = T
+        self.p = p
+        self.w = w
+        self.RH0 = RH0
+        shapes = {np.shape(a) for a in (T, p, w) if a is not None}
+        if len(shapes) != 1 or len(next(iter(shapes))) != 2:
+            raise ValueError(f"T, p and w must share one 2-D shape, got {sorted(shapes)}")
+        self.n, self.n_time = shapes.pop()
+        if RH0 is not None and np.shape(RH0) != (self.n,):
+            raise ValueError(f"RH0 must have shape ({self.n},), got {np.shape(RH0)}")
+
+    @classmethod
+    def load(cls, directory, dt, mmap_mode="r"):
+        """
+        Memory-map T.npy, p.npy, w.npy and RH0.npy from directory (those present).
+        """
+        arrays = {}
+        for field in FIELDS + ("RH0",):
+            path = os.path.join(directory, f"{field}.npy")
+            if os.path.exists(path):
+                arrays[field] = np.load(path, mmap_mode=mmap_mode)
+        return cls(dt, **arrays)
+
+    @classmethod
+    def from_binary(cls, paths, n_time, dt, dtype="float32"):
+        """
+        Memory-map headerless binary files, {field: path}, each holding
+        n_traj x n_time values of dtype (row-major, one trajectory per row).
+        """
+        arrays = {}
+        for field, path in paths.items():
+            a = np.memmap(path, dtype=dtype, mode="r")
+            arrays[field] = a if field == "RH0" else a.reshape(-1, n_time)
+        return cls(dt, **arrays)
+
+    def __len__(self):
+        return self.n
+
+    def chunk(self, start, stop, T0=273.15, cooling_per_w=0.01):
+        """
+        Trajectories start:stop as run_batch inputs: {"T_path", "p_path"
+        (None without p)}, each float64 of shape (n_time, stop - start) so
+        every step reads contiguous memory.
+        """
+        if self.T is not None:
+            T_path = np.ascontiguousarray(np.asarray(self.T[start:stop], dtype=float).T)
+        else:
+            # T_{k+1} = T_k - cooling_per_w * w_k * dt, stepped as run_batch cools
+            w = np.asarray(self.w[start:stop], dtype=float).T
+            T_path = np.empty_like(w)
+            T_path[0] = T0
+            for k in range(1, self.n_time):
+                T_path[k] = T_path[k - 1] - (cooling_per_w * w[k - 1]) * self.dt
+        p_path = None
+        if self.p is not None:
+            p_path = np.ascontiguousarray(np.asarray(self.p[start:stop], dtype=float).T)
+        return {"T_path": T_path, "p_path": p_path}
+
+
+def summary_columns(populations):
+    """
+    Column names of the run_trajectories table.
+    """
+    return list(SUMMARY) + [f"activated_{pop.name}" for pop in populations]
+
+
+def run_trajectories(
+    trajectories,
+    store,
+    name,
+    populations,
+    bio_in=None,
+    in_spectrum=None,
+    RH0=0.95,
+    T0=273.15,
+    cooling_per_w=0.01,
+    N_threshold=1.0,
+    k_liquid=0.2,
+    k_ice=2.0,
+    qi_growth_coeff=0.0,
+    liquid_sink="relax",
+    chunk_size=4096,
+    progress=False,
+):
+    """
+    Run every trajectory through batch_parcel.run_batch, chunk_size at a
+    time, writing each chunk's summary into a memory-mapped table.
+
+    Parameters
+    ----------
+    trajectories : TrajectorySet
+    store : ResultStore or str
+        Store (or its root directory) receiving table name
+    populations : list of AerosolPopulation / AerosolSpectrum
+        Liquid CCN populations, shared by all trajectories
+    bio_in : BiologicalIN, optional / in_spectrum : INSpectrum, optional
+        Ice nucleating particles (neither: no ice)
+    RH0 : float
+        Initial relative humidity, unless the trajectories carry RH0
+    T0, cooling_per_w : float
+        Used only for trajectories given by w without T
+    The remaining model arguments are passed to run_batch (defaults as in
+    run_mixed_phase_updraft_sweep).
+
+    Returns
+    -------
+    dict of memory-mapped columns, one row per trajectory: S_peak, t_peak,
+    ice_onset_time, ice_onset_T (NaN if no onset), qi and activated_<name>,
+    the number fraction of each population activated at any step.
+    """
+    if not isinstance(store, ResultStore):
+        store = ResultStore(store)
+    n = len(trajectories)
+    table = store.open_table(name, n, {c: np.float64 for c in summary_columns(populations)})
+
+    aerosol_N, aerosol_radius, aerosol_kappa = populations_to_arrays(populations)
+    sizes = [np.size(pop.N) for pop in populations]
+    owners = np.repeat(np.arange(len(populations)), sizes)
+    N_pop = np.bincount(owners, weights=aerosol_N, minlength=len(populations))
+
+    ice = {}
+    if in_spectrum is not None:
+        ice = {"in_spectrum": in_spectrum}
+    elif bio_in is not None:
+        ice = {"in_N": bio_in.N, "in_T50": bio_in.T50, "in_width": bio_in.width}
+
+    t0 = time.perf_counter()
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        paths = trajectories.chunk(start, stop, T0=T0, cooling_per_w=cooling_per_w)
+        RH0_chunk = RH0 if trajectories.RH0 is None else np.asarray(trajectories.RH0[start:stop], dtype=float)
+        res = run_batch(
+            None, RH0_chunk, None, aerosol_N, aerosol_radius, aerosol_kappa, **ice,
+            N_threshold=N_threshold, k_liquid=k_liquid, k_ice=k_ice, qi_growth_coeff=qi_growth_coeff,
+            liquid_sink=liquid_sink, dt=trajectories.dt, **paths,
+        )
+        for c in SUMMARY:
+            table[c][start:stop] = res[c]
+
+        # Number fraction activated per population (summed over its bins)
+        N_act = np.zeros((len(populations), stop - start))
+        np.add.at(N_act, owners, res["activated_ever"] * aerosol_N[:, None])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = N_act / N_pop[:, None]
+        for pop, f in zip(populations, fraction):
+            table[f"activated_{pop.name}"][start:stop] = f
+
+        for a in table.values():
+            a.flush()
+        if progress:
+            rate = stop / (time.perf_counter() - t0)
+            print(f"trajectories: {stop}/{n} ({rate:.0f}/s)", flush=True)
+    return table
+
+
+def run(n=20000, n_time=900, chunk_size=4096):
+    import tempfile
+
+    from aerosol import AerosolPopulation
+    from biological_in import BiologicalIN
+
+    sulfate = AerosolPopulation(name="sulfate", N=500e6, radius=30e-9, kappa=1.0, rho_p=1770.0)
+    pollen = AerosolPopulation(name="pollen", N=3000.0, radius=5e-6, kappa=0.1, rho_p=1000.0)
+    bio = BiologicalIN(name="bioIN", N=50.0, T50=263.15, width=2.0)
+
+    with tempfile.TemporaryDirectory() as root:
+        # Synthetic trajectories: updrafts fluctuating around a random mean
+        rng = np.random.default_rng(0)
+        w_file = np.lib.format.open_memmap(os.path.join(root, "w.npy"), mode="w+", dtype=np.float32,
+                                           shape=(n, n_time))
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            w_mean = rng.lognormal(0.0, 0.7, (stop - start, 1))
+            w_file[start:stop] = w_mean * (1.0 + 0.5 * np.sin(np.arange(n_time) / rng.uniform(30, 300, (stop - start, 1))))
+        w_file.flush()
+        del w_file
+
+        trajectories = TrajectorySet.load(root, dt=1.0)
+        print(f"{n} trajectories x {n_time} steps ({trajectories.w.nbytes / 1e6:.0f} MB on disk), "
+              f"chunks of {chunk_size}")
+        t0 = time.perf_counter()
+        table = run_trajectories(trajectories, os.path.join(root, "store"), "traj", [sulfate, pollen],
+                                 bio_in=bio, chunk_size=chunk_size, progress=True)
+        elapsed = time.perf_counter() - t0
+        print(f"{n / elapsed:.0f} trajectories/s")
+        print(f"S_peak median {np.median(table['S_peak']):.3e}, ice onset in "
+              f"{np.mean(np.isfinite(table['ice_onset_time'])):.1%}, "
+              f"pollen activated in {np.mean(table['activated_pollen'] > 0):.1%}")
+
+
+if __name__ == "__main__":
+    run()